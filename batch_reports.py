@@ -0,0 +1,402 @@
+"""Batch session reports for every session, live and archived.
+
+One grouped SQL pass over ``scoped_results`` yields each session's
+aggregates (the same performance summary, risk metrics and recommendations
+as the app's statistics report) together with a change fingerprint. Only
+sessions whose fingerprint differs from the manifest left by the previous
+run are re-rendered; rendering to text, Markdown and HTML is spread over a
+process pool. Index pages listing every session are rebuilt on each run.
+
+Without round-level data the recommendations use normal-approximation
+intervals (mean +/- z * std / sqrt(n) for EV, Wilson for the win rate)
+instead of the bootstrap the interactive report runs. Drawdowns, the ulcer
+index and VaR/CVaR come from window functions over each session's balance
+path; risk of ruin is the analytic one, for the session's last bet from its
+final balance (the Monte Carlo estimate needs the rounds themselves).
+
+Usage:
+    python batch_reports.py --db bomb_game_results.db --out reports
+"""
+import html
+import json
+import math
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from money import sigils
+from risk_engine import TAIL_LEVEL, TAIL_TILES, analytic_ruin
+from round_archive import scope_batches
+
+# Bump when the report layout changes so every session is re-rendered
+REPORT_VERSION = 2
+
+FORMATS = ('txt', 'md', 'html')
+MANIFEST_NAME = 'manifest.json'
+SESSIONS_DIR = 'sessions'
+
+# Below this many changed sessions the pool costs more than it saves
+PARALLEL_MIN_SESSIONS = 32
+CHUNK_SIZE = 16
+
+Z_95 = 1.959964
+
+# {where} is filled per call; money is aggregated in units, then converted.
+# peak is the running maximum of the balance path including each round's
+# starting balance; below counts the rounds since the balance last stood at
+# its peak.
+SESSION_STATS_SQL = f'''
+    WITH ranked AS (
+        SELECT id, session_id, timestamp, result, profit, safe_picks, bet_amount,
+               ending_balance,
+               ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY round_number DESC) AS from_end,
+               ROW_NUMBER() OVER path AS step,
+               MAX(MAX(ending_balance - profit, ending_balance)) OVER path AS peak,
+               NTILE({TAIL_TILES}) OVER (PARTITION BY session_id ORDER BY profit) AS tail,
+               CASE WHEN bet_amount > 0 THEN profit * 1.0 / bet_amount END AS unit_return
+        FROM scoped_results
+        {{where}}
+        WINDOW path AS (PARTITION BY session_id ORDER BY round_number ROWS UNBOUNDED PRECEDING)
+    ),
+    underwater AS (
+        SELECT *,
+               CASE WHEN peak > 0 THEN (peak - ending_balance) * 100.0 / peak ELSE 0 END AS drawdown_pct,
+               step - MAX(CASE WHEN ending_balance >= peak THEN step ELSE 0 END)
+                      OVER (PARTITION BY session_id ORDER BY step ROWS UNBOUNDED PRECEDING) AS below
+        FROM ranked
+    )
+    SELECT session_id,
+           COUNT(*),
+           SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END),
+           {sigils('SUM(profit)')},
+           {sigils('AVG(profit)')},
+           {sigils('TOTAL(profit * profit)', 2)},
+           {sigils('MIN(profit)')},
+           {sigils('MAX(profit)')},
+           AVG(safe_picks),
+           {sigils('SUM(bet_amount)')},
+           MIN(timestamp),
+           MAX(timestamp),
+           {sigils('SUM(CASE WHEN from_end = 1 THEN ending_balance END)')},
+           MAX(id),
+           {sigils('SUM(CASE WHEN from_end = 1 THEN bet_amount END)')},
+           {sigils('MAX(peak - ending_balance)')},
+           MAX(drawdown_pct),
+           MAX(below),
+           AVG(drawdown_pct * drawdown_pct),
+           {sigils('-MAX(CASE WHEN tail = 1 THEN profit END)')},
+           {sigils('-AVG(CASE WHEN tail = 1 THEN profit END)')},
+           COUNT(unit_return),
+           AVG(unit_return),
+           TOTAL(unit_return * unit_return)
+    FROM underwater
+    GROUP BY session_id
+    ORDER BY MAX(timestamp) DESC
+'''
+
+STATS_COLUMNS = ('session_id', 'total', 'wins', 'net_profit', 'avg_profit', 'sum_sq_profit',
+                 'min_profit', 'max_profit', 'avg_safe_picks', 'total_bet', 'first_played',
+                 'last_played', 'final_balance', 'max_id', 'last_bet', 'max_drawdown',
+                 'max_drawdown_pct', 'max_duration', 'mean_sq_drawdown_pct', 'var', 'cvar',
+                 'staked', 'mean_return', 'sum_sq_return')
+
+
+def session_stats(conn, session_id=None):
+    """Aggregate row of every session (or just one) in scoped_results, newest first"""
+    where, params = ('WHERE session_id = ?', (session_id,)) if session_id is not None else ('', ())
+    sessions = []
+    for row in conn.execute(SESSION_STATS_SQL.format(where=where), params):
+        stats = dict(zip(STATS_COLUMNS, row))
+        total = stats['total']
+        variance = stats['sum_sq_profit'] / total - stats['avg_profit'] ** 2
+        stats['std_profit'] = math.sqrt(variance * total / (total - 1)) if total > 1 and variance > 0 else 0.0
+        stats['win_rate'] = stats['wins'] / total * 100
+        stats['ulcer_index'] = math.sqrt(stats.pop('mean_sq_drawdown_pct'))
+
+        # Sample variance of profit per unit staked, as DrawdownTracker.return_moments
+        staked, mean = stats['staked'], stats['mean_return']
+        sum_sq = stats.pop('sum_sq_return')
+        variance = max(0.0, (sum_sq - staked * mean * mean) / (staked - 1)) if staked > 1 else math.nan
+        ruin = analytic_ruin(math.nan if mean is None else mean, variance,
+                             stats['final_balance'], stats['last_bet'])
+        stats['risk_of_ruin'] = None if math.isnan(ruin) else ruin
+        sessions.append(stats)
+    return sessions
+
+
+def fingerprint(stats):
+    """Change signature of a session's data; any insert, delete or edit moves it"""
+    return (f"v{REPORT_VERSION}:{stats['total']}:{stats['max_id']}:"
+            f"{stats['net_profit']:.6f}:{stats['sum_sq_profit']:.6f}:{stats['final_balance']}")
+
+
+def safe_name(session_id):
+    """File name stem for a session id"""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', session_id)
+
+
+def wilson_interval(wins, total, z=Z_95):
+    """Wilson score interval of a win rate, in percent"""
+    p = wins / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return (center - margin) * 100, (center + margin) * 100
+
+
+def report_sections(stats):
+    """(title, [(label, value)]) sections and (mark, text) recommendations of one session"""
+    total, wins = stats['total'], stats['wins']
+    avg_profit, std_profit = stats['avg_profit'], stats['std_profit']
+    win_rate = stats['win_rate']
+
+    performance = [
+        ('Total Games', f"{total}"),
+        ('Wins', f"{wins} ({win_rate:.1f}%)"),
+        ('Losses', f"{total - wins}"),
+        ('Net Profit', f"{stats['net_profit']:+.2f} Sigils"),
+        ('Average Profit/Game', f"{avg_profit:.4f} Sigils"),
+        ('Best Win', f"{stats['max_profit']:+.2f} Sigils"),
+        ('Worst Loss', f"{stats['min_profit']:+.2f} Sigils"),
+        ('Volatility (Std Dev)', f"{std_profit:.4f} Sigils"),
+        ('Average Safe Picks', f"{stats['avg_safe_picks']:.2f}"),
+        ('Total Wagered', f"{stats['total_bet']:.2f} Sigils"),
+    ]
+
+    sharpe = avg_profit / (std_profit + 0.001) if std_profit else 0
+    ruin = stats['risk_of_ruin']
+    risk = [
+        ('Sharpe Ratio', f"{sharpe:.3f}"),
+        ('Maximum Drawdown', f"{stats['max_drawdown']:.2f} Sigils ({stats['max_drawdown_pct']:.1f}%)"),
+        ('Maximum Drawdown Duration', f"{stats['max_duration']} rounds"),
+        ('Ulcer Index', f"{stats['ulcer_index']:.2f}"),
+        (f'VaR {TAIL_LEVEL:.0%}', f"{stats['var']:.2f} Sigils per round"),
+        (f'CVaR {TAIL_LEVEL:.0%}', f"{stats['cvar']:.2f} Sigils per round"),
+        (f"Risk of Ruin at {stats['last_bet']:.2f} per bet",
+         '-' if ruin is None else f"{ruin * 100:.1f}%"),
+    ]
+
+    # Only call a result when the interval excludes the threshold
+    margin = Z_95 * std_profit / math.sqrt(total)
+    rate_low, rate_high = wilson_interval(wins, total)
+    recommendations = []
+    if avg_profit - margin > 0:
+        recommendations.append(('✓', "Strategy is profitable (Positive Expected Value)"))
+    elif avg_profit + margin < 0:
+        recommendations.append(('⚠', "Strategy is not profitable (Negative Expected Value)"))
+    else:
+        recommendations.append(('?', "Expected value is not distinguishable from zero yet"))
+    if rate_low > 50:
+        recommendations.append(('✓', "Good win rate"))
+    elif rate_high < 50:
+        recommendations.append(('⚠', "Win rate below 50%"))
+    else:
+        recommendations.append(('?', "Win rate is not distinguishable from 50% yet"))
+    if std_profit and std_profit > abs(avg_profit) * 2:
+        recommendations.append(('⚠', "High volatility detected"))
+
+    sections = [('PERFORMANCE SUMMARY', performance), ('RISK METRICS', risk)]
+    return sections, recommendations
+
+
+def header_fields(stats, generated):
+    return [('Session', stats['session_id']),
+            ('Played', f"{stats['first_played']} to {stats['last_played']} UTC"),
+            ('Report Date', generated),
+            ('Final Balance', f"{stats['final_balance']:.2f} Sigils")]
+
+
+def render_text(stats, generated):
+    sections, recommendations = report_sections(stats)
+    report = "=" * 70 + "\n"
+    report += "BOMB GAME ANALYTICS REPORT\n"
+    report += "=" * 70 + "\n\n"
+    report += "".join(f"{label}: {value}\n" for label, value in header_fields(stats, generated))
+    report += "\n"
+    for title, rows in sections:
+        report += f"{title}\n" + "-" * 50 + "\n"
+        report += "".join(f"{label}: {value}\n" for label, value in rows)
+        report += "\n"
+    report += "RECOMMENDATIONS\n" + "-" * 50 + "\n"
+    report += "".join(f"{mark} {text}\n" for mark, text in recommendations)
+    return report
+
+
+def render_markdown(stats, generated):
+    sections, recommendations = report_sections(stats)
+    lines = [f"# Bomb Game Analytics Report: {stats['session_id']}", ""]
+    lines += [f"- **{label}:** {value}" for label, value in header_fields(stats, generated)[1:]]
+    for title, rows in sections:
+        lines += ["", f"## {title.title()}", "", "| Metric | Value |", "|---|---|"]
+        lines += [f"| {label} | {value} |" for label, value in rows]
+    lines += ["", "## Recommendations", ""]
+    lines += [f"- {mark} {text}" for mark, text in recommendations]
+    return "\n".join(lines) + "\n"
+
+
+HTML_STYLE = '''
+    body { font-family: sans-serif; margin: 2em; color: #222; }
+    table { border-collapse: collapse; margin-bottom: 1.5em; }
+    th, td { border: 1px solid #ccc; padding: 4px 10px; text-align: left; }
+    th { background: #f0f0f0; }
+    td.num { text-align: right; }
+'''
+
+
+def html_page(title, body):
+    return (f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{html.escape(title)}</title>\n<style>{HTML_STYLE}</style>\n"
+            f"</head>\n<body>\n{body}</body>\n</html>\n")
+
+
+def render_html(stats, generated):
+    sections, recommendations = report_sections(stats)
+    e = html.escape
+    body = f"<p><a href=\"../index.html\">All sessions</a></p>\n"
+    body += f"<h1>Bomb Game Analytics Report: {e(stats['session_id'])}</h1>\n<ul>\n"
+    body += "".join(f"<li><b>{e(label)}:</b> {e(value)}</li>\n"
+                    for label, value in header_fields(stats, generated)[1:])
+    body += "</ul>\n"
+    for title, rows in sections:
+        body += f"<h2>{e(title.title())}</h2>\n<table>\n"
+        body += "".join(f"<tr><th>{e(label)}</th><td class=\"num\">{e(value)}</td></tr>\n"
+                        for label, value in rows)
+        body += "</table>\n"
+    body += "<h2>Recommendations</h2>\n<ul>\n"
+    body += "".join(f"<li>{e(mark)} {e(text)}</li>\n" for mark, text in recommendations)
+    body += "</ul>\n"
+    return html_page(f"Report {stats['session_id']}", body)
+
+
+RENDERERS = {'txt': render_text, 'md': render_markdown, 'html': render_html}
+
+
+def write_atomic(path, content):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def write_session_reports(job):
+    """Render and write one session's reports; runs in a pool worker"""
+    stats, session_dir, generated = job
+    stem = os.path.join(session_dir, safe_name(stats['session_id']))
+    for fmt in FORMATS:
+        write_atomic(f"{stem}.{fmt}", RENDERERS[fmt](stats, generated))
+    return stats['session_id']
+
+
+def write_index(out_dir, sessions, generated):
+    """Index pages (Markdown and HTML) linking every session's reports"""
+    e = html.escape
+    columns = ('Session', 'Played', 'Games', 'Win Rate', 'Net Profit', 'Final Balance')
+
+    def cells(stats):
+        return (stats['last_played'], f"{stats['total']}", f"{stats['win_rate']:.1f}%",
+                f"{stats['net_profit']:+.2f}", f"{stats['final_balance']:.2f}")
+
+    lines = ["# Bomb Game Session Reports", "",
+             f"{len(sessions)} sessions, generated {generated}", "",
+             "| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    rows = []
+    for stats in sessions:
+        link = f"{SESSIONS_DIR}/{safe_name(stats['session_id'])}"
+        lines.append(f"| [{stats['session_id']}]({link}.md) | " + " | ".join(cells(stats)) + " |")
+        rows.append(f"<tr><td><a href=\"{e(link)}.html\">{e(stats['session_id'])}</a> "
+                    f"(<a href=\"{e(link)}.txt\">txt</a>, <a href=\"{e(link)}.md\">md</a>)</td>"
+                    + "".join(f"<td class=\"num\">{e(value)}</td>" for value in cells(stats))
+                    + "</tr>\n")
+    write_atomic(os.path.join(out_dir, 'index.md'), "\n".join(lines) + "\n")
+
+    body = "<h1>Bomb Game Session Reports</h1>\n"
+    body += f"<p>{len(sessions)} sessions, generated {e(generated)}</p>\n<table>\n"
+    body += "<tr>" + "".join(f"<th>{e(c)}</th>" for c in columns) + "</tr>\n"
+    body += "".join(rows) + "</table>\n"
+    write_atomic(os.path.join(out_dir, 'index.html'), html_page("Bomb Game Session Reports", body))
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def generate_reports(db_path, out_dir='reports', archive_dir='archive', workers=None,
+                     force=False, progress=None):
+    """Bring out_dir up to date; return counts of sessions, rendered, unchanged, removed
+
+    progress, if given, is called with (done, total) as changed sessions are written.
+    """
+    # Every session's rows are in one batch, so its stats come out whole
+    sessions = []
+    conns = scope_batches(db_path, archive_dir)
+    try:
+        for conn in conns:
+            sessions += session_stats(conn)
+    finally:
+        for conn in conns:
+            conn.close()
+    sessions.sort(key=lambda stats: stats['last_played'] or '', reverse=True)
+
+    session_dir = os.path.join(out_dir, SESSIONS_DIR)
+    os.makedirs(session_dir, exist_ok=True)
+    previous = {} if force else load_manifest(out_dir)
+    current = {stats['session_id']: fingerprint(stats) for stats in sessions}
+
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    jobs = [(stats, session_dir, generated) for stats in sessions
+            if previous.get(stats['session_id']) != current[stats['session_id']]]
+
+    done = 0
+    if len(jobs) >= PARALLEL_MIN_SESSIONS and workers != 1:
+        # Called from the app's worker thread, where forking could copy a held lock
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            for _ in executor.map(write_session_reports, jobs, chunksize=CHUNK_SIZE):
+                done += 1
+                if progress:
+                    progress(done, len(jobs))
+    else:
+        for job in jobs:
+            write_session_reports(job)
+            done += 1
+            if progress:
+                progress(done, len(jobs))
+
+    removed = [session_id for session_id in previous if session_id not in current]
+    for session_id in removed:
+        for fmt in FORMATS:
+            path = os.path.join(session_dir, f"{safe_name(session_id)}.{fmt}")
+            if os.path.exists(path):
+                os.remove(path)
+
+    write_index(out_dir, sessions, generated)
+    write_atomic(os.path.join(out_dir, MANIFEST_NAME), json.dumps(current, indent=1))
+    return {'sessions': len(sessions), 'rendered': len(jobs),
+            'unchanged': len(sessions) - len(jobs), 'removed': len(removed)}
+
+
+def main():
+    """Command-line entry point for scheduled (e.g. nightly) runs"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bomb game batch session reports")
+    parser.add_argument('--db', default='bomb_game_results.db', help="Database path")
+    parser.add_argument('--archive', default='archive', help="Archive partition directory")
+    parser.add_argument('--out', default='reports', help="Output directory")
+    parser.add_argument('--workers', type=int, default=None, help="Render processes")
+    parser.add_argument('--force', action='store_true', help="Re-render unchanged sessions too")
+    args = parser.parse_args()
+
+    summary = generate_reports(args.db, args.out, args.archive, args.workers, args.force)
+    print(f"{summary['sessions']} sessions: {summary['rendered']} rendered, "
+          f"{summary['unchanged']} unchanged, {summary['removed']} removed")
+
+
+if __name__ == "__main__":
+    main()
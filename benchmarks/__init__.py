@@ -0,0 +1,4 @@
+"""Benchmarks for the logger's hot paths.
+
+Run ``python -m benchmarks.run_benchmarks --help`` from the repository root.
+"""
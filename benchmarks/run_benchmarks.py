@@ -0,0 +1,285 @@
+"""Time the logger's hot paths against synthetic databases.
+
+Each size gets a cached fixture database (generated once per size and seed).
+The app runs headless against a copy of it and every benchmark reports the
+median and minimum of several runs. Results are written as JSON and, when a
+baseline exists, compared against it; regressions beyond the threshold make
+the run exit non-zero. Batch reports run headless; the UI benchmarks need a
+display and are skipped without one, so a baseline saved on a headless
+machine only covers the former.
+
+    python -m benchmarks.run_benchmarks --sizes 1k 100k
+    python -m benchmarks.run_benchmarks --sizes 1k --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from batch_reports import MANIFEST_NAME, generate_reports  # noqa: E402
+from benchmarks.synthetic import SIZES, populate_database  # noqa: E402
+from money import settle  # noqa: E402
+from schema_migrations import SCHEMA_VERSION  # noqa: E402
+from session_buffer import Round  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+CACHE_DIR = os.path.join(BENCH_DIR, '.cache')
+
+CHART_TYPES = ['balance', 'profit_dist', 'win_loss', 'heatmap', 'multiplier', 'daily', 'risk',
+               'calendar', 'hour_of_day']
+
+
+def fixture_path(size_name, seed, focus_rounds):
+    """Build (once) and return the cached fixture database for a size"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Fixtures from an older schema are rebuilt rather than reused
+    stem = os.path.join(CACHE_DIR, f"fixture_{size_name}_{seed}_{focus_rounds}_v{SCHEMA_VERSION}")
+    db_path = stem + '.db'
+    if not os.path.exists(db_path):
+        from bomb_game_logger import GameResultLogger
+
+        print(f"Generating {size_name} fixture...", flush=True)
+        build_path = db_path + '.building'
+        # init_database only needs a db_path attribute
+        GameResultLogger.init_database(SimpleNamespace(db_path=build_path))
+        populate_database(build_path, SIZES[size_name], journal_path=stem + '.ndjson.building',
+                          seed=seed, focus_session_rounds=focus_rounds)
+        os.replace(stem + '.ndjson.building', stem + '.ndjson')
+        os.replace(build_path, db_path)
+    return db_path, stem + '.ndjson'
+
+
+def time_call(func, repeat, setup=None):
+    """Return timings in milliseconds for repeat calls of func"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'runs': len(timings)
+    }
+
+
+def make_round(app, round_number):
+    """A round as log_result would build it, settled in whole money units"""
+    bet = 0.1
+    profile = app.active_profile()
+    multiplier = profile.multiplier(3)
+    winnings, profit, balance = settle(bet, multiplier, True, app.current_balance)
+    return Round(
+        timestamp=datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+        session_id=app.current_session,
+        round_number=round_number,
+        bet_amount=bet,
+        strategy='moderate',
+        result='win',
+        safe_picks=3,
+        multiplier=multiplier,
+        winnings=winnings,
+        profit=profit,
+        ending_balance=balance,
+        game_profile=profile.name,
+        logged_mono_ns=time.monotonic_ns()
+    )
+
+
+def run_benchmarks(size_name, benchmarks, repeat, only, results):
+    """Time each (name, func, setup) benchmark into results, recording failures"""
+    for name, func, setup in benchmarks:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        try:
+            timings = time_call(func, repeat, setup)
+            results[name] = summarize(timings)
+            print(f"  {size_name:>5} {name:<28} {results[name]['median_ms']:>10.2f} ms", flush=True)
+        except Exception as e:
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+            print(f"  {size_name:>5} {name:<28} ERROR {e}", flush=True)
+            traceback.print_exc(limit=1)
+
+
+def run_size(size_name, repeat, seed, focus_rounds, only):
+    """Run every benchmark against one fixture size"""
+    import tkinter as tk
+    import matplotlib.pyplot as plt
+    from bomb_game_logger import GameResultLogger
+
+    fixture_db, fixture_journal = fixture_path(size_name, seed, focus_rounds)
+    workdir = tempfile.mkdtemp(prefix='bench_')
+    cwd = os.getcwd()
+    results = {}
+
+    try:
+        # The app resolves its database, journal and backups relative to cwd
+        shutil.copy(fixture_db, os.path.join(workdir, 'bomb_game_results.db'))
+        shutil.copy(fixture_journal, os.path.join(workdir, 'bomb_game_events.ndjson'))
+        os.chdir(workdir)
+
+        # Batch reports read the database directly, so they run without a display
+        reports_dir = os.path.join(workdir, 'reports')
+
+        def write_reports(force=False):
+            generate_reports('bomb_game_results.db', reports_dir, 'archive', force=force)
+
+        def prime_reports():
+            if not os.path.exists(os.path.join(reports_dir, MANIFEST_NAME)):
+                write_reports()
+
+        run_benchmarks(size_name, [
+            ('batch_reports_full', lambda: write_reports(force=True), None),
+            ('batch_reports_unchanged', write_reports, prime_reports),
+        ], repeat, only, results)
+
+        try:
+            root = tk.Tk()
+        except tk.TclError as e:
+            print(f"  {size_name:>5} UI benchmarks skipped: {e}", flush=True)
+            return results
+        root.withdraw()
+        app = GameResultLogger(root)
+        app.current_session = 'session_benchmark_focus'
+
+        next_round = [app.get_next_round_number()]
+
+        def log_round():
+            round_data = make_round(app, next_round[0])
+            app.save_round(round_data)
+            app.current_balance = round_data.ending_balance
+            next_round[0] += 1
+
+        def render_wall():
+            # Done once the last tile is blitted and polling stops
+            app.generate_chart_wall()
+            while app.wall_polling:
+                root.update()
+                time.sleep(0.005)
+
+        benchmarks = [
+            ('log_result_db', log_round, None),
+            ('refresh_dashboard', app.refresh_dashboard, None),
+            ('update_session_stats', app.update_session_stats, None),
+            ('update_summary_analysis', app.update_summary_analysis, None),
+            ('update_performance_metrics', app.update_performance_metrics, None),
+            ('update_pattern_display', app.update_pattern_display, None),
+            ('update_strategy_analysis', app.update_strategy_analysis, None),
+            ('update_timing_analysis', app.update_timing_analysis, None),
+            ('generate_report_content', app.generate_report_content, None),
+            ('export_session_csv', lambda: app.write_session_csv(os.path.join(workdir, 's.csv')), None),
+            ('export_all_csv', lambda: app.write_all_csv(os.path.join(workdir, 'a.csv')), None),
+            ('chart_wall', render_wall, None),
+        ]
+        for chart_type in CHART_TYPES:
+            def render(chart_type=chart_type):
+                app.chart_type_var.set(chart_type)
+                app.generate_chart()
+                root.update_idletasks()
+            benchmarks.append((f'chart_{chart_type}', render, lambda: plt.close('all')))
+        run_benchmarks(size_name, benchmarks, repeat, only, results)
+
+        plt.close('all')
+        app.journal.close()
+        root.destroy()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions relative to the baseline"""
+    regressions = []
+    for size_name, benches in results.items():
+        for name, current in benches.items():
+            previous = baseline.get('results', {}).get(size_name, {}).get(name)
+            if not previous or 'median_ms' not in previous or 'median_ms' not in current:
+                continue
+            ratio = current['median_ms'] / max(previous['median_ms'], 1e-6)
+            current['baseline_ms'] = previous['median_ms']
+            current['ratio'] = round(ratio, 3)
+            if ratio > 1 + threshold:
+                regressions.append((size_name, name, previous['median_ms'],
+                                    current['median_ms'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the logger's hot paths")
+    parser.add_argument('--sizes', nargs='+', default=['1k'], choices=sorted(SIZES),
+                        help="Fixture sizes to run")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per benchmark")
+    parser.add_argument('--seed', type=int, default=42, help="Synthetic data seed")
+    parser.add_argument('--focus-rounds', type=int, default=2000,
+                        help="Rounds in the session treated as current")
+    parser.add_argument('--only', nargs='*', help="Run benchmarks whose name contains any of these")
+    parser.add_argument('--output', default='bench_results.json', help="Results JSON path")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed slowdown before a result counts as a regression")
+    args = parser.parse_args()
+
+    results = {}
+    for size_name in args.sizes:
+        results[size_name] = run_size(size_name, args.repeat, args.seed,
+                                      args.focus_rounds, args.only)
+
+    report = {
+        'meta': {
+            'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'focus_rounds': args.focus_rounds
+        },
+        'results': results
+    }
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for size_name, name, before, after, ratio in regressions:
+            print(f"  {size_name:>5} {name:<28} {before:.2f} ms -> {after:.2f} ms ({ratio:.2f}x)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Synthetic round generator for benchmarks.
+
+Sessions follow the 25-tile/5-bomb survival model: each strategy picks a
+target number of safe picks, the round is a win only if every pick survives,
+and wins pay the matching entry of the multiplier table.
+"""
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+from event_journal import (ROUND_FIELDS, EventJournal, init_journal_state,
+                           rebuild_session_summary, round_row, set_applied_sequence)
+from game_profiles import CLASSIC_MULTIPLIERS, DEFAULT_PROFILE
+from money import settle, to_sigils, to_units
+from strategy_ab import rebuild_strategy_stats
+
+TILES = 25
+BOMBS = 5
+
+# (strategy, weight in the mix, range of target safe picks)
+STRATEGY_MIX = [
+    ('conservative', 0.35, (1, 3)),
+    ('moderate', 0.40, (3, 6)),
+    ('aggressive', 0.20, (6, 10)),
+    ('max_risk', 0.05, (10, 17)),
+]
+
+SIZES = {'1k': 1000, '100k': 100000, '10m': 10000000}
+
+
+def default_multipliers():
+    """Multiplier table of the classic profile"""
+    return CLASSIC_MULTIPLIERS
+
+
+def play_round(rng, target_picks):
+    """Return the number of safe picks survived before stopping or hitting a bomb"""
+    for pick in range(target_picks):
+        safe_left = TILES - BOMBS - pick
+        if rng.random() >= safe_left / (TILES - pick):
+            return pick
+    return target_picks
+
+
+def generate_rounds(total, seed=42, multipliers=None, session_rounds=(50, 500),
+                    focus_session_rounds=0, start=None):
+    """Yield round dicts with ROUND_FIELDS keys, session by session"""
+    rng = random.Random(seed)
+    multipliers = multipliers or default_multipliers()
+    strategies = [s for s, _, _ in STRATEGY_MIX]
+    weights = [w for _, w, _ in STRATEGY_MIX]
+    ranges = {s: r for s, _, r in STRATEGY_MIX}
+
+    clock = start or datetime(2024, 1, 1, 18, 0, 0)
+    produced = 0
+    session_index = 0
+
+    while produced < total:
+        remaining = total - produced
+        if focus_session_rounds and remaining <= focus_session_rounds:
+            # The final session is the one benchmarks treat as current
+            size = remaining
+            session_id = 'session_benchmark_focus'
+        else:
+            size = min(rng.randint(*session_rounds), remaining - focus_session_rounds
+                       if focus_session_rounds else remaining)
+            session_id = f"session_synthetic_{session_index:07d}"
+        session_index += 1
+
+        balance = 1.34
+        strategy = rng.choices(strategies, weights)[0]
+        for round_number in range(1, size + 1):
+            # Players drift between strategies now and then
+            if rng.random() < 0.05:
+                strategy = rng.choices(strategies, weights)[0]
+
+            bet = max(0.01, round(balance * rng.choice((0.02, 0.05, 0.1)), 2))
+            target = rng.randint(*ranges[strategy])
+            survived = play_round(rng, target)
+
+            if survived == target:
+                multiplier = multipliers[target - 1]
+                result = 'win'
+            else:
+                multiplier = 0.0
+                result = 'loss'
+            winnings, profit, balance = settle(bet, multiplier, result == 'win', balance)
+            if balance < 0.05:
+                balance = 1.34  # rebuy
+
+            gap = rng.randint(5, 90)
+            clock += timedelta(seconds=gap)
+            yield {
+                'timestamp': clock.strftime('%Y-%m-%d %H:%M:%S'),
+                'session_id': session_id,
+                'round_number': round_number,
+                'bet_amount': bet,
+                'strategy': strategy,
+                'result': result,
+                'safe_picks': survived if result == 'loss' else target,
+                'multiplier': multiplier,
+                'winnings': winnings,
+                'profit': profit,
+                'ending_balance': balance,
+                'bomb_positions': '',
+                'notes': '',
+                'play_duration': rng.randint(3000, gap * 1000),
+                'game_profile': DEFAULT_PROFILE,
+            }
+        produced += size
+        # Sessions are spread over evenings
+        clock += timedelta(hours=rng.randint(4, 30))
+
+
+def populate_database(db_path, total, journal_path=None, seed=42, batch_size=20000, **kwargs):
+    """Fill an initialized database (and optionally a journal) with synthetic rounds"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA synchronous = OFF')
+    journal = EventJournal(journal_path) if journal_path else None
+    patterns = {}
+    batch = []
+
+    def flush():
+        conn.executemany(f'''
+            INSERT INTO game_results ({', '.join(ROUND_FIELDS)})
+            VALUES ({', '.join('?' * len(ROUND_FIELDS))})
+        ''', [round_row(r) for r in batch])
+        if journal:
+            journal.append_many('round', batch)
+        batch.clear()
+
+    try:
+        with conn:
+            for row in generate_rounds(total, seed=seed, **kwargs):
+                batch.append(row)
+                stats = patterns.setdefault(row['safe_picks'], [0, 0, 0])
+                stats[0] += 1
+                stats[1] += row['result'] == 'win'
+                stats[2] += to_units(row['profit'])
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+
+            conn.execute('DELETE FROM pattern_analysis')
+            conn.executemany('''
+                INSERT INTO pattern_analysis
+                (safe_pick_count, game_profile, occurrence_count, win_count, avg_profit,
+                 total_profit, last_updated)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', [(picks, DEFAULT_PROFILE, count, wins, to_sigils(profit) / count, profit)
+                  for picks, (count, wins, profit) in sorted(patterns.items())])
+            rebuild_session_summary(conn)
+            rebuild_strategy_stats(conn)
+
+            if journal:
+                init_journal_state(conn)
+                set_applied_sequence(conn, journal.seq)
+    finally:
+        if journal:
+            journal.close()
+        conn.close()
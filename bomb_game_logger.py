@@ -1,22 +1,75 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, scrolledtext
+from tkinter import ttk, messagebox, filedialog, scrolledtext, simpledialog
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import csv
+import heapq
 import os
+import queue
+import threading
+import time
 from collections import defaultdict
+from itertools import islice
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import seaborn as sns
 from PIL import Image, ImageTk
+from event_journal import (ROUND_FIELDS, EventJournal, apply_pattern, bootstrap_journal,
+                           init_journal_state, insert_round, recover_journal,
+                           replay_journal, set_applied_sequence)
+from db_backup import SnapshotStore
+from game_profiles import (CLASSIC_MULTIPLIERS, DEFAULT_PROFILE, GameProfile,
+                           fair_multipliers, load_profiles, save_profile)
+from batch_reports import generate_reports
+from change_feed import ChangeFeed
+from round_archive import (archive_rounds, init_archive_index, open_scope, prune_archived,
+                           scope_batches)
+from history_pager import PAGE_COLUMNS, HistoryPager, init_sort_indexes
+from refresh_scheduler import RefreshScheduler
+from round_timing import RoundTimer, hour_profile, pace_profit, session_pace
+from session_buffer import (PROFILE_CHARS, STRATEGY_CHARS, Round, SessionBuffer,
+                            check_name_length)
+from time_series import FREQUENCIES, bucket_query, from_buckets, merge_buckets, resample_rounds
+from charts import (balance_figure, calendar_figure, daily_figure, heatmap_figure, hour_figure,
+                    multiplier_figure, profit_distribution_figure, risk_figure, win_loss_figure)
+from chart_wall import SERIES_FREQUENCIES, WALL_COLUMNS, ChartWall
+from query_cache import QueryCache
+from money import MONEY_FIELDS, settle, sigils, to_sigils, to_units
+from tree_sync import TreeSync
+from kelly import KELLY_FRACTIONS, KellyOptimizer
+from risk_engine import TAIL_LEVEL, RiskEngine
+from bootstrap import BootstrapEngine, longest_run
+from tilt_detector import TiltDetector
+from strategy_ab import (PERMUTATION_MAX_ROUNDS, apply_strategy_round, by_profile,
+                         compare_strategies, ev_significance, init_sequential_tests,
+                         load_sequential, load_strategy_stats, profile_permutation_tests)
+from schema_migrations import SCHEMA_VERSION, migrate
+from instrumentation import (ProfileCapture, TimedConnection, database_stats,
+                             metrics, timed)
 
 class GameResultLogger:
+    # Game constants (the classic profile; other variants come from game_profiles)
+    MULTIPLIERS = list(CLASSIC_MULTIPLIERS)
+    
+    # Rapid entry hotkeys: key -> (result, safe picks)
+    RAPID_KEYS = {
+        '1': ('win', 1), '2': ('win', 2), '3': ('win', 3), '4': ('win', 4), '5': ('win', 5),
+        '6': ('win', 6), '7': ('win', 7), '8': ('win', 8), '9': ('win', 9), '0': ('win', 10),
+        'q': ('loss', 0), 'w': ('loss', 1), 'e': ('loss', 2), 'r': ('loss', 3), 't': ('loss', 4),
+        'y': ('loss', 5), 'u': ('loss', 6), 'i': ('loss', 7), 'o': ('loss', 8), 'p': ('loss', 9)
+    }
+    RAPID_UNDO_KEYS = ('BackSpace', 'z')
+    RAPID_COMMIT_ROUNDS = 10
+    RAPID_COMMIT_SECONDS = 5
+    
+    # Names of the shared per-session aggregate row, in SELECT order
+    AGGREGATE_COLUMNS = ('total', 'wins', 'net_profit', 'avg_profit', 'sum_sq_profit',
+                         'min_profit', 'max_profit', 'min_balance', 'max_balance',
+                         'avg_safe_picks', 'total_bet')
+    
     def __init__(self, root):
         self.root = root
-        self.root.title("Bomb Game Result Logger & Analyzer")
         self.root.geometry("1400x900")
         
         # Set style
@@ -24,15 +77,74 @@ class GameResultLogger:
         
         # Database setup
         self.db_path = 'bomb_game_results.db'
-        self.init_database()
+        self.init_database(progress=self.show_migration_progress)
+        self.root.title("Bomb Game Result Logger & Analyzer")
+        
+        # Game variants; their lookup tables are built once here, not per query
+        conn = self.connect()
+        self.profiles = load_profiles(conn)
+        conn.close()
         
-        # Game constants
-        self.MULTIPLIERS = [1.18, 1.49, 1.9, 2.46, 3.23, 4.31, 5.7, 7.89, 11.19, 16.01,
-                            24.01, 37.36, 60.37, 92, 168, 337, 664, 2000, 2000, 2000]
+        # Rounds older than the archive threshold live in monthly partitions
+        self.archive_dir = 'archive'
+        
+        # Shown in the status bar once the window exists
+        self.startup_messages = []
+        
+        # Event journal: every round is journaled before it reaches the DB
+        self.journal_path = 'bomb_game_events.ndjson'
+        self.init_journal()
+        
+        # Snapshots run on a worker thread and report back through a queue
+        self.snapshots = SnapshotStore('backups')
+        self.backup_thread = None
+        self.backup_queue = queue.Queue()
+        
+        # Batch reports also run off the UI thread
+        self.reports_dir = 'reports'
+        self.report_thread = None
+        self.report_queue = queue.Queue()
+        
+        # Bumped by every write; derived results are cached per version
+        self.data_version = 0
+        self.kelly = KellyOptimizer()
+        self.risk = RiskEngine()
+        self.bootstrap = BootstrapEngine()
+        self.bootstrap.warm()
+        self.bootstrap_polling = False
+        # Permutation tests of the Strategies pane, per (session, scope, data version)
+        self.permutation_key = None
+        self.permutation_job = None
+        self.permutation_results = None
+        self.chart_wall = ChartWall()
+        self.wall_tiles = {}
+        self.wall_started = None
+        self.wall_polling = False
+        self.query_cache = QueryCache()
+        
+        # Committed rounds are pushed to local subscribers (Unix socket)
+        self.change_feed = ChangeFeed(self.db_path)
+        try:
+            self.change_feed.start()
+        except OSError as e:
+            self.startup_messages.append(f"Change feed unavailable: {e}")
         
         # Current session
         self.current_session = datetime.now().strftime("session_%Y%m%d_%H%M%S")
         self.current_balance = 1.34
+        self.tilt = TiltDetector(self.current_session)
+        
+        # The current session's rounds, loaded on first use and appended per commit
+        self.session_rounds = SessionBuffer()
+        
+        # Times each round from the first form interaction to its log
+        self.round_timer = RoundTimer()
+        self.round_timer_after_id = None
+        self.form_resetting = False
+        
+        # Rapid entry rounds wait here until the next batch commit
+        self.rapid_buffer = []
+        self.rapid_after_id = None
         
         # Colors for UI
         self.colors = {
@@ -47,9 +159,12 @@ class GameResultLogger:
         # Create GUI
         self.create_widgets()
         self.load_initial_data()
+        if self.startup_messages:
+            self.status_var.set("; ".join(self.startup_messages))
         
         # Center window
         self.center_window()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def center_window(self):
         """Center the window on screen"""
@@ -60,29 +175,49 @@ class GameResultLogger:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry(f'{width}x{height}+{x}+{y}')
     
-    def init_database(self):
+    def on_close(self):
+        """Flush pending journal events and close the window"""
+        self.commit_rapid_buffer()
+        self.bootstrap.shutdown()
+        self.chart_wall.shutdown()
+        self.profile_capture.stop()
+        self.journal.close()
+        self.change_feed.close()
+        self.root.destroy()
+    
+    def connect(self):
+        """Open an instrumented connection to the results database"""
+        return sqlite3.connect(self.db_path, factory=TimedConnection)
+    
+    def init_database(self, progress=None):
         """Initialize SQLite database with advanced analytics"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        # Main game results table
-        cursor.execute('''
+        # WAL (persistent) lets readers such as http_api run alongside our writes
+        cursor.execute('PRAGMA journal_mode=WAL')
+        
+        # Main game results table; money columns hold integer units (see money.py)
+        cursor.execute(f'''
         CREATE TABLE IF NOT EXISTS game_results (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
             session_id TEXT,
             round_number INTEGER,
-            bet_amount REAL,
+            bet_amount INTEGER,
             strategy TEXT,
             result TEXT,
             safe_picks INTEGER,
             multiplier REAL,
-            winnings REAL,
-            profit REAL,
-            ending_balance REAL,
+            winnings INTEGER,
+            profit INTEGER,
+            ending_balance INTEGER,
             bomb_positions TEXT,
             notes TEXT,
-            play_duration INTEGER
+            play_duration INTEGER,
+            game_profile TEXT DEFAULT '{DEFAULT_PROFILE}',
+            started_mono_ns INTEGER,
+            logged_mono_ns INTEGER
         )
         ''')
         
@@ -108,20 +243,59 @@ class GameResultLogger:
         ''')
         
         # Pattern analysis table
-        cursor.execute('''
+        cursor.execute(f'''
         CREATE TABLE IF NOT EXISTS pattern_analysis (
             pattern_id INTEGER PRIMARY KEY AUTOINCREMENT,
             safe_pick_count INTEGER,
             occurrence_count INTEGER,
             win_count INTEGER,
             avg_profit REAL,
-            total_profit REAL,
-            last_updated DATETIME
+            total_profit INTEGER,
+            last_updated DATETIME,
+            game_profile TEXT DEFAULT '{DEFAULT_PROFILE}'
         )
         ''')
         
+        # Round lookups by session are the hot path for every view
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_results_session_round
+        ON game_results (session_id, round_number)
+        ''')
+        
+        # History browsing across sessions pages through time order
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_results_timestamp
+        ON game_results (timestamp, session_id, round_number)
+        ''')
+        init_sort_indexes(conn)
+        
+        init_journal_state(conn)
+        init_archive_index(conn)
+        init_sequential_tests(conn)
         conn.commit()
-        conn.close()
+        
+        # Bring databases from older versions up to the current schema
+        try:
+            migrate(conn, progress)
+        finally:
+            conn.close()
+    
+    def show_migration_progress(self, description, done, total):
+        """Show schema upgrade progress in the title bar before the UI exists"""
+        if total:
+            self.root.title(f"Upgrading database: {description} ({done / total:.0%})")
+        else:
+            self.root.title(f"Upgrading database: {description}")
+        self.root.update()
+    
+    def init_journal(self):
+        """Open the event journal and apply any rounds lost in a crash"""
+        recovered = recover_journal(self.journal_path, self.db_path)
+        self.journal = EventJournal(self.journal_path)
+        bootstrap_journal(self.journal, self.db_path)
+        
+        if recovered:
+            self.startup_messages.append(f"Recovered {recovered} round(s) from the event journal")
     
     def create_widgets(self):
         """Create all GUI widgets"""
@@ -135,9 +309,12 @@ class GameResultLogger:
         # Create tabs
         self.create_dashboard_tab()
         self.create_logger_tab()
+        self.create_history_tab()
         self.create_analytics_tab()
         self.create_charts_tab()
         self.create_import_tab()
+        self.create_diagnostics_tab()
+        self.register_views()
         
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
@@ -145,6 +322,30 @@ class GameResultLogger:
                               relief=tk.SUNKEN, anchor=tk.W, padding=5)
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
     
+    def register_views(self):
+        """Register refreshable views with the tabs that show them"""
+        self.refresh = RefreshScheduler(self.root)
+        
+        self.refresh.register('dashboard', self.refresh_dashboard,
+                              (self.notebook, self.dashboard_frame))
+        self.refresh.register('session_stats', self.update_session_stats,
+                              (self.notebook, self.logger_frame))
+        
+        analytics = (self.notebook, self.analytics_frame)
+        self.refresh.register('summary', self.update_summary_analysis,
+                              analytics, (self.analytics_notebook, self.summary_tab))
+        self.refresh.register('performance', self.update_performance_metrics,
+                              analytics, (self.analytics_notebook, self.perf_tab))
+        self.refresh.register('patterns', self.update_pattern_display,
+                              analytics, (self.analytics_notebook, self.pattern_tab))
+        self.refresh.register('strategies', self.update_strategy_analysis,
+                              analytics, (self.analytics_notebook, self.strategy_tab))
+        self.refresh.register('timing', self.update_timing_analysis,
+                              analytics, (self.analytics_notebook, self.timing_tab))
+        
+        self.refresh.register('diagnostics', self.refresh_diagnostics,
+                              (self.notebook, self.diagnostics_frame))
+    
     def configure_styles(self):
         """Configure ttk styles"""
         style = ttk.Style()
@@ -190,6 +391,18 @@ class GameResultLogger:
             card = self.create_stat_card(stats_frame, title, value, i)
             self.stat_cards[key] = card
         
+        # Behavior alerts from the tilt detector
+        alerts_frame = ttk.LabelFrame(self.dashboard_frame, text="Behavior Alerts", padding=10)
+        alerts_frame.pack(fill='x', padx=10, pady=(0, 10))
+        
+        self.tilt_state_label = ttk.Label(alerts_frame, text="State: CALM",
+                                          font=('Arial', 11, 'bold'),
+                                          foreground=self.colors['win'])
+        self.tilt_state_label.pack(anchor=tk.W)
+        
+        self.alerts_listbox = tk.Listbox(alerts_frame, height=4)
+        self.alerts_listbox.pack(fill='x', pady=(5, 0))
+        
         # Recent activity
         recent_frame = ttk.LabelFrame(self.dashboard_frame, text="Recent Activity", padding=10)
         recent_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -214,6 +427,11 @@ class GameResultLogger:
         
         self.recent_tree.pack(fill='both', expand=True, side=tk.LEFT)
         
+        # Configure tags for coloring
+        self.recent_tree.tag_configure('win', background='#e8f5e9')
+        self.recent_tree.tag_configure('loss', background='#ffebee')
+        self.recent_sync = TreeSync(self.recent_tree)
+        
         # Add scrollbar
         scrollbar = ttk.Scrollbar(recent_frame, orient=tk.VERTICAL, command=self.recent_tree.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -283,6 +501,20 @@ class GameResultLogger:
                      values=strategies, state='readonly', width=20).grid(row=row, column=1, pady=10, padx=10)
         row += 1
         
+        # Game profile
+        ttk.Label(form_frame, text="Game Profile:").grid(row=row, column=0, sticky='w', pady=10)
+        self.game_profile_var = tk.StringVar(value=DEFAULT_PROFILE)
+        profile_frame = ttk.Frame(form_frame)
+        profile_frame.grid(row=row, column=1, pady=10, padx=10, sticky='w')
+        
+        self.profile_combo = ttk.Combobox(profile_frame, textvariable=self.game_profile_var,
+                                          values=list(self.profiles), state='readonly', width=14)
+        self.profile_combo.pack(side=tk.LEFT)
+        self.profile_combo.bind('<<ComboboxSelected>>', lambda e: self.on_profile_selected())
+        ttk.Button(profile_frame, text="New...",
+                  command=self.add_profile).pack(side=tk.LEFT, padx=5)
+        row += 1
+        
         # Result
         ttk.Label(form_frame, text="Result:").grid(row=row, column=0, sticky='w', pady=10)
         self.result_var = tk.StringVar(value='win')
@@ -296,9 +528,12 @@ class GameResultLogger:
         safe_picks_frame = ttk.Frame(form_frame)
         safe_picks_frame.grid(row=row, column=1, pady=10, padx=10, sticky='w')
         
-        ttk.Spinbox(safe_picks_frame, from_=0, to=20, textvariable=self.safe_picks_var, 
-                   width=5).pack(side=tk.LEFT)
-        ttk.Label(safe_picks_frame, text=" (0-20)").pack(side=tk.LEFT, padx=5)
+        max_picks = self.active_profile().max_picks
+        self.safe_picks_spinbox = ttk.Spinbox(safe_picks_frame, from_=0, to=max_picks,
+                                              textvariable=self.safe_picks_var, width=5)
+        self.safe_picks_spinbox.pack(side=tk.LEFT)
+        self.safe_picks_range_var = tk.StringVar(value=f" (0-{max_picks})")
+        ttk.Label(safe_picks_frame, textvariable=self.safe_picks_range_var).pack(side=tk.LEFT, padx=5)
         row += 1
         
         # Multiplier
@@ -334,6 +569,19 @@ class GameResultLogger:
                   command=self.calculate_result).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Clear", 
                   command=self.clear_form).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Start Round",
+                  command=lambda: self.start_round_timer(restart=True)).pack(side=tk.LEFT, padx=5)
+        row += 1
+        
+        self.round_timer_var = tk.StringVar(value="Round timer: idle")
+        ttk.Label(form_frame, textvariable=self.round_timer_var,
+                 foreground='gray').grid(row=row, column=0, columnspan=2)
+        
+        # Touching any field starts the clock for the round being entered
+        for var in (self.bet_var, self.strategy_var, self.game_profile_var, self.result_var,
+                    self.safe_picks_var, self.multiplier_var, self.bomb_positions_var):
+            var.trace_add('write', lambda *args: self.on_form_interaction())
+        self.notes_text.bind('<Key>', lambda e: self.on_form_interaction(), add='+')
         
         # Right side - Results display
         results_frame = ttk.LabelFrame(right_frame, text="Calculation Results", padding=15)
@@ -372,6 +620,28 @@ class GameResultLogger:
                            self.apply_preset(b, r, p, m))
             btn.grid(row=i//2, column=i%2, padx=5, pady=5, sticky='ew')
         
+        # Rapid entry mode
+        rapid_frame = ttk.LabelFrame(right_frame, text="Rapid Entry", padding=10)
+        rapid_frame.pack(fill='x', pady=10)
+        
+        self.rapid_mode_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(rapid_frame, text="Rapid entry mode (hotkeys)",
+                       variable=self.rapid_mode_var).grid(row=0, column=0, sticky='w')
+        ttk.Button(rapid_frame, text="Undo Last",
+                  command=self.undo_rapid_entry).grid(row=0, column=1, padx=5)
+        ttk.Button(rapid_frame, text="Commit Now",
+                  command=self.commit_rapid_buffer).grid(row=0, column=2, padx=5)
+        
+        ttk.Label(rapid_frame, text="Win: 1-9, 0 = 10 picks   Loss: q-p = 0-9 picks   "
+                                    "Undo: Backspace/z\nBet and strategy come from the form",
+                  foreground='gray').grid(row=1, column=0, columnspan=3, sticky='w', pady=5)
+        
+        self.rapid_status_var = tk.StringVar(value="0 rounds pending")
+        ttk.Label(rapid_frame, textvariable=self.rapid_status_var,
+                  font=('Arial', 10, 'bold')).grid(row=2, column=0, columnspan=3, sticky='w')
+        
+        self.root.bind('<Key>', self.handle_rapid_key)
+        
         # Session stats
         stats_frame = ttk.LabelFrame(right_frame, text="Session Statistics", padding=10)
         stats_frame.pack(fill='both', expand=True, pady=10)
@@ -379,46 +649,156 @@ class GameResultLogger:
         self.session_stats_text = scrolledtext.ScrolledText(stats_frame, height=10)
         self.session_stats_text.pack(fill='both', expand=True)
     
+    def create_history_tab(self):
+        """Create history tab for browsing every logged round"""
+        self.history_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.history_frame, text='History')
+        
+        # Filters
+        filter_frame = ttk.LabelFrame(self.history_frame, text="Filters", padding=10)
+        filter_frame.pack(fill='x', padx=10, pady=10)
+        
+        ttk.Label(filter_frame, text="Session:").pack(side=tk.LEFT)
+        self.history_session_var = tk.StringVar(value='Current')
+        ttk.Combobox(filter_frame, textvariable=self.history_session_var,
+                     values=['Current', 'All'], width=28).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(filter_frame, text="Strategy:").pack(side=tk.LEFT, padx=(10, 0))
+        self.history_strategy_var = tk.StringVar(value='All')
+        ttk.Combobox(filter_frame, textvariable=self.history_strategy_var,
+                     values=['All', 'conservative', 'moderate', 'aggressive', 'max_risk'],
+                     state='readonly', width=14).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(filter_frame, text="Result:").pack(side=tk.LEFT, padx=(10, 0))
+        self.history_result_var = tk.StringVar(value='All')
+        ttk.Combobox(filter_frame, textvariable=self.history_result_var,
+                     values=['All', 'win', 'loss'], state='readonly', width=8).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(filter_frame, text="Safe Picks:").pack(side=tk.LEFT, padx=(10, 0))
+        self.history_picks_var = tk.StringVar(value='')
+        ttk.Entry(filter_frame, textvariable=self.history_picks_var, width=5).pack(side=tk.LEFT, padx=5)
+        
+        self.history_archive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filter_frame, text="Include archive",
+                        variable=self.history_archive_var).pack(side=tk.LEFT, padx=10)
+        
+        ttk.Button(filter_frame, text="Apply", 
+                  command=self.load_history).pack(side=tk.LEFT, padx=10)
+        
+        # Rounds table
+        table_frame = ttk.Frame(self.history_frame)
+        table_frame.pack(fill='both', expand=True, padx=10)
+        
+        self.history_headings = {
+            'session_id': 'Session',
+            'round_number': 'Round',
+            'timestamp': 'Time',
+            'bet_amount': 'Bet',
+            'strategy': 'Strategy',
+            'result': 'Result',
+            'safe_picks': 'Safe Picks',
+            'multiplier': 'Multiplier',
+            'profit': 'Profit',
+            'ending_balance': 'Balance'
+        }
+        
+        self.history_tree = ttk.Treeview(table_frame, columns=PAGE_COLUMNS, show='headings', height=20)
+        for col in PAGE_COLUMNS:
+            self.history_tree.heading(col, text=self.history_headings[col],
+                                      command=lambda c=col: self.sort_history(c))
+            self.history_tree.column(col, width=180 if col == 'session_id' else 100)
+        
+        self.history_tree.tag_configure('win', background='#e8f5e9')
+        self.history_tree.tag_configure('loss', background='#ffebee')
+        self.history_tree.pack(fill='both', expand=True, side=tk.LEFT)
+        
+        # Scrolling past either end of the loaded window pulls in the next page
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.scroll_history)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.history_tree.configure(yscrollcommand=scrollbar.set)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>', '<KeyRelease-Up>',
+                         '<KeyRelease-Down>', '<KeyRelease-Prior>', '<KeyRelease-Next>'):
+            self.history_tree.bind(sequence, lambda e: self.root.after_idle(self.check_history_edges),
+                                   add='+')
+        
+        # Navigation
+        nav_frame = ttk.Frame(self.history_frame)
+        nav_frame.pack(fill='x', padx=10, pady=10)
+        
+        ttk.Button(nav_frame, text="|<", width=4,
+                  command=self.history_first).pack(side=tk.LEFT, padx=2)
+        ttk.Button(nav_frame, text="<", width=4,
+                  command=self.history_prev).pack(side=tk.LEFT, padx=2)
+        ttk.Button(nav_frame, text=">", width=4,
+                  command=self.history_next).pack(side=tk.LEFT, padx=2)
+        ttk.Button(nav_frame, text=">|", width=4,
+                  command=self.history_last).pack(side=tk.LEFT, padx=2)
+        
+        self.history_pos_var = tk.StringVar(value="No rounds loaded")
+        ttk.Label(nav_frame, textvariable=self.history_pos_var).pack(side=tk.LEFT, padx=20)
+        
+        self.history_pager = None
+        self.history_sort = ('round_number', False)
+        self.history_pages = []
+        self.history_offset = 0
+        self.history_window = 3  # pages kept in the Treeview at once
+    
     def create_analytics_tab(self):
         """Create analytics tab with detailed statistics"""
         self.analytics_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.analytics_frame, text='Analytics')
         
+        # Profile scope shared by the analytics panes and charts
+        scope_frame = ttk.Frame(self.analytics_frame)
+        scope_frame.pack(fill='x', padx=10, pady=(10, 0))
+        
+        ttk.Label(scope_frame, text="Game Profile:").pack(side=tk.LEFT)
+        self.analytics_profile_var = tk.StringVar(value='All')
+        self.analytics_profile_combo = ttk.Combobox(scope_frame, textvariable=self.analytics_profile_var,
+                                                    values=['All'] + list(self.profiles),
+                                                    state='readonly', width=18)
+        self.analytics_profile_combo.pack(side=tk.LEFT, padx=5)
+        self.analytics_profile_combo.bind(
+            '<<ComboboxSelected>>',
+            lambda e: self.refresh.mark_dirty('summary', 'performance', 'patterns', 'strategies',
+                                              'timing'))
+        
         # Create notebook for analytics subtabs
-        analytics_notebook = ttk.Notebook(self.analytics_frame)
-        analytics_notebook.pack(fill='both', expand=True, padx=10, pady=10)
+        self.analytics_notebook = ttk.Notebook(self.analytics_frame)
+        self.analytics_notebook.pack(fill='both', expand=True, padx=10, pady=10)
         
         # Summary tab
-        summary_tab = ttk.Frame(analytics_notebook)
-        analytics_notebook.add(summary_tab, text='Summary')
+        self.summary_tab = ttk.Frame(self.analytics_notebook)
+        self.analytics_notebook.add(self.summary_tab, text='Summary')
         
-        self.summary_text = scrolledtext.ScrolledText(summary_tab, wrap=tk.WORD)
+        self.summary_text = scrolledtext.ScrolledText(self.summary_tab, wrap=tk.WORD)
         self.summary_text.pack(fill='both', expand=True, padx=10, pady=10)
         
         # Performance tab
-        perf_tab = ttk.Frame(analytics_notebook)
-        analytics_notebook.add(perf_tab, text='Performance')
+        self.perf_tab = ttk.Frame(self.analytics_notebook)
+        self.analytics_notebook.add(self.perf_tab, text='Performance')
         
         # Performance metrics
-        perf_frame = ttk.Frame(perf_tab)
+        perf_frame = ttk.Frame(self.perf_tab)
         perf_frame.pack(fill='both', expand=True, padx=10, pady=10)
         
         # Performance treeview
-        perf_columns = ('metric', 'value', 'description')
+        perf_columns = ('metric', 'value', 'interval', 'description')
         self.perf_tree = ttk.Treeview(perf_frame, columns=perf_columns, show='headings', height=15)
         
         for col in perf_columns:
-            self.perf_tree.heading(col, text=col.title())
+            self.perf_tree.heading(col, text='95% CI' if col == 'interval' else col.title())
             self.perf_tree.column(col, width=200)
         
         self.perf_tree.pack(side=tk.LEFT, fill='both', expand=True)
+        self.perf_sync = TreeSync(self.perf_tree)
         
         # Pattern analysis tab
-        pattern_tab = ttk.Frame(analytics_notebook)
-        analytics_notebook.add(pattern_tab, text='Patterns')
+        self.pattern_tab = ttk.Frame(self.analytics_notebook)
+        self.analytics_notebook.add(self.pattern_tab, text='Patterns')
         
         # Pattern treeview
-        pattern_frame = ttk.Frame(pattern_tab)
+        pattern_frame = ttk.Frame(self.pattern_tab)
         pattern_frame.pack(fill='both', expand=True, padx=10, pady=10)
         
         pattern_columns = ('safe_picks', 'games', 'wins', 'win_rate', 'avg_profit', 'total_profit')
@@ -438,6 +818,7 @@ class GameResultLogger:
             self.pattern_tree.column(col, width=100)
         
         self.pattern_tree.pack(side=tk.LEFT, fill='both', expand=True)
+        self.pattern_sync = TreeSync(self.pattern_tree)
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(pattern_frame, orient=tk.VERTICAL, command=self.pattern_tree.yview)
@@ -445,11 +826,18 @@ class GameResultLogger:
         self.pattern_tree.configure(yscrollcommand=scrollbar.set)
         
         # Strategy analysis tab
-        strategy_tab = ttk.Frame(analytics_notebook)
-        analytics_notebook.add(strategy_tab, text='Strategies')
+        self.strategy_tab = ttk.Frame(self.analytics_notebook)
+        self.analytics_notebook.add(self.strategy_tab, text='Strategies')
         
-        self.strategy_text = scrolledtext.ScrolledText(strategy_tab, wrap=tk.WORD)
+        self.strategy_text = scrolledtext.ScrolledText(self.strategy_tab, wrap=tk.WORD)
         self.strategy_text.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        # Timing analysis tab
+        self.timing_tab = ttk.Frame(self.analytics_notebook)
+        self.analytics_notebook.add(self.timing_tab, text='Timing')
+        
+        self.timing_text = scrolledtext.ScrolledText(self.timing_tab, wrap=tk.WORD)
+        self.timing_text.pack(fill='both', expand=True, padx=10, pady=10)
     
     def create_charts_tab(self):
         """Create charts tab with visualizations"""
@@ -463,23 +851,46 @@ class GameResultLogger:
         # Chart type selection
         ttk.Label(control_frame, text="Chart Type:").pack(side=tk.LEFT, padx=5)
         self.chart_type_var = tk.StringVar(value='balance')
-        chart_types = [
+        self.chart_types = [
             ('Balance History', 'balance'),
             ('Profit Distribution', 'profit_dist'),
             ('Win/Loss Ratio', 'win_loss'),
             ('Safe Picks Heatmap', 'heatmap'),
             ('Multiplier Analysis', 'multiplier'),
-            ('Daily Performance', 'daily'),
-            ('Risk Analysis', 'risk')
+            ('Performance Over Time', 'daily'),
+            ('Risk Analysis', 'risk'),
+            ('Calendar Heatmap', 'calendar'),
+            ('Hour of Day', 'hour_of_day')
         ]
         
-        for text, value in chart_types:
+        for text, value in self.chart_types:
             ttk.Radiobutton(control_frame, text=text, variable=self.chart_type_var,
                            value=value).pack(side=tk.LEFT, padx=5)
         
+        ttk.Label(control_frame, text="Profile:").pack(side=tk.LEFT, padx=(20, 0))
+        self.chart_profile_combo = ttk.Combobox(control_frame, textvariable=self.analytics_profile_var,
+                                                values=['All'] + list(self.profiles),
+                                                state='readonly', width=14)
+        self.chart_profile_combo.pack(side=tk.LEFT, padx=5)
+        
         # Generate button
         ttk.Button(control_frame, text="Generate Chart", 
                   command=self.generate_chart).pack(side=tk.LEFT, padx=20)
+        ttk.Button(control_frame, text="Chart Wall",
+                  command=self.generate_chart_wall).pack(side=tk.LEFT)
+        
+        # Scope and interval of the time-based charts
+        time_frame = ttk.Frame(self.charts_frame)
+        time_frame.pack(fill='x', padx=10)
+        ttk.Label(time_frame, text="Time Scope:").pack(side=tk.LEFT, padx=5)
+        self.chart_scope_var = tk.StringVar(value='Session')
+        ttk.Combobox(time_frame, textvariable=self.chart_scope_var,
+                     values=['Session', 'All Sessions', 'Including Archive'],
+                     state='readonly', width=16).pack(side=tk.LEFT, padx=5)
+        ttk.Label(time_frame, text="Interval:").pack(side=tk.LEFT, padx=(20, 0))
+        self.chart_freq_var = tk.StringVar(value='day')
+        ttk.Combobox(time_frame, textvariable=self.chart_freq_var, values=list(FREQUENCIES),
+                     state='readonly', width=8).pack(side=tk.LEFT, padx=5)
         
         # Chart display area
         self.chart_display_frame = ttk.Frame(self.charts_frame)
@@ -529,39 +940,152 @@ class GameResultLogger:
                   command=self.export_all_csv).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(export_frame, text="Export Statistics Report", 
                   command=self.export_report).pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(export_frame, text="Batch Reports (All Sessions)", 
+                  command=self.export_batch_reports).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Button(export_frame, text="Backup Database", 
                   command=self.backup_database).pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(export_frame, text="Restore Backup", 
+                  command=self.restore_backup).pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(export_frame, text="Rebuild from Journal", 
+                  command=self.rebuild_from_journal).pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(export_frame, text="Archive Old Rounds", 
+                  command=self.archive_old_rounds).pack(side=tk.LEFT, padx=5, pady=5)
+
+    def create_diagnostics_tab(self):
+        """Create diagnostics tab with hot-path latencies and database stats"""
+        self.diagnostics_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.diagnostics_frame, text='Diagnostics')
+        
+        # Controls
+        control_frame = ttk.Frame(self.diagnostics_frame)
+        control_frame.pack(fill='x', padx=10, pady=10)
+        
+        ttk.Button(control_frame, text="Refresh", 
+                  command=self.refresh_diagnostics).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Reset Timings", 
+                  command=self.reset_diagnostics).pack(side=tk.LEFT, padx=5)
+        
+        self.profile_capture = ProfileCapture('profiles')
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="Capture cProfile", variable=self.profile_var,
+                        command=self.toggle_profiling).pack(side=tk.LEFT, padx=20)
+        
+        # Latency table
+        timing_frame = ttk.LabelFrame(self.diagnostics_frame, text="Latency (ms)", padding=10)
+        timing_frame.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        columns = ('name', 'count', 'p50', 'p95', 'p99', 'max', 'total')
+        self.diag_tree = ttk.Treeview(timing_frame, columns=columns, show='headings', height=15)
+        
+        headings = {
+            'name': 'Operation',
+            'count': 'Count',
+            'p50': 'p50',
+            'p95': 'p95',
+            'p99': 'p99',
+            'max': 'Max',
+            'total': 'Total'
+        }
+        
+        for col in columns:
+            self.diag_tree.heading(col, text=headings[col])
+            self.diag_tree.column(col, width=420 if col == 'name' else 80,
+                                  anchor=tk.W if col == 'name' else tk.E)
+        
+        self.diag_tree.pack(fill='both', expand=True, side=tk.LEFT)
+        
+        scrollbar = ttk.Scrollbar(timing_frame, orient=tk.VERTICAL, command=self.diag_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.diag_tree.configure(yscrollcommand=scrollbar.set)
+        self.diag_sync = TreeSync(self.diag_tree)
         
         # Database info
-        info_frame = ttk.LabelFrame(self.import_frame, text="Database Information", padding=15)
-        info_frame.pack(fill='both', expand=True, padx=10, pady=10)
+        info_frame = ttk.LabelFrame(self.diagnostics_frame, text="Database Information", padding=10)
+        info_frame.pack(fill='x', padx=10, pady=10)
         
         self.db_info_text = scrolledtext.ScrolledText(info_frame, height=10)
         self.db_info_text.pack(fill='both', expand=True)
     
+    def refresh_diagnostics(self):
+        """Show latency percentiles and database statistics"""
+        self.diag_sync.update((row['name'], (
+            row['name'],
+            row['count'],
+            f"{row['p50_ms']:.2f}",
+            f"{row['p95_ms']:.2f}",
+            f"{row['p99_ms']:.2f}",
+            f"{row['max_ms']:.2f}",
+            f"{row['total_ms']:.1f}"
+        ), ()) for row in metrics.snapshot())
+        
+        stats = database_stats(self.db_path)
+        info = f"""DATABASE
+{'='*40}
+File: {os.path.abspath(self.db_path)}
+File Size: {stats['file_size'] / 1024:.1f} KiB
+WAL Size: {stats['wal_size'] / 1024:.1f} KiB
+Journal Mode: {stats['journal_mode']}
+Schema Version: {stats['user_version']} (current: {SCHEMA_VERSION})
+Page Size: {stats['page_size']} bytes
+Pages: {stats['page_count']} ({stats['freelist_count']} free)
+
+TABLES
+{'='*40}
+"""
+        for table, count in stats['tables'].items():
+            info += f"{table}: {count} rows\n"
+        
+        cache = self.query_cache.stats()
+        info += f"""
+QUERY CACHE
+{'='*40}
+Entries: {cache['entries']} / {cache['max_entries']}
+Hits: {cache['hits']}  Misses: {cache['misses']} ({cache['hit_rate']:.0%} hit rate)
+"""
+        
+        feed = self.change_feed.stats()
+        info += f"""
+CHANGE FEED
+{'='*40}
+Socket: {feed['socket'] or 'not running'}
+Subscribers: {feed['subscribers']}
+Rounds Published: {feed['published']}
+"""
+        
+        self.db_info_text.delete("1.0", tk.END)
+        self.db_info_text.insert("1.0", info)
+    
+    def reset_diagnostics(self):
+        """Clear recorded timings"""
+        metrics.reset()
+        self.refresh_diagnostics()
+    
+    def toggle_profiling(self):
+        """Start or stop a cProfile capture"""
+        if self.profile_var.get():
+            self.profile_capture.start()
+            self.status_var.set("cProfile capture started")
+        else:
+            path = self.profile_capture.stop()
+            if path:
+                self.status_var.set(f"Profile saved to {path}")
+    
     def load_initial_data(self):
         """Load initial data into GUI"""
-        self.refresh_dashboard()
-        self.update_session_stats()
+        self.refresh.refresh_now()
+        self.load_history()
     
+    @timed('ui.refresh_dashboard')
     def refresh_dashboard(self):
         """Refresh dashboard with latest data"""
         # Update stat cards
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self.connect()
         
         # Get session stats
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_rounds,
-                SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END) as wins,
-                SUM(profit) as net_profit
-            FROM game_results 
-            WHERE session_id = ?
-        ''', (self.current_session,))
-        
-        stats = cursor.fetchone()
-        total_rounds, wins, net_profit = stats if stats[0] else (0, 0, 0)
+        stats = self.session_aggregates(conn, scoped=False)
+        total_rounds = stats['total']
+        wins = stats['wins'] or 0
+        net_profit = stats['net_profit'] or 0
         
         win_rate = (wins / total_rounds * 100) if total_rounds > 0 else 0
         
@@ -572,14 +1096,12 @@ class GameResultLogger:
         self.stat_cards['win_rate']['value_label'].config(text=f"{win_rate:.1f}%")
         self.stat_cards['profit']['value_label'].config(text=f"{net_profit:+.2f}")
         
-        # Get current streak
-        cursor.execute('''
+        # Get current streak; rounds logged within one second share a timestamp
+        results = [row[0] for row in self.query_cache.fetchall(conn, '''
             SELECT result FROM game_results 
             WHERE session_id = ? 
-            ORDER BY timestamp DESC LIMIT 5
-        ''', (self.current_session,))
-        
-        results = [row[0] for row in cursor.fetchall()]
+            ORDER BY round_number DESC LIMIT 5
+        ''', (self.current_session,), session_id=self.current_session)]
         streak = 0
         if results:
             last_result = results[0]
@@ -593,12 +1115,10 @@ class GameResultLogger:
             text=f"{streak} {last_result if results else ''}"
         )
         
-        # Load recent activity
-        for item in self.recent_tree.get_children():
-            self.recent_tree.delete(item)
-        
-        cursor.execute('''
+        # Load recent activity; only new or changed rows touch the widget
+        recent = self.query_cache.fetchall(conn, '''
             SELECT 
+                id,
                 strftime('%H:%M', timestamp) as time,
                 bet_amount,
                 result,
@@ -608,83 +1128,95 @@ class GameResultLogger:
                 ending_balance
             FROM game_results 
             WHERE session_id = ?
-            ORDER BY timestamp DESC 
+            ORDER BY round_number DESC 
             LIMIT 10
-        ''', (self.current_session,))
+        ''', (self.current_session,), session_id=self.current_session)
         
-        for row in cursor.fetchall():
-            time_str, bet, result, picks, mult, profit, balance = row
-            self.recent_tree.insert('', 'end', values=(
+        self.recent_sync.update(
+            (row_id, (
                 time_str,
-                f"{bet:.2f}",
+                f"{to_sigils(bet):.2f}",
                 result.upper(),
                 picks,
                 f"{mult:.2f}x",
-                f"{profit:+.2f}",
-                f"{balance:.2f}"
-            ), tags=(result,))
-        
-        # Configure tags for coloring
-        self.recent_tree.tag_configure('win', background='#e8f5e9')
-        self.recent_tree.tag_configure('loss', background='#ffebee')
+                f"{to_sigils(profit):+.2f}",
+                f"{to_sigils(balance):.2f}"
+            ), (result,))
+            for row_id, time_str, bet, result, picks, mult, profit, balance in recent
+        )
         
         conn.close()
+        self.update_behavior_alerts()
     
+    def update_behavior_alerts(self):
+        """Show the detector's state and latest alerts; no history is queried"""
+        state_colors = {'calm': self.colors['win'], 'caution': '#f39c12',
+                        'tilt': self.colors['loss']}
+        active = ', '.join(sorted(self.tilt.active))
+        self.tilt_state_label.config(
+            text=f"State: {self.tilt.state.upper()}" + (f" ({active})" if active else ''),
+            foreground=state_colors[self.tilt.state]
+        )
+        
+        self.alerts_listbox.delete(0, tk.END)
+        for alert in reversed(self.tilt.alerts):
+            self.alerts_listbox.insert(
+                tk.END, f"Round {alert.round_number} [{alert.kind}] {alert.message}")
+    
+    @timed('ui.log_result')
     def log_result(self):
         """Log a game result to database"""
         try:
+            # Buffered rapid entries come first so round numbers stay in order
+            self.commit_rapid_buffer()
+            
             # Get values from form
             bet = self.bet_var.get()
             strategy = self.strategy_var.get()
+            check_name_length("Strategy", strategy, STRATEGY_CHARS)
             result = self.result_var.get()
             safe_picks = self.safe_picks_var.get()
             multiplier = self.multiplier_var.get()
             bomb_positions = self.bomb_positions_var.get()
             notes = self.notes_text.get("1.0", tk.END).strip()
             
-            # Calculate winnings and profit
-            if result == 'win':
-                winnings = bet * multiplier
-                profit = winnings - bet
-            else:
-                winnings = 0
-                profit = -bet
-            
-            # Update balance
-            new_balance = self.current_balance + profit
+            # Calculate winnings, profit and balance in whole money units
+            winnings, profit, new_balance = settle(bet, multiplier, result == 'win',
+                                                   self.current_balance)
             
             # Get next round number
             round_num = self.get_next_round_number()
-            
-            # Save to database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO game_results 
-                (session_id, round_number, bet_amount, strategy, result, 
-                 safe_picks, multiplier, winnings, profit, ending_balance,
-                 bomb_positions, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (self.current_session, round_num, bet, strategy, result,
-                  safe_picks, multiplier, winnings, profit, new_balance,
-                  bomb_positions, notes))
-            
-            conn.commit()
-            
-            # Update pattern analysis
-            self.update_pattern_analysis(conn, safe_picks, result, profit)
-            
-            conn.close()
+            started_ns, logged_ns, duration = self.stop_round_timer()
+            
+            round_data = Round(
+                timestamp=datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+                session_id=self.current_session,
+                round_number=round_num,
+                bet_amount=bet,
+                strategy=strategy,
+                result=result,
+                safe_picks=safe_picks,
+                multiplier=multiplier,
+                winnings=winnings,
+                profit=profit,
+                ending_balance=new_balance,
+                bomb_positions=bomb_positions,
+                notes=notes,
+                play_duration=duration,
+                game_profile=self.game_profile_var.get(),
+                started_mono_ns=started_ns,
+                logged_mono_ns=logged_ns
+            )
+            
+            self.save_round(round_data)
             
             # Update current balance
             self.current_balance = new_balance
             
             # Update UI
             self.balance_label.config(text=f"{self.current_balance:.2f} Sigils")
-            self.refresh_dashboard()
-            self.update_session_stats()
-            self.update_analytics()
+            # Bursts of logs coalesce into one recompute of the visible views
+            self.refresh.mark_dirty()
             
             # Show success message
             self.status_var.set(f"Result logged! Round #{round_num}, Profit: {profit:+.2f}")
@@ -696,6 +1228,202 @@ class GameResultLogger:
             messagebox.showerror("Error", f"Failed to log result: {str(e)}")
             self.status_var.set(f"Error: {str(e)}")
     
+    @timed('db.save_round')
+    def save_round(self, round_data):
+        """Journal a round, then apply it and its derived stats atomically"""
+        event = round_data.as_dict()
+        seq = self.journal.append('round', event)
+        
+        conn = self.connect()
+        try:
+            with conn:
+                row_id = insert_round(conn, event)
+                self.update_pattern_analysis(conn, round_data.safe_picks, round_data.result,
+                                             round_data.profit, round_data.game_profile)
+                apply_strategy_round(conn, round_data.session_id, round_data.game_profile,
+                                     round_data.strategy, round_data.result, round_data.profit)
+                set_applied_sequence(conn, seq)
+        except Exception:
+            # Reported as not logged, so recovery and replay must not bring it back
+            self.journal.append('void', {'first_seq': seq, 'last_seq': seq})
+            raise
+        finally:
+            conn.close()
+        self.data_version += 1
+        self.query_cache.bump(round_data.session_id)
+        self.session_rounds.extend([round_data])
+        self.change_feed.publish([(row_id, event)])
+        self.track_behavior([round_data])
+    
+    @timed('db.save_rounds')
+    def save_rounds(self, rounds):
+        """Journal a batch of rounds and apply them in a single transaction"""
+        events = [round_data.as_dict() for round_data in rounds]
+        seq = self.journal.append_many('round', events)
+        
+        row_ids = []
+        conn = self.connect()
+        try:
+            with conn:
+                for round_data, event in zip(rounds, events):
+                    row_ids.append(insert_round(conn, event))
+                    self.update_pattern_analysis(conn, round_data.safe_picks, round_data.result,
+                                                 round_data.profit, round_data.game_profile)
+                    apply_strategy_round(conn, round_data.session_id, round_data.game_profile,
+                                         round_data.strategy, round_data.result, round_data.profit)
+                set_applied_sequence(conn, seq)
+        except Exception:
+            # The batch stays in the rapid buffer and is journaled again on retry
+            self.journal.append('void', {'first_seq': seq - len(events) + 1, 'last_seq': seq})
+            raise
+        finally:
+            conn.close()
+        self.data_version += 1
+        for session_id in {round_data.session_id for round_data in rounds}:
+            self.query_cache.bump(session_id)
+        self.session_rounds.extend(rounds)
+        self.change_feed.publish(zip(row_ids, events))
+        self.track_behavior(rounds)
+    
+    def track_behavior(self, rounds):
+        """Feed committed rounds of the current session to the tilt detector"""
+        raised = []
+        for round_data in rounds:
+            if round_data.session_id == self.current_session:
+                raised.extend(self.tilt.update(round_data))
+        if raised:
+            self.status_var.set(f"Behavior alert: {raised[-1].message}")
+            self.refresh.mark_dirty('dashboard')
+    
+    def handle_rapid_key(self, event):
+        """Turn a hotkey into a buffered round while rapid entry mode is on"""
+        if not self.rapid_mode_var.get() or self.notebook.select() != str(self.logger_frame):
+            return
+        # Typing into the form must not log rounds
+        if event.widget.winfo_class() in ('Entry', 'TEntry', 'Text', 'TSpinbox', 'TCombobox'):
+            return
+        
+        if event.keysym in self.RAPID_UNDO_KEYS:
+            self.undo_rapid_entry()
+        elif event.keysym.lower() in self.RAPID_KEYS:
+            result, safe_picks = self.RAPID_KEYS[event.keysym.lower()]
+            self.add_rapid_entry(result, safe_picks)
+    
+    def add_rapid_entry(self, result, safe_picks):
+        """Buffer one round built from a hotkey and the form's bet and strategy"""
+        try:
+            bet = self.bet_var.get()
+        except tk.TclError:
+            self.status_var.set("Error: invalid bet amount")
+            return
+        strategy = self.strategy_var.get()
+        try:
+            check_name_length("Strategy", strategy, STRATEGY_CHARS)
+        except ValueError as e:
+            self.status_var.set(f"Error: {e}")
+            return
+        
+        profile = self.active_profile()
+        if result == 'win':
+            if not 1 <= safe_picks <= profile.max_picks:
+                self.status_var.set(f"Error: {profile.name} pays out for "
+                                    f"1-{profile.max_picks} safe picks")
+                return
+            multiplier = profile.multiplier(safe_picks)
+        else:
+            multiplier = 0.0
+        winnings, profit, new_balance = settle(bet, multiplier, result == 'win',
+                                               self.current_balance)
+        
+        # Commit by count, but keep the newest entry back so it can still be undone
+        if len(self.rapid_buffer) > self.RAPID_COMMIT_ROUNDS:
+            self.commit_rapid_buffer(keep_last=True)
+        
+        if self.rapid_buffer:
+            round_num = self.rapid_buffer[-1].round_number + 1
+        else:
+            round_num = self.get_next_round_number()
+        
+        self.current_balance = new_balance
+        # Each hotkey closes the round that started at the previous one
+        started_ns, logged_ns, duration = self.stop_round_timer()
+        self.rapid_buffer.append(Round(
+            timestamp=datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            session_id=self.current_session,
+            round_number=round_num,
+            bet_amount=bet,
+            strategy=strategy,
+            result=result,
+            safe_picks=safe_picks,
+            multiplier=multiplier,
+            winnings=winnings,
+            profit=profit,
+            ending_balance=self.current_balance,
+            play_duration=duration,
+            game_profile=profile.name,
+            started_mono_ns=started_ns,
+            logged_mono_ns=logged_ns
+        ))
+        
+        # The timer runs from the oldest pending entry, so nothing waits longer than T
+        if self.rapid_after_id is None:
+            self.rapid_after_id = self.root.after(self.RAPID_COMMIT_SECONDS * 1000,
+                                                  self.commit_rapid_buffer)
+        
+        self.balance_label.config(text=f"{self.current_balance:.2f} Sigils")
+        self.update_rapid_status()
+        self.status_var.set(f"Round #{round_num} buffered: {result.upper()} "
+                            f"{safe_picks} picks, Profit: {profit:+.2f}")
+    
+    def undo_rapid_entry(self):
+        """Drop the most recent buffered round"""
+        if not self.rapid_buffer:
+            self.status_var.set("Nothing to undo: buffered rounds are already committed")
+            return
+        
+        round_data = self.rapid_buffer.pop()
+        self.current_balance = to_sigils(to_units(self.current_balance)
+                                         - to_units(round_data.profit))
+        
+        if not self.rapid_buffer and self.rapid_after_id is not None:
+            self.root.after_cancel(self.rapid_after_id)
+            self.rapid_after_id = None
+        
+        self.balance_label.config(text=f"{self.current_balance:.2f} Sigils")
+        self.update_rapid_status()
+        self.status_var.set(f"Undid round #{round_data.round_number}")
+    
+    def commit_rapid_buffer(self, keep_last=False):
+        """Save buffered rapid entry rounds as one batch"""
+        if self.rapid_after_id is not None:
+            self.root.after_cancel(self.rapid_after_id)
+            self.rapid_after_id = None
+        
+        count = len(self.rapid_buffer) - (1 if keep_last else 0)
+        if count <= 0:
+            return
+        
+        batch = self.rapid_buffer[:count]
+        try:
+            self.save_rounds(batch)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to commit rounds: {str(e)}")
+            self.status_var.set(f"Error: {str(e)}")
+            return
+        del self.rapid_buffer[:count]
+        
+        if self.rapid_buffer:
+            self.rapid_after_id = self.root.after(self.RAPID_COMMIT_SECONDS * 1000,
+                                                  self.commit_rapid_buffer)
+        
+        self.update_rapid_status()
+        self.refresh.mark_dirty()
+        self.status_var.set(f"Committed {count} rounds (through #{batch[-1].round_number})")
+    
+    def update_rapid_status(self):
+        """Show how many rapid entry rounds are waiting to be committed"""
+        self.rapid_status_var.set(f"{len(self.rapid_buffer)} rounds pending")
+    
     def calculate_result(self):
         """Calculate and display results without logging"""
         try:
@@ -703,19 +1431,15 @@ class GameResultLogger:
             result = self.result_var.get()
             multiplier = self.multiplier_var.get()
             
+            winnings, profit, new_balance = settle(bet, multiplier, result == 'win',
+                                                   self.current_balance)
             if result == 'win':
-                winnings = bet * multiplier
-                profit = winnings - bet
                 roi = (profit / bet) * 100
                 risk_reward = profit / bet if bet > 0 else 0
             else:
-                winnings = 0
-                profit = -bet
                 roi = -100
                 risk_reward = -1
             
-            new_balance = self.current_balance + profit
-            
             # Update results display
             self.results_vars['winnings'].set(f"{winnings:.2f} Sigils")
             self.results_vars['profit'].set(f"{profit:+.2f} Sigils")
@@ -728,11 +1452,129 @@ class GameResultLogger:
     
     def auto_calculate_multiplier(self):
         """Automatically calculate multiplier based on safe picks"""
-        safe_picks = self.safe_picks_var.get()
-        if 0 <= safe_picks < len(self.MULTIPLIERS):
-            multiplier = self.MULTIPLIERS[safe_picks]
-            self.multiplier_var.set(multiplier)
-            self.calculate_result()
+        profile = self.active_profile()
+        try:
+            multiplier = profile.multiplier(self.safe_picks_var.get())
+        except (ValueError, tk.TclError) as e:
+            messagebox.showerror("Multiplier", str(e))
+            return
+        self.multiplier_var.set(multiplier)
+        self.calculate_result()
+    
+    def active_profile(self):
+        """Profile new rounds are logged under"""
+        return self.profiles[self.game_profile_var.get()]
+    
+    def on_profile_selected(self):
+        """Limit the safe picks input to the selected profile's board"""
+        max_picks = self.active_profile().max_picks
+        self.safe_picks_spinbox.config(to=max_picks)
+        self.safe_picks_range_var.set(f" (0-{max_picks})")
+        if self.safe_picks_var.get() > max_picks:
+            self.safe_picks_var.set(max_picks)
+    
+    def add_profile(self):
+        """Define a new game profile with a fair payout curve less a house edge"""
+        name = simpledialog.askstring("New Game Profile", "Profile name:", parent=self.root)
+        if not name:
+            return
+        tiles = simpledialog.askinteger("New Game Profile", "Number of tiles:",
+                                        initialvalue=25, minvalue=2, parent=self.root)
+        if tiles is None:
+            return
+        bombs = simpledialog.askinteger("New Game Profile", "Number of bombs:",
+                                        initialvalue=3, minvalue=1, maxvalue=tiles - 1,
+                                        parent=self.root)
+        if bombs is None:
+            return
+        edge = simpledialog.askfloat("New Game Profile", "House edge (%):",
+                                     initialvalue=1.0, minvalue=0, maxvalue=50, parent=self.root)
+        if edge is None:
+            return
+        
+        try:
+            check_name_length("Profile", name, PROFILE_CHARS)
+            profile = GameProfile(name, tiles, bombs, fair_multipliers(tiles, bombs, edge / 100),
+                                  f"{tiles} tiles, {bombs} bombs, {edge:g}% edge")
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        
+        conn = self.connect()
+        with conn:
+            save_profile(conn, profile)
+        conn.close()
+        
+        self.profiles[name] = profile
+        self.profile_combo.config(values=list(self.profiles))
+        self.analytics_profile_combo.config(values=['All'] + list(self.profiles))
+        self.chart_profile_combo.config(values=['All'] + list(self.profiles))
+        self.game_profile_var.set(name)
+        self.on_profile_selected()
+        self.status_var.set(f"Added game profile {profile.label()}")
+    
+    def profile_filter(self):
+        """SQL condition and params limiting analytics to the selected profile"""
+        profile = self.analytics_profile_var.get()
+        if profile == 'All':
+            return '', ()
+        return 'AND game_profile = ?', (profile,)
+    
+    def session_aggregates(self, conn, scoped=True):
+        """COUNT/SUM/AVG summary of the current session, shared by every pane
+        
+        All callers issue the same SQL, so one refresh cycle costs one query
+        until the next round is logged.
+        """
+        profile_sql, profile_params = self.profile_filter() if scoped else ('', ())
+        row = self.query_cache.fetchone(conn, f'''
+            SELECT 
+                COUNT(*),
+                SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END),
+                {sigils('SUM(profit)')},
+                {sigils('AVG(profit)')},
+                {sigils('TOTAL(profit * profit)', 2)},
+                {sigils('MIN(profit)')},
+                {sigils('MAX(profit)')},
+                {sigils('MIN(ending_balance)')},
+                {sigils('MAX(ending_balance)')},
+                AVG(safe_picks),
+                {sigils('SUM(bet_amount)')}
+            FROM game_results 
+            WHERE session_id = ? {profile_sql}
+        ''', (self.current_session,) + profile_params, session_id=self.current_session)
+        
+        stats = dict(zip(self.AGGREGATE_COLUMNS, row))
+        # SQLite has no STDDEV; population std dev from the running sums
+        total = stats['total']
+        stats['std_profit'] = (float(np.sqrt(max(0.0, stats['sum_sq_profit'] / total
+                                                 - stats['avg_profit'] ** 2)))
+                               if total else 0.0)
+        return stats
+    
+    def session_data(self, scoped=True):
+        """The current session's rounds as a structured array, optionally profile-scoped"""
+        if self.session_rounds.session_id != self.current_session:
+            conn = self.connect()
+            self.session_rounds.load(conn, self.current_session)
+            conn.close()
+        
+        profile = self.analytics_profile_var.get() if scoped else 'All'
+        return self.session_rounds.scope(None if profile == 'All' else profile)
+    
+    def risk_metrics(self, rounds, scoped=True, simulate=True):
+        """Drawdown and risk of ruin of session rounds, betting the form's bet from the current balance"""
+        try:
+            bet = self.bet_var.get()
+        except tk.TclError:
+            bet = 0.0
+        profile = self.analytics_profile_var.get() if scoped else 'All'
+        return self.risk.metrics((self.current_session, profile), rounds,
+                                 self.current_balance, bet, simulate)
+    
+    @staticmethod
+    def percent(probability):
+        return "-" if np.isnan(probability) else f"{probability * 100:.1f}%"
     
     def apply_preset(self, bet, result, picks, multiplier):
         """Apply preset values to form"""
@@ -744,18 +1586,53 @@ class GameResultLogger:
     
     def clear_form(self):
         """Clear the form"""
-        self.bet_var.set(0.1)
-        self.strategy_var.set('moderate')
-        self.result_var.set('win')
-        self.safe_picks_var.set(1)
-        self.multiplier_var.set(1.0)
-        self.bomb_positions_var.set('')
-        self.notes_text.delete("1.0", tk.END)
+        # Resetting the fields is not the player starting a round
+        self.form_resetting = True
+        try:
+            self.bet_var.set(0.1)
+            self.strategy_var.set('moderate')
+            self.result_var.set('win')
+            self.safe_picks_var.set(1)
+            self.multiplier_var.set(1.0)
+            self.bomb_positions_var.set('')
+            self.notes_text.delete("1.0", tk.END)
+        finally:
+            self.form_resetting = False
         self.calculate_result()
     
+    def on_form_interaction(self):
+        """Start the round timer on the first edit of a new round"""
+        if not self.form_resetting and not self.round_timer.running:
+            self.start_round_timer()
+    
+    def start_round_timer(self, restart=False):
+        """Start (or restart) timing the round being entered"""
+        self.round_timer.start(restart=restart)
+        if self.round_timer_after_id is None:
+            self.tick_round_timer()
+    
+    def tick_round_timer(self):
+        """Show the running round time until the round is logged"""
+        if not self.round_timer.running:
+            self.round_timer_after_id = None
+            return
+        self.round_timer_var.set(f"Round timer: {self.round_timer.elapsed():.1f}s")
+        self.round_timer_after_id = self.root.after(200, self.tick_round_timer)
+    
+    def stop_round_timer(self):
+        """Stop the round timer; return (started_ns, logged_ns, duration_ms)"""
+        timing = self.round_timer.stop()
+        if self.round_timer_after_id is not None:
+            self.root.after_cancel(self.round_timer_after_id)
+            self.round_timer_after_id = None
+        duration = timing[2]
+        self.round_timer_var.set(f"Last round: {duration / 1000:.1f}s" if duration is not None
+                                 else "Round timer: idle")
+        return timing
+    
     def get_next_round_number(self):
         """Get next round number for current session"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -770,35 +1647,31 @@ class GameResultLogger:
         conn.close()
         return next_round
     
+    @timed('ui.session_stats')
     def update_session_stats(self):
         """Update session statistics display"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get detailed session stats
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_rounds,
-                SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END) as wins,
-                SUM(CASE WHEN result = 'loss' THEN 1 ELSE 0 END) as losses,
-                SUM(profit) as net_profit,
-                AVG(profit) as avg_profit,
-                MIN(profit) as worst_loss,
-                MAX(profit) as best_win,
-                MIN(ending_balance) as min_balance,
-                MAX(ending_balance) as max_balance,
-                AVG(safe_picks) as avg_safe_picks
-            FROM game_results 
-            WHERE session_id = ?
-        ''', (self.current_session,))
-        
-        stats = cursor.fetchone()
+        rounds = self.session_data(scoped=False)
         
         self.session_stats_text.delete("1.0", tk.END)
         
-        if stats and stats[0]:
-            total, wins, losses, net_profit, avg_profit, worst, best, min_bal, max_bal, avg_picks = stats
-            win_rate = (wins / total * 100) if total > 0 else 0
+        if len(rounds):
+            profits = rounds['profit']
+            balances = rounds['ending_balance']
+            total = len(rounds)
+            wins = int(rounds['win'].sum())
+            losses = total - wins
+            net_profit = profits.sum()
+            avg_profit = profits.mean()
+            worst, best = profits.min(), profits.max()
+            min_bal, max_bal = balances.min(), balances.max()
+            avg_picks = rounds['safe_picks'].mean()
+            win_rate = wins / total * 100
+            gains = profits[profits > 0].sum()
+            loss_total = -profits[profits < 0].sum()
+            std_profit = profits.std(ddof=1) if total > 1 else 0.0
+            
+            # Streaming drawdown state; only rounds new since the last refresh are folded in
+            risk = self.risk_metrics(rounds, scoped=False, simulate=False)
             
             stats_text = f"""SESSION STATISTICS
 {'='*40}
@@ -817,90 +1690,47 @@ Average Safe Picks: {avg_picks:.1f}
 PERFORMANCE METRICS
 {'='*40}
 Expected Value: {avg_profit:.4f}
-Risk of Ruin: {(losses/total*100):.1f}%
-Profit Factor: {(-net_profit/(worst*total) if worst < 0 else 'N/A')}
-Sharpe Ratio: {(avg_profit/(abs(avg_profit - worst) + 0.001)):.2f}
+Profit Factor: {(f"{gains/loss_total:.2f}" if loss_total > 0 else 'N/A')}
+Sharpe Ratio: {(avg_profit/std_profit if std_profit else 0):.2f}
+
+RISK METRICS
+{'='*40}
+Max Drawdown: {risk['max_drawdown']:.2f} Sigils ({risk['max_drawdown_pct']:.1f}%)
+Max Drawdown Duration: {risk['max_duration']} rounds
+Current Drawdown: {risk['current_drawdown']:.2f} Sigils ({risk['current_duration']} rounds)
+Ulcer Index: {risk['ulcer_index']:.2f}
+CVaR {TAIL_LEVEL:.0%}: {risk['cvar']:.2f} Sigils per round
+Risk of Ruin: {self.percent(risk['ruin_analytic'])} at {risk['bet']:.2f} per bet
 """
             self.session_stats_text.insert("1.0", stats_text)
-        
-        conn.close()
-    
-    def update_pattern_analysis(self, conn, safe_picks, result, profit):
-        """Update pattern analysis in database"""
-        cursor = conn.cursor()
-        
-        # Check if pattern exists
-        cursor.execute('''
-            SELECT * FROM pattern_analysis 
-            WHERE safe_pick_count = ?
-        ''', (safe_picks,))
-        
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update existing pattern
-            pattern_id, _, old_count, old_wins, old_avg, old_total, _ = existing
-            new_count = old_count + 1
-            new_wins = old_wins + (1 if result == 'win' else 0)
-            new_total = old_total + profit
-            new_avg = new_total / new_count
-            
-            cursor.execute('''
-                UPDATE pattern_analysis 
-                SET occurrence_count = ?, win_count = ?, avg_profit = ?, 
-                    total_profit = ?, last_updated = CURRENT_TIMESTAMP
-                WHERE pattern_id = ?
-            ''', (new_count, new_wins, new_avg, new_total, pattern_id))
-        else:
-            # Insert new pattern
-            win_count = 1 if result == 'win' else 0
-            cursor.execute('''
-                INSERT INTO pattern_analysis 
-                (safe_pick_count, occurrence_count, win_count, avg_profit, total_profit)
-                VALUES (?, 1, ?, ?, ?)
-            ''', (safe_picks, win_count, profit, profit))
-        
-        conn.commit()
     
-    def update_analytics(self):
-        """Update analytics tabs with latest data"""
-        self.update_summary_analysis()
-        self.update_performance_metrics()
-        self.update_pattern_display()
-        self.update_strategy_analysis()
+    def update_pattern_analysis(self, conn, safe_picks, result, profit, game_profile=DEFAULT_PROFILE):
+        """Update pattern analysis in database (committed by the caller)"""
+        apply_pattern(conn, safe_picks, result, profit, game_profile)
     
+    @timed('analytics.summary')
     def update_summary_analysis(self):
         """Update summary analysis tab"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         
         # Get comprehensive summary
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_games,
-                SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END) as wins,
-                SUM(profit) as total_profit,
-                AVG(profit) as avg_profit,
-                STDDEV(profit) as std_profit,
-                MIN(profit) as min_profit,
-                MAX(profit) as max_profit,
-                AVG(safe_picks) as avg_safe_picks,
-                SUM(bet_amount) as total_bet
-            FROM game_results 
-            WHERE session_id = ?
-        ''', (self.current_session,))
-        
-        stats = cursor.fetchone()
+        stats = self.session_aggregates(conn)
+        conn.close()
         
         self.summary_text.delete("1.0", tk.END)
         
-        if stats and stats[0]:
-            total, wins, total_profit, avg_profit, std_profit, min_profit, max_profit, avg_picks, total_bet = stats
+        if stats['total']:
+            total, wins = stats['total'], stats['wins']
+            total_profit, avg_profit = stats['net_profit'], stats['avg_profit']
+            std_profit = stats['std_profit']
+            min_profit, max_profit = stats['min_profit'], stats['max_profit']
+            avg_picks, total_bet = stats['avg_safe_picks'], stats['total_bet']
             win_rate = (wins / total * 100) if total > 0 else 0
             
             summary = f"""COMPREHENSIVE ANALYSIS REPORT
 {'='*60}
 Session: {self.current_session}
+Game Profile: {self.analytics_profile_var.get()}
 Report Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 OVERALL PERFORMANCE
@@ -954,472 +1784,721 @@ RECOMMENDATIONS
                 summary += "⚠ High volatility. Consider more conservative plays.\n"
             
             self.summary_text.insert("1.0", summary)
-        
-        conn.close()
     
+    @timed('analytics.performance')
     def update_performance_metrics(self):
         """Update performance metrics treeview"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Clear existing items
-        for item in self.perf_tree.get_children():
-            self.perf_tree.delete(item)
-        
-        # Calculate various performance metrics
-        cursor.execute('''
-            SELECT 
-                profit,
-                result,
-                bet_amount,
-                safe_picks
-            FROM game_results 
-            WHERE session_id = ?
-        ''', (self.current_session,))
-        
-        games = cursor.fetchall()
-        
-        if games:
-            profits = [g[0] for g in games]
-            results = [g[1] for g in games]
-            bets = [g[2] for g in games]
-            picks = [g[3] for g in games]
+        # Column views of the session buffer; nothing is re-queried or copied
+        rounds = self.session_data()
+        rows = []
+        
+        if len(rounds):
+            profits = rounds['profit']
+            wins = rounds['win']
+            bets = rounds['bet_amount']
+            picks = rounds['safe_picks']
+            games = len(rounds)
+            
+            # Intervals arrive from the process pool; the table refreshes when they do
+            key = (self.current_session, self.analytics_profile_var.get(), self.data_version)
+            intervals = self.bootstrap.request(key, profits, wins)
+            if intervals is None and not self.bootstrap_polling:
+                self.bootstrap_polling = True
+                self.root.after(200, self.poll_bootstrap)
+            
+            def ci(name, fmt):
+                if intervals is None:
+                    return "computing..." if key in self.bootstrap.pending else "-"
+                _, low, high = intervals['metrics'][name]
+                return f"{low:{fmt}} to {high:{fmt}}"
+            
+            gains = profits[profits > 0].sum()
+            losses = -profits[profits < 0].sum()
+            risk = self.risk_metrics(rounds)
             
             # Calculate metrics
             metrics = [
-                ("Total Games", len(games), "Number of games played"),
-                ("Win Rate", f"{(results.count('win')/len(games)*100):.1f}%", "Percentage of wins"),
-                ("Net Profit", f"{sum(profits):+.2f}", "Total profit/loss"),
-                ("Avg Profit", f"{np.mean(profits):.4f}", "Average profit per game"),
-                ("Std Dev", f"{np.std(profits):.4f}", "Profit volatility"),
-                ("Max Profit", f"{max(profits):+.2f}", "Best single game profit"),
-                ("Min Profit", f"{min(profits):+.2f}", "Worst single game loss"),
-                ("Avg Bet", f"{np.mean(bets):.2f}", "Average bet size"),
-                ("Avg Safe Picks", f"{np.mean(picks):.2f}", "Average safe picks"),
-                ("Profit Factor", f"{(sum(p for p in profits if p > 0)/abs(sum(p for p in profits if p < 0)) if any(p < 0 for p in profits) else '∞'):.2f}", "Profit/Loss ratio"),
-                ("Expectancy", f"{(np.mean(profits)/np.mean(bets) if np.mean(bets) > 0 else 0):.3f}", "Avg profit per unit bet"),
-                ("Risk of Ruin", f"{(results.count('loss')/len(games)*100):.1f}%", "Probability of losing"),
-                ("Sharpe Ratio", f"{(np.mean(profits)/(np.std(profits)+0.001)):.3f}", "Risk-adjusted return"),
-                ("Max Drawdown", f"{min(profits):+.2f}", "Maximum single loss"),
-                ("Recovery Factor", f"{(-sum(profits)/min(profits) if min(profits) < 0 else '∞'):.2f}", "Profit/Max loss ratio")
+                ("Total Games", games, "", "Number of games played"),
+                ("Win Rate", f"{(wins.sum()/games*100):.1f}%", ci('win_rate', '.1f'), "Percentage of wins"),
+                ("Net Profit", f"{profits.sum():+.2f}", "", "Total profit/loss"),
+                ("Avg Profit", f"{np.mean(profits):.4f}", ci('avg_profit', '.4f'), "Average profit per game"),
+                ("Std Dev", f"{np.std(profits):.4f}", "", "Profit volatility"),
+                ("Max Profit", f"{profits.max():+.2f}", "", "Best single game profit"),
+                ("Min Profit", f"{profits.min():+.2f}", "", "Worst single game loss"),
+                ("Avg Bet", f"{np.mean(bets):.2f}", "", "Average bet size"),
+                ("Avg Safe Picks", f"{np.mean(picks):.2f}", "", "Average safe picks"),
+                ("Profit Factor", f"{gains/losses:.2f}" if losses > 0 else "∞", ci('profit_factor', '.2f'), "Profit/Loss ratio"),
+                ("Expectancy", f"{(np.mean(profits)/np.mean(bets) if np.mean(bets) > 0 else 0):.3f}", "", "Avg profit per unit bet"),
+                ("Risk of Ruin", self.percent(risk['ruin_analytic']), "", f"Losing the balance at {risk['bet']:.2f}/bet (analytic)"),
+                ("Simulated Ruin", self.percent(risk['ruin_simulated']), "", f"Same, bootstrapped over {risk['horizon']} rounds"),
+                ("Sharpe Ratio", f"{(np.mean(profits)/(np.std(profits)+0.001)):.3f}", ci('sharpe', '.3f'), "Risk-adjusted return"),
+                ("Max Drawdown", f"{risk['max_drawdown']:.2f} ({risk['max_drawdown_pct']:.1f}%)", "", "Largest peak-to-trough balance drop"),
+                ("Drawdown Duration", risk['max_duration'], "", "Most rounds spent below a balance peak"),
+                ("Ulcer Index", f"{risk['ulcer_index']:.2f}", "", "RMS percent drawdown"),
+                (f"CVaR {TAIL_LEVEL:.0%}", f"{risk['cvar']:.2f}", "", f"Avg loss in the worst {1 - TAIL_LEVEL:.0%} of rounds"),
+                ("Recovery Factor", f"{risk['recovery_factor']:.2f}" if risk['max_drawdown'] > 0 else "∞", "", "Net profit/Max drawdown"),
+                ("Max Losing Streak", int(longest_run(~wins[None, :])[0]), ci('max_losing_streak', '.0f'), "Longest run of losses (block bootstrap)")
             ]
             
-            for metric, value, desc in metrics:
-                self.perf_tree.insert('', 'end', values=(metric, value, desc))
+            rows = [(metric, (metric, value, interval, desc), ())
+                    for metric, value, interval, desc in metrics]
         
-        conn.close()
+        # Keyed by metric name, so only values that moved are rewritten
+        self.perf_sync.update(rows)
+    
+    def poll_bootstrap(self):
+        """Pick up finished bootstrap jobs and redraw the views that show them"""
+        if self.bootstrap.collect():
+            self.refresh.mark_dirty('performance')
+        if self.bootstrap.pending:
+            self.root.after(200, self.poll_bootstrap)
+        else:
+            self.bootstrap_polling = False
     
+    @timed('analytics.patterns')
     def update_pattern_display(self):
         """Update pattern analysis display"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
-        # Clear existing items
-        for item in self.pattern_tree.get_children():
-            self.pattern_tree.delete(item)
-        
-        # Get pattern analysis
-        cursor.execute('''
+        # Get pattern analysis, summed across profiles unless one is selected
+        profile_sql, profile_params = self.profile_filter()
+        cursor.execute(f'''
             SELECT 
                 safe_pick_count,
-                occurrence_count,
-                win_count,
-                (win_count * 100.0 / occurrence_count) as win_rate,
-                avg_profit,
-                total_profit
+                SUM(occurrence_count) as games,
+                SUM(win_count) as wins,
+                (SUM(win_count) * 100.0 / SUM(occurrence_count)) as win_rate,
+                {sigils('SUM(total_profit)')} / SUM(occurrence_count) as avg_profit,
+                {sigils('SUM(total_profit)')} as total_profit
             FROM pattern_analysis 
-            WHERE occurrence_count > 0
+            WHERE occurrence_count > 0 {profile_sql}
+            GROUP BY safe_pick_count
             ORDER BY avg_profit DESC
-        ''')
+        ''', profile_params)
         
         patterns = cursor.fetchall()
         
-        for pattern in patterns:
-            safe_picks, games, wins, win_rate, avg_profit, total_profit = pattern
-            self.pattern_tree.insert('', 'end', values=(
+        # Keyed by safe pick count; a log usually changes just one row
+        self.pattern_sync.update(
+            (safe_picks, (
                 safe_picks,
                 games,
                 wins,
                 f"{win_rate:.1f}%" if win_rate else "0.0%",
                 f"{avg_profit:.4f}",
                 f"{total_profit:.2f}"
-            ))
+            ), ())
+            for safe_picks, games, wins, win_rate, avg_profit, total_profit in patterns
+        )
         
         conn.close()
     
+    @timed('analytics.strategies')
     def update_strategy_analysis(self):
         """Update strategy analysis"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         
-        # Analyze strategies
-        cursor.execute('''
+        # Analyze strategies, segmented by game profile
+        profile_sql, profile_params = self.profile_filter()
+        cursor.execute(f'''
             SELECT 
+                game_profile,
                 strategy,
                 COUNT(*) as games,
                 SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END) as wins,
-                AVG(profit) as avg_profit,
-                SUM(profit) as total_profit,
+                {sigils('AVG(profit)')} as avg_profit,
+                {sigils('SUM(profit)')} as total_profit,
                 AVG(safe_picks) as avg_picks
             FROM game_results 
-            WHERE session_id = ?
-            GROUP BY strategy
+            WHERE session_id = ? {profile_sql}
+            GROUP BY game_profile, strategy
             ORDER BY avg_profit DESC
-        ''', (self.current_session,))
+        ''', (self.current_session,) + profile_params)
         
         strategies = cursor.fetchall()
         
+        # Sufficient statistics are maintained per round, so this is a tiny read
+        scope = self.analytics_profile_var.get()
+        stats = load_strategy_stats(conn, self.current_session,
+                                    None if scope == 'All' else scope)
+        
         self.strategy_text.delete("1.0", tk.END)
         
         if strategies:
             analysis = "STRATEGY PERFORMANCE ANALYSIS\n"
             analysis += "=" * 50 + "\n\n"
             
-            for strategy, games, wins, avg_profit, total_profit, avg_picks in strategies:
+            for game_profile, strategy, games, wins, avg_profit, total_profit, avg_picks in strategies:
                 win_rate = (wins / games * 100) if games > 0 else 0
                 
                 analysis += f"Strategy: {strategy.upper()}\n"
                 analysis += f"{'-'*30}\n"
+                analysis += f"Game Profile: {game_profile}\n"
                 analysis += f"Games Played: {games}\n"
                 analysis += f"Win Rate: {win_rate:.1f}%\n"
                 analysis += f"Average Profit: {avg_profit:.4f}\n"
                 analysis += f"Total Profit: {total_profit:.2f}\n"
                 analysis += f"Average Safe Picks: {avg_picks:.1f}\n"
                 
-                # Add recommendation
-                if avg_profit > 0:
-                    analysis += f"✓ RECOMMENDED (Positive EV: {avg_profit:.4f})\n"
+                # Add recommendation, unless the EV is indistinguishable from zero
+                key = (game_profile, strategy)
+                ev_p = ev_significance(stats[key]) if key in stats else float('nan')
+                if not ev_p < 0.05:
+                    analysis += f"? INCONCLUSIVE (EV {avg_profit:.4f} not significant, p={ev_p:.3f})\n"
+                elif avg_profit > 0:
+                    analysis += f"✓ RECOMMENDED (Positive EV: {avg_profit:.4f}, p={ev_p:.3f})\n"
                 else:
-                    analysis += f"⚠ NOT RECOMMENDED (Negative EV: {avg_profit:.4f})\n"
+                    analysis += f"⚠ NOT RECOMMENDED (Negative EV: {avg_profit:.4f}, p={ev_p:.3f})\n"
                 
                 analysis += "\n"
             
             # Find best strategy
             if strategies:
-                best_strat = max(strategies, key=lambda x: x[3])  # Index 3 is avg_profit
-                analysis += f"\nBEST PERFORMING STRATEGY: {best_strat[0].upper()}\n"
-                analysis += f"Average Profit: {best_strat[3]:.4f}\n"
-                analysis += f"Win Rate: {(best_strat[2]/best_strat[1]*100):.1f}%\n"
+                best_strat = max(strategies, key=lambda x: x[4])  # Index 4 is avg_profit
+                analysis += f"\nBEST PERFORMING STRATEGY: {best_strat[1].upper()} ({best_strat[0]})\n"
+                analysis += f"Average Profit: {best_strat[4]:.4f}\n"
+                analysis += f"Win Rate: {(best_strat[3]/best_strat[2]*100):.1f}%\n"
             
-            self.strategy_text.insert("1.0", analysis)
+            analysis += self.significance_report(conn, stats)
+        else:
+            analysis = ""
+        
+        analysis += self.kelly_report(conn)
+        self.strategy_text.insert("1.0", analysis)
+        
+        conn.close()
+    
+    def significance_report(self, conn, stats):
+        """Pairwise tests stating whether strategy differences are real, per game profile"""
+        grouped = {game_profile: profile_stats
+                   for game_profile, profile_stats in sorted(by_profile(stats).items())
+                   if len(profile_stats) > 1}
+        if not grouped:
+            return ""
+        
+        # Permutation tests only for small samples, where they matter
+        permutation = {}
+        report = ""
+        if sum(s.games for s in stats.values()) <= PERMUTATION_MAX_ROUNDS:
+            permutation = self.permutation_tests(conn)
+            if permutation is None:
+                report += "\n(Permutation tests running; verdicts use Welch's test until they finish)\n"
+        
+        scope = self.analytics_profile_var.get()
+        sequential = load_sequential(conn, self.current_session, None if scope == 'All' else scope)
+        for game_profile, profile_stats in grouped.items():
+            report += self.profile_significance_report(
+                game_profile, profile_stats, (permutation or {}).get(game_profile),
+                sequential.get(game_profile))
+        return report
+    
+    def permutation_tests(self, conn):
+        """Permutation p-values of the current scope, or None while they are computed"""
+        key = (self.current_session, self.analytics_profile_var.get(), self.data_version)
+        if key == self.permutation_key:
+            return self.permutation_results
+        
+        profile_sql, profile_params = self.profile_filter()
+        samples = defaultdict(lambda: defaultdict(list))
+        for game_profile, strategy, profit in conn.execute(f'''
+            SELECT game_profile, strategy, profit FROM game_results
+            WHERE session_id = ? {profile_sql}
+        ''', (self.current_session,) + profile_params):
+            samples[game_profile][strategy].append(to_sigils(profit))
+        
+        # Thousands of shuffles per pair: far too slow for the Tk thread
+        if self.permutation_job is not None:
+            self.permutation_job.cancel()
+        self.permutation_key = key
+        self.permutation_results = None
+        self.permutation_job = self.bootstrap.submit(
+            profile_permutation_tests,
+            {game_profile: dict(profile_samples) for game_profile, profile_samples in samples.items()})
+        self.root.after(200, self.poll_permutation_tests)
+        return None
+    
+    def poll_permutation_tests(self):
+        """Pick up the finished permutation tests and redraw the Strategies pane"""
+        job = self.permutation_job
+        if job is None:
+            return
+        if not job.done():
+            self.root.after(200, self.poll_permutation_tests)
+            return
+        self.permutation_job = None
+        if not job.cancelled():
+            # A failed job leaves the Welch verdicts in place rather than retrying forever
+            self.permutation_results = {} if job.exception() else job.result()
+            self.refresh.mark_dirty('strategies')
+    
+    def profile_significance_report(self, game_profile, stats, permutation, sequential):
+        """Pairwise tests between the strategies played under one game profile"""
+        comparisons = compare_strategies(stats, permutation, sequential)
+        
+        report = f"\nSTRATEGY SIGNIFICANCE (pairwise, mean profit) - {game_profile}\n"
+        report += "=" * 50 + "\n"
+        for c in comparisons:
+            report += f"{c['better'].upper()} vs {c['worse'].upper()}: {c['verdict']}\n"
+            report += f"  Difference: {c['difference']:+.4f}/round, Welch p={c['welch_p']:.4f}"
+            if c['permutation_p'] is not None:
+                report += f", permutation p={c['permutation_p']:.4f}"
+            report += f", sequential p={c['sequential_p']:.4f}\n"
+            report += (f"  P({c['better']} better): profit {c['prob_better_mean']:.1%}, "
+                       f"win rate {c['prob_better_win_rate']:.1%}\n")
+        
+        best = max(stats, key=lambda name: stats[name].mean)
+        beaten = [c['worse'] for c in comparisons if c['better'] == best and c['verdict'] == 'REAL']
+        others = [name for name in stats if name != best]
+        if len(beaten) == len(others):
+            report += f"\n{best.upper()} is significantly better than every other strategy.\n"
+        elif beaten:
+            report += (f"\n{best.upper()} is significantly better than {', '.join(beaten)} only; "
+                       f"other differences may be noise.\n")
+        else:
+            report += "\nNo strategy is significantly better than the others yet; rankings may be noise.\n"
+        
+        return report
+    
+    def kelly_report(self, conn):
+        """Kelly stake per stop point under theoretical and observed odds"""
+        scope = self.analytics_profile_var.get()
+        names = list(self.profiles) if scope == 'All' else [scope]
+        half = KELLY_FRACTIONS.index(0.5)
+        report = ""
+        
+        for name in names:
+            # Observed odds come from every recorded round of the profile, not just this session
+            rows = conn.execute('''
+                SELECT safe_pick_count, occurrence_count, win_count
+                FROM pattern_analysis
+                WHERE game_profile = ?
+            ''', (name,)).fetchall()
+            if not rows and scope == 'All':
+                continue
+            
+            profile = self.profiles[name]
+            table = self.kelly.analyze(profile, rows, self.data_version)
+            theory, observed = table['theory'], table['empirical']
+            
+            report += f"\nOPTIMAL BET SIZING (KELLY) - {profile.label()}\n"
+            report += "=" * 50 + "\n"
+            report += (f"{'Picks':>5} {'Mult':>8} {'P(theory)':>9} {'P(obs)':>7} {'Tries':>7} "
+                       f"{'Kelly(th)':>9} {'Kelly(obs)':>10} {'Growth ½K':>10}\n")
+            for i, picks in enumerate(table['picks']):
+                p_obs = table['empirical_survival'][i]
+                report += (f"{picks:>5} {table['multipliers'][i]:>7.2f}x "
+                           f"{table['theory_survival'][i]:>9.3f} "
+                           f"{'-' if np.isnan(p_obs) else f'{p_obs:.3f}':>7} "
+                           f"{int(table['at_risk'][i]):>7} "
+                           f"{theory['kelly'][i]:>9.1%} {observed['kelly'][i]:>10.1%} "
+                           f"{observed['growth'][i, half]:>10.5f}\n")
+            
+            best = int(np.argmax(observed['growth'][:, half]))
+            if observed['kelly'][best] > 0:
+                stake = observed['kelly'][best] * KELLY_FRACTIONS[half] * self.current_balance
+                report += (f"\nBest observed stop point: {best + 1} picks "
+                           f"(edge {observed['edge'][best]:+.1%}, Kelly {observed['kelly'][best]:.1%})\n")
+                report += f"Half-Kelly stake at current balance: {stake:.2f} Sigils\n"
+            else:
+                report += "\nNo stop point shows a positive edge; the growth-optimal stake is 0.\n"
+            if not theory['kelly'].any():
+                report += "Under the profile's theoretical odds every stop point has negative EV.\n"
         
+        return report
+    
+    @timed('analytics.timing')
+    def update_timing_analysis(self):
+        """Update timing analysis: pace per session, pace vs profit, time of day"""
+        conn = self.connect()
+        profile_sql, profile_params = self.profile_filter()
+        
+        sessions = session_pace(conn, profile_sql, profile_params, limit=15)
+        rounds, correlation, p_value, buckets = pace_profit(conn, profile_sql, profile_params)
+        hours = hour_profile(conn, profile_sql, profile_params)
         conn.close()
+        
+        self.timing_text.delete("1.0", tk.END)
+        if not sessions:
+            return
+        
+        fmt = lambda value, width: f"{'-':>{width}}" if value is None else f"{value:>{width}.1f}"
+        
+        analysis = "PACE BY SESSION (most recent first, breaks excluded)\n"
+        analysis += "=" * 60 + "\n"
+        analysis += f"{'Session':<28} {'Rounds':>6} {'Hours':>6} {'Rounds/h':>9} {'Pace':>7} {'Breaks':>6}\n"
+        for session_id, count, active_hours, per_hour, avg_pace, breaks in sessions:
+            marker = '*' if session_id == self.current_session else ' '
+            analysis += (f"{marker}{session_id[:27]:<27} {count:>6} {active_hours:>6.2f} "
+                         f"{fmt(per_hour, 9)} {fmt(avg_pace, 6)}s {breaks:>6}\n")
+        
+        analysis += "\nPACE VS PROFIT\n"
+        analysis += "=" * 60 + "\n"
+        if correlation is None:
+            analysis += f"Not enough timed rounds for a correlation ({rounds} timed).\n"
+        else:
+            analysis += (f"Correlation of seconds per round with profit: r = {correlation:+.3f}, "
+                         f"p = {p_value:.3f} ({rounds} rounds)\n")
+            analysis += f"{'Quartile':<10} {'Pace range':>16} {'Rounds':>7} {'Win Rate':>9} {'Avg Profit':>11}\n"
+            for bucket, low, high, count, win_rate, avg_profit in buckets:
+                analysis += (f"{bucket:<10} {f'{low:.1f}-{high:.1f}s':>16} {count:>7} "
+                             f"{win_rate:>8.1f}% {avg_profit:>11.4f}\n")
+            if p_value < 0.05:
+                analysis += ("Faster rounds earn significantly less; rushing may be costing you.\n"
+                             if correlation > 0 else
+                             "Slower rounds earn significantly less; long deliberation is not paying off.\n")
+        
+        analysis += "\nTIME OF DAY (local)\n"
+        analysis += "=" * 60 + "\n"
+        analysis += f"{'Hour':<6} {'Rounds':>7} {'Rounds/h':>9} {'Win Rate':>9} {'Avg Profit':>11} {'Pace':>7}\n"
+        for hour, count, per_hour, win_rate, avg_profit, avg_pace in hours:
+            analysis += (f"{hour:02d}:00  {count:>7} {fmt(per_hour, 9)} {win_rate:>8.1f}% "
+                         f"{avg_profit:>11.4f} {fmt(avg_pace, 6)}s\n")
+        
+        self.timing_text.insert("1.0", analysis)
+    
+    def load_history(self):
+        """Rebuild the history pager from the filters and show the first page"""
+        if self.history_pager:
+            self.history_pager.close()
+        
+        session = self.history_session_var.get().strip()
+        session_id = {'Current': self.current_session, 'All': None}.get(session, session or None)
+        strategy = self.history_strategy_var.get()
+        result = self.history_result_var.get()
+        picks = self.history_picks_var.get().strip()
+        
+        if self.history_archive_var.get():
+            table = 'scoped_results'
+            if session_id:
+                connect = lambda: open_scope(self.db_path, self.archive_dir,
+                                             session_ids=[session_id])
+            else:
+                connect = lambda: scope_batches(self.db_path, self.archive_dir)
+        else:
+            table = 'game_results'
+            connect = self.connect
+        
+        sort_column, descending = self.history_sort
+        try:
+            self.history_pager = HistoryPager(
+                connect, table=table,
+                session_id=session_id,
+                strategy=None if strategy == 'All' else strategy,
+                result=None if result == 'All' else result,
+                safe_picks=int(picks) if picks else None,
+                sort_column=sort_column, descending=descending)
+        except ValueError as e:
+            messagebox.showerror("History", f"Invalid filter: {str(e)}")
+            self.history_pager = None
+            return
+        
+        self.history_first()
+    
+    def sort_history(self, column):
+        """Sort history by a column, toggling direction on repeat clicks"""
+        current, descending = self.history_sort
+        self.history_sort = (column, not descending if column == current else False)
+        
+        for col in PAGE_COLUMNS:
+            arrow = ''
+            if col == column:
+                arrow = ' ▼' if self.history_sort[1] else ' ▲'
+            self.history_tree.heading(col, text=self.history_headings[col] + arrow)
+        
+        self.load_history()
+    
+    def history_row_values(self, row):
+        """Format a pager row for display"""
+        session_id, round_num, timestamp, bet, strategy, result, picks, mult, profit, balance = row
+        return (session_id, round_num, timestamp, f"{to_sigils(bet):.2f}", strategy,
+                result.upper(), picks, f"{mult:.2f}x", f"{to_sigils(profit):+.2f}",
+                f"{to_sigils(balance):.2f}")
+    
+    def show_history_window(self, rows, offset):
+        """Replace the loaded window with a single page"""
+        self.history_tree.delete(*self.history_tree.get_children())
+        self.history_pages = [rows] if rows else []
+        self.history_offset = offset
+        for row in rows:
+            self.history_tree.insert('', 'end', values=self.history_row_values(row), tags=(row[5],))
+        self.history_tree.yview_moveto(0)
+        self.update_history_position()
+    
+    def update_history_position(self):
+        total = self.history_pager.count() if self.history_pager else 0
+        loaded = sum(len(page) for page in self.history_pages)
+        if loaded:
+            self.history_pos_var.set(
+                f"Rounds {self.history_offset + 1:,}–{self.history_offset + loaded:,} of {total:,}")
+        else:
+            self.history_pos_var.set("No matching rounds")
+    
+    def history_first(self):
+        if self.history_pager is None:
+            self.load_history()
+            return
+        self.show_history_window(self.history_pager.first_page(), 0)
     
+    def history_last(self):
+        if self.history_pager is None:
+            return
+        rows = self.history_pager.last_page()
+        self.show_history_window(rows, max(self.history_pager.count() - len(rows), 0))
+    
+    def history_next(self):
+        if not self.history_pages:
+            return
+        rows = self.history_pager.page_after(self.history_pager.key_of(self.history_pages[-1][-1]))
+        if rows:
+            loaded = sum(len(page) for page in self.history_pages)
+            self.show_history_window(rows, self.history_offset + loaded)
+    
+    def history_prev(self):
+        if not self.history_pages:
+            return
+        rows = self.history_pager.page_before(self.history_pager.key_of(self.history_pages[0][0]))
+        if rows:
+            self.show_history_window(rows, max(self.history_offset - len(rows), 0))
+    
+    def scroll_history(self, *args):
+        """Scrollbar command: scroll, then extend the window at the edges"""
+        self.history_tree.yview(*args)
+        self.check_history_edges()
+    
+    def check_history_edges(self):
+        """Slide the loaded window when the view reaches its top or bottom"""
+        if not self.history_pages:
+            return
+        first, last = self.history_tree.yview()
+        children = self.history_tree.get_children()
+        anchor = self.history_tree.identify_row(1) or (children[0] if children else None)
+        
+        if last >= 0.999:
+            rows = self.history_pager.page_after(self.history_pager.key_of(self.history_pages[-1][-1]))
+            if not rows:
+                return
+            for row in rows:
+                self.history_tree.insert('', 'end', values=self.history_row_values(row), tags=(row[5],))
+            self.history_pages.append(rows)
+            if len(self.history_pages) > self.history_window:
+                dropped = self.history_pages.pop(0)
+                self.history_tree.delete(*self.history_tree.get_children()[:len(dropped)])
+                self.history_offset += len(dropped)
+        elif first <= 0.001 and self.history_offset > 0:
+            rows = self.history_pager.page_before(self.history_pager.key_of(self.history_pages[0][0]))
+            if not rows:
+                return
+            for i, row in enumerate(rows):
+                self.history_tree.insert('', i, values=self.history_row_values(row), tags=(row[5],))
+            self.history_pages.insert(0, rows)
+            self.history_offset = max(self.history_offset - len(rows), 0)
+            if len(self.history_pages) > self.history_window:
+                dropped = self.history_pages.pop()
+                self.history_tree.delete(*self.history_tree.get_children()[-len(dropped):])
+        else:
+            return
+        
+        # Keep the row that was on screen in place after the window moved
+        children = self.history_tree.get_children()
+        if anchor and self.history_tree.exists(anchor):
+            self.history_tree.yview_moveto(self.history_tree.index(anchor) / len(children))
+        self.update_history_position()
+    
+    @timed('chart.total')
     def generate_chart(self):
         """Generate selected chart"""
         chart_type = self.chart_type_var.get()
         
         # Clear previous chart
+        self.chart_wall.cancel()
         for widget in self.chart_display_frame.winfo_children():
             widget.destroy()
         
-        conn = sqlite3.connect(self.db_path)
-        
         try:
+            # Per-round charts read columns of the shared session buffer
+            rounds = self.session_data()
+            
             if chart_type == 'balance':
-                self.generate_balance_chart(conn)
+                self.generate_balance_chart(rounds)
             elif chart_type == 'profit_dist':
-                self.generate_profit_distribution_chart(conn)
+                self.generate_profit_distribution_chart(rounds)
             elif chart_type == 'win_loss':
-                self.generate_win_loss_chart(conn)
+                self.generate_win_loss_chart(rounds)
             elif chart_type == 'heatmap':
-                self.generate_heatmap_chart(conn)
+                self.generate_heatmap_chart(rounds)
             elif chart_type == 'multiplier':
-                self.generate_multiplier_chart(conn)
+                self.generate_multiplier_chart(rounds)
             elif chart_type == 'daily':
-                self.generate_daily_chart(conn)
+                self.generate_daily_chart(self.time_series(self.chart_freq_var.get()))
             elif chart_type == 'risk':
-                self.generate_risk_chart(conn)
+                self.generate_risk_chart(rounds)
+            elif chart_type == 'calendar':
+                self.generate_calendar_chart(self.time_series('day'))
+            elif chart_type == 'hour_of_day':
+                self.generate_hour_chart(self.time_series('hour'))
                 
         except Exception as e:
             messagebox.showerror("Chart Error", f"Failed to generate chart: {str(e)}")
+    
+    def generate_chart_wall(self):
+        """Render every chart type at once as a grid of image tiles"""
+        self.chart_wall.cancel()
+        for widget in self.chart_display_frame.winfo_children():
+            widget.destroy()
+        
+        try:
+            # One fetch for the whole wall: the session buffer and one series per interval
+            rounds = self.session_data()
+            freqs = {name: freq or self.chart_freq_var.get()
+                     for name, freq in SERIES_FREQUENCIES.items()}
+            series = {freq: self.time_series(freq) for freq in set(freqs.values())}
+        except Exception as e:
+            messagebox.showerror("Chart Error", f"Failed to load chart data: {str(e)}")
+            return
+        
+        names = [value for _, value in self.chart_types]
+        rows = -(-len(names) // WALL_COLUMNS)
+        self.chart_display_frame.update_idletasks()
+        width = max(200, self.chart_display_frame.winfo_width() // WALL_COLUMNS - 4)
+        height = max(150, self.chart_display_frame.winfo_height() // rows - 4)
+        
+        self.wall_tiles = {}
+        for index, name in enumerate(names):
+            tile = ttk.Label(self.chart_display_frame, text="Rendering...", anchor='center',
+                             cursor='hand2')
+            tile.grid(row=index // WALL_COLUMNS, column=index % WALL_COLUMNS, sticky='nsew',
+                      padx=2, pady=2)
+            tile.bind('<Button-1>', lambda event, name=name: self.open_wall_chart(name))
+            self.wall_tiles[name] = tile
+        for column in range(WALL_COLUMNS):
+            self.chart_display_frame.columnconfigure(column, weight=1)
+        for row in range(rows):
+            self.chart_display_frame.rowconfigure(row, weight=1)
+        
+        jobs = [(name, series[freqs[name]] if name in freqs else rounds) for name in names]
+        self.chart_wall.submit(jobs, {'current_balance': self.current_balance,
+                                      'colors': self.colors}, width, height)
+        self.wall_started = time.perf_counter()
+        if not self.wall_polling:
+            self.wall_polling = True
+            self.root.after(20, self.poll_chart_wall)
+    
+    def poll_chart_wall(self):
+        """Blit chart wall tiles into Tk as the workers finish them"""
+        for name, tile in self.chart_wall.collect().items():
+            label = self.wall_tiles.get(name)
+            if label is None or not label.winfo_exists():
+                continue
+            if isinstance(tile, Exception):
+                label.config(text=f"Failed: {tile}")
+            elif tile is None:
+                label.config(text="No data")
+            else:
+                size, pixels = tile
+                label.image = ImageTk.PhotoImage(
+                    Image.frombuffer('RGBA', size, pixels, 'raw', 'RGBA', 0, 1))
+                label.config(image=label.image, text='')
+        
+        if self.chart_wall.pending:
+            self.root.after(20, self.poll_chart_wall)
+            return
+        self.wall_polling = False
+        if self.wall_started is not None:
+            elapsed = time.perf_counter() - self.wall_started
+            metrics.record('chart.wall', elapsed * 1000)
+            self.wall_started = None
+            self.status_var.set(f"Chart wall rendered in {elapsed:.2f}s")
+    
+    def open_wall_chart(self, name):
+        """Show one chart of the wall full size"""
+        self.chart_type_var.set(name)
+        self.generate_chart()
+    
+    def time_series(self, freq):
+        """Gap-filled series of the chart time scope at one interval"""
+        scope = self.chart_scope_var.get()
+        if scope == 'Session':
+            return resample_rounds(self.session_data(), freq)
+        
+        # Wider scopes aggregate per bucket in SQL; the cache drops them on any write
+        where, params = self.profile_filter()
+        if scope == 'Including Archive':
+            rows = self.query_cache.get(('archive_buckets', freq, where, tuple(params)),
+                                        lambda: self.archive_buckets(freq, where, params))
+            return from_buckets(rows, freq)
+        
+        conn = self.connect()
+        try:
+            rows = self.query_cache.fetchall(conn, bucket_query(freq, 'game_results', where), params)
         finally:
             conn.close()
+        return from_buckets(rows, freq)
     
-    def generate_balance_chart(self, conn):
+    def archive_buckets(self, freq, where, params):
+        """Bucket rows over live and archived rounds, aggregated per batch of partitions"""
+        conns = scope_batches(self.db_path, self.archive_dir)
+        try:
+            return merge_buckets(conn.execute(bucket_query(freq, 'scoped_results', where),
+                                              params).fetchall()
+                                 for conn in conns)
+        finally:
+            for conn in conns:
+                conn.close()
+    
+    def show_figure(self, fig):
+        """Embed a chart figure in the chart display area"""
+        if fig is None:
+            return
+        canvas = FigureCanvasTkAgg(fig, self.chart_display_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill='both', expand=True)
+    
+    @timed('chart.balance')
+    def generate_balance_chart(self, rounds):
         """Generate balance over time chart"""
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT timestamp, ending_balance 
-            FROM game_results 
-            WHERE session_id = ?
-            ORDER BY timestamp
-        ''', (self.current_session,))
-        
-        data = cursor.fetchall()
-        
-        if data:
-            # Create figure
-            fig, ax = plt.subplots(figsize=(12, 6))
-            
-            # Prepare data
-            timestamps = [datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S') for row in data]
-            balances = [row[1] for row in data]
-            
-            # Plot
-            ax.plot(timestamps, balances, 'b-', linewidth=2, marker='o', markersize=4)
-            ax.axhline(y=self.current_balance, color='g', linestyle='--', alpha=0.7, 
-                      label=f'Current: {self.current_balance:.2f}')
-            
-            # Formatting
-            ax.set_xlabel('Time', fontsize=12)
-            ax.set_ylabel('Balance (Sigils)', fontsize=12)
-            ax.set_title('Balance Evolution Over Time', fontsize=14, fontweight='bold')
-            ax.legend()
-            ax.grid(True, alpha=0.3)
-            
-            # Rotate x-axis labels
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            
-            # Display in GUI
-            canvas = FigureCanvasTkAgg(fig, self.chart_display_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.show_figure(balance_figure(rounds, self.current_balance))
     
-    def generate_profit_distribution_chart(self, conn):
+    @timed('chart.profit_dist')
+    def generate_profit_distribution_chart(self, rounds):
         """Generate profit distribution histogram"""
-        cursor = conn.cursor()
-        cursor.execute('SELECT profit FROM game_results WHERE session_id = ?', 
-                      (self.current_session,))
-        
-        profits = [row[0] for row in cursor.fetchall()]
-        
-        if profits:
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-            
-            # Histogram
-            ax1.hist(profits, bins=20, edgecolor='black', alpha=0.7, color='skyblue')
-            ax1.axvline(x=np.mean(profits), color='red', linestyle='--', 
-                       label=f'Mean: {np.mean(profits):.2f}')
-            ax1.set_xlabel('Profit/Loss (Sigils)')
-            ax1.set_ylabel('Frequency')
-            ax1.set_title('Profit Distribution Histogram')
-            ax1.legend()
-            ax1.grid(True, alpha=0.3)
-            
-            # Box plot
-            ax2.boxplot(profits, vert=False)
-            ax2.set_xlabel('Profit/Loss (Sigils)')
-            ax2.set_title('Profit Distribution Box Plot')
-            ax2.grid(True, alpha=0.3)
-            
-            plt.tight_layout()
-            
-            canvas = FigureCanvasTkAgg(fig, self.chart_display_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.show_figure(profit_distribution_figure(rounds))
     
-    def generate_win_loss_chart(self, conn):
+    @timed('chart.win_loss')
+    def generate_win_loss_chart(self, rounds):
         """Generate win/loss ratio chart"""
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT result, COUNT(*) 
-            FROM game_results 
-            WHERE session_id = ?
-            GROUP BY result
-        ''', (self.current_session,))
-        
-        data = dict(cursor.fetchall())
-        
-        if data:
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
-            
-            # Pie chart
-            labels = list(data.keys())
-            sizes = list(data.values())
-            colors = ['#2ecc71', '#e74c3c']
-            
-            ax1.pie(sizes, labels=labels, autopct='%1.1f%%', colors=colors, 
-                   startangle=90, shadow=True)
-            ax1.axis('equal')
-            ax1.set_title('Win/Loss Ratio')
-            
-            # Bar chart
-            ax2.bar(labels, sizes, color=colors, alpha=0.7)
-            ax2.set_xlabel('Result')
-            ax2.set_ylabel('Count')
-            ax2.set_title('Win/Loss Count')
-            ax2.grid(True, alpha=0.3)
-            
-            # Add value labels on bars
-            for i, v in enumerate(sizes):
-                ax2.text(i, v + 0.5, str(v), ha='center')
-            
-            plt.tight_layout()
-            
-            canvas = FigureCanvasTkAgg(fig, self.chart_display_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.show_figure(win_loss_figure(rounds, self.colors))
     
-    def generate_heatmap_chart(self, conn):
+    @timed('chart.heatmap')
+    def generate_heatmap_chart(self, rounds):
         """Generate safe picks heatmap"""
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT safe_picks, result, COUNT(*)
-            FROM game_results 
-            WHERE session_id = ?
-            GROUP BY safe_picks, result
-        ''', (self.current_session,))
-        
-        data = cursor.fetchall()
-        
-        if data:
-            # Create pivot table
-            df = pd.DataFrame(data, columns=['safe_picks', 'result', 'count'])
-            pivot = df.pivot(index='safe_picks', columns='result', values='count').fillna(0)
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Create heatmap
-            sns.heatmap(pivot, annot=True, fmt='g', cmap='YlOrRd', ax=ax)
-            ax.set_xlabel('Result')
-            ax.set_ylabel('Safe Picks')
-            ax.set_title('Safe Picks vs Result Heatmap')
-            
-            plt.tight_layout()
-            
-            canvas = FigureCanvasTkAgg(fig, self.chart_display_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.show_figure(heatmap_figure(rounds))
     
-    def generate_multiplier_chart(self, conn):
+    @timed('chart.multiplier')
+    def generate_multiplier_chart(self, rounds):
         """Generate multiplier analysis chart"""
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT multiplier, COUNT(*), AVG(profit)
-            FROM game_results 
-            WHERE session_id = ? AND result = 'win'
-            GROUP BY multiplier
-            ORDER BY multiplier
-        ''', (self.current_session,))
-        
-        data = cursor.fetchall()
-        
-        if data:
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-            
-            multipliers = [row[0] for row in data]
-            counts = [row[1] for row in data]
-            avg_profits = [row[2] for row in data]
-            
-            # Frequency chart
-            ax1.bar(range(len(multipliers)), counts, alpha=0.7, color='blue')
-            ax1.set_xlabel('Multiplier')
-            ax1.set_ylabel('Frequency')
-            ax1.set_title('Multiplier Frequency Distribution')
-            ax1.set_xticks(range(len(multipliers)))
-            ax1.set_xticklabels([f'{m:.2f}x' for m in multipliers], rotation=45)
-            ax1.grid(True, alpha=0.3)
-            
-            # Profit vs Multiplier
-            ax2.scatter(multipliers, avg_profits, s=100, alpha=0.7, color='red')
-            ax2.set_xlabel('Multiplier')
-            ax2.set_ylabel('Average Profit')
-            ax2.set_title('Profit vs Multiplier')
-            ax2.grid(True, alpha=0.3)
-            
-            # Add trend line
-            if len(multipliers) > 1:
-                z = np.polyfit(multipliers, avg_profits, 1)
-                p = np.poly1d(z)
-                ax2.plot(multipliers, p(multipliers), "r--", alpha=0.5)
-            
-            plt.tight_layout()
-            
-            canvas = FigureCanvasTkAgg(fig, self.chart_display_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.show_figure(multiplier_figure(rounds))
     
-    def generate_daily_chart(self, conn):
-        """Generate daily performance chart"""
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT DATE(timestamp) as date, 
-                   SUM(profit) as daily_profit,
-                   COUNT(*) as daily_games
-            FROM game_results 
-            WHERE session_id = ?
-            GROUP BY DATE(timestamp)
-            ORDER BY date
-        ''', (self.current_session,))
-        
-        data = cursor.fetchall()
-        
-        if data:
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-            
-            dates = [row[0] for row in data]
-            profits = [row[1] for row in data]
-            games = [row[2] for row in data]
-            
-            # Daily profit
-            bars = ax1.bar(dates, profits, alpha=0.7, color=['green' if p > 0 else 'red' for p in profits])
-            ax1.set_xlabel('Date')
-            ax1.set_ylabel('Daily Profit (Sigils)')
-            ax1.set_title('Daily Profit Performance')
-            ax1.grid(True, alpha=0.3)
-            
-            # Add value labels
-            for bar, profit in zip(bars, profits):
-                height = bar.get_height()
-                ax1.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{profit:+.1f}', ha='center', va='bottom' if profit > 0 else 'top')
-            
-            # Daily games
-            ax2.bar(dates, games, alpha=0.7, color='blue')
-            ax2.set_xlabel('Date')
-            ax2.set_ylabel('Number of Games')
-            ax2.set_title('Daily Game Volume')
-            ax2.grid(True, alpha=0.3)
-            
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            
-            canvas = FigureCanvasTkAgg(fig, self.chart_display_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
+    @timed('chart.daily')
+    def generate_daily_chart(self, series):
+        """Generate profit, volume, balance and win rate per interval"""
+        self.show_figure(daily_figure(series))
+    
+    @timed('chart.calendar')
+    def generate_calendar_chart(self, series):
+        """Generate a calendar heatmap of daily profit"""
+        self.show_figure(calendar_figure(series))
     
-    def generate_risk_chart(self, conn):
+    @timed('chart.hour_of_day')
+    def generate_hour_chart(self, series):
+        """Generate volume, win rate and average profit by local hour of day"""
+        self.show_figure(hour_figure(series))
+    
+    @timed('chart.risk')
+    def generate_risk_chart(self, rounds):
         """Generate risk analysis chart"""
-        cursor = conn.cursor()
-        cursor.execute('SELECT profit FROM game_results WHERE session_id = ?', 
-                      (self.current_session,))
-        
-        profits = [row[0] for row in cursor.fetchall()]
-        
-        if profits:
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-            
-            # Cumulative profit
-            cumulative = np.cumsum(profits)
-            ax1.plot(range(len(cumulative)), cumulative, 'b-', linewidth=2)
-            ax1.axhline(y=0, color='k', linestyle='-', alpha=0.3)
-            ax1.fill_between(range(len(cumulative)), 0, cumulative, 
-                            where=cumulative >= 0, color='green', alpha=0.3)
-            ax1.fill_between(range(len(cumulative)), 0, cumulative, 
-                            where=cumulative < 0, color='red', alpha=0.3)
-            ax1.set_xlabel('Game Number')
-            ax1.set_ylabel('Cumulative Profit (Sigils)')
-            ax1.set_title('Cumulative Profit Curve')
-            ax1.grid(True, alpha=0.3)
-            
-            # Drawdown analysis
-            running_max = np.maximum.accumulate(cumulative)
-            drawdown = (cumulative - running_max) / (running_max + 0.001)
-            
-            ax2.fill_between(range(len(drawdown)), drawdown, 0, 
-                            where=drawdown < 0, color='red', alpha=0.3)
-            ax2.set_xlabel('Game Number')
-            ax2.set_ylabel('Drawdown (%)')
-            ax2.set_title('Drawdown Analysis')
-            ax2.grid(True, alpha=0.3)
-            
-            plt.tight_layout()
-            
-            canvas = FigureCanvasTkAgg(fig, self.chart_display_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.show_figure(risk_figure(rounds))
     
     def browse_csv(self):
         """Browse for CSV file"""
@@ -1458,29 +2537,44 @@ RECOMMENDATIONS
         )
         
         if filename:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM game_results 
-                WHERE session_id = ?
-                ORDER BY timestamp
-            ''', (self.current_session,))
-            
-            rows = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(columns)
-                writer.writerows(rows)
-            
-            conn.close()
+            count = self.write_session_csv(filename)
             
             messagebox.showinfo("Export Complete", 
-                              f"Exported {len(rows)} rows to {filename}")
+                              f"Exported {count} rows to {filename}")
             self.status_var.set(f"Exported session to {filename}")
     
+    def write_session_csv(self, filename):
+        """Write the current session to a CSV file and return the row count"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT * FROM game_results 
+            WHERE session_id = ?
+            ORDER BY timestamp
+        ''', (self.current_session,))
+        
+        rows = cursor.fetchall()
+        columns = [desc[0] for desc in cursor.description]
+        
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(columns)
+            writer.writerows(self.csv_rows(columns, rows))
+        
+        conn.close()
+        return len(rows)
+    
+    @staticmethod
+    def csv_rows(columns, rows):
+        """Rows with money columns converted from units to Sigils for export"""
+        money = [i for i, column in enumerate(columns) if column in MONEY_FIELDS]
+        for row in rows:
+            row = list(row)
+            for i in money:
+                row[i] = to_sigils(row[i])
+            yield row
+    
     def export_all_csv(self):
         """Export all data to CSV"""
         filename = filedialog.asksaveasfilename(
@@ -1490,23 +2584,38 @@ RECOMMENDATIONS
         )
         
         if filename:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT * FROM game_results ORDER BY timestamp')
-            rows = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
+            count = self.write_all_csv(filename)
             
+            messagebox.showinfo("Export Complete", 
+                              f"Exported {count} rows to {filename}")
+            self.status_var.set(f"Exported all data to {filename}")
+    
+    def write_all_csv(self, filename):
+        """Write every round, including archived ones, to CSV and return the row count"""
+        conns = scope_batches(self.db_path, self.archive_dir)
+        try:
+            cursors = [conn.execute('SELECT * FROM scoped_results ORDER BY timestamp')
+                       for conn in conns]
+            columns = [desc[0] for desc in cursors[0].description]
+            timestamp = columns.index('timestamp')
+            # Each batch comes in time order; merging them keeps the whole export in order
+            rows = heapq.merge(*cursors, key=lambda row: row[timestamp] or '')
+            count = 0
+            
+            # Stream in chunks so large histories never sit in memory at once
             with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
                 writer = csv.writer(csvfile)
                 writer.writerow(columns)
-                writer.writerows(rows)
-            
-            conn.close()
-            
-            messagebox.showinfo("Export Complete", 
-                              f"Exported {len(rows)} rows to {filename}")
-            self.status_var.set(f"Exported all data to {filename}")
+                while True:
+                    chunk = list(islice(rows, 10000))
+                    if not chunk:
+                        break
+                    writer.writerows(self.csv_rows(columns, chunk))
+                    count += len(chunk)
+        finally:
+            for conn in conns:
+                conn.close()
+        return count
     
     def export_report(self):
         """Export comprehensive report"""
@@ -1527,27 +2636,66 @@ RECOMMENDATIONS
                               f"Report saved to {filename}")
             self.status_var.set(f"Report exported to {filename}")
     
+    def export_batch_reports(self):
+        """Write reports for every changed session plus index pages, in the background"""
+        if self.report_thread and self.report_thread.is_alive():
+            self.status_var.set("Batch reports already running...")
+            return
+        
+        out_dir = filedialog.askdirectory(title="Select Report Directory",
+                                          initialdir=self.reports_dir, mustexist=False)
+        if not out_dir:
+            return
+        self.reports_dir = out_dir
+        
+        def progress(done, total):
+            self.report_queue.put(('progress', (done, total)))
+        
+        def worker():
+            try:
+                summary = generate_reports(self.db_path, out_dir, self.archive_dir,
+                                           progress=progress)
+                self.report_queue.put(('done', summary))
+            except Exception as e:
+                self.report_queue.put(('error', e))
+        
+        self.status_var.set("Generating batch reports...")
+        self.report_thread = threading.Thread(target=worker, daemon=True)
+        self.report_thread.start()
+        self.root.after(100, self.poll_batch_reports)
+    
+    def poll_batch_reports(self):
+        """Relay batch report progress to the UI thread"""
+        finished = False
+        while not self.report_queue.empty():
+            kind, payload = self.report_queue.get_nowait()
+            if kind == 'progress':
+                self.status_var.set(f"Generating batch reports... {payload[0]}/{payload[1]}")
+            elif kind == 'done':
+                finished = True
+                self.status_var.set(
+                    f"Batch reports in {self.reports_dir}: {payload['rendered']} rendered, "
+                    f"{payload['unchanged']} unchanged of {payload['sessions']} sessions")
+            else:
+                finished = True
+                messagebox.showerror("Report Error", f"Batch reports failed: {str(payload)}")
+                self.status_var.set(f"Error: {str(payload)}")
+        
+        if not finished:
+            self.root.after(100, self.poll_batch_reports)
+    
+    @timed('report.generate')
     def generate_report_content(self):
         """Generate comprehensive report content"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self.connect()
         
         # Get session data
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END) as wins,
-                SUM(profit) as total_profit,
-                AVG(profit) as avg_profit,
-                MIN(profit) as min_profit,
-                MAX(profit) as max_profit,
-                STDDEV(profit) as std_profit,
-                AVG(safe_picks) as avg_safe_picks
-            FROM game_results 
-            WHERE session_id = ?
-        ''', (self.current_session,))
+        stats = self.session_aggregates(conn, scoped=False)
         
-        stats = cursor.fetchone()
+        # Round-level data for the bootstrap, in play order
+        rounds = self.session_data(scoped=False)
+        profits = rounds['profit']
+        wins = rounds['win']
         
         report = "=" * 70 + "\n"
         report += "BOMB GAME ANALYTICS REPORT\n"
@@ -1557,15 +2705,18 @@ RECOMMENDATIONS
         report += f"Report Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
         report += f"Current Balance: {self.current_balance:.2f} Sigils\n\n"
         
-        if stats and stats[0]:
-            total, wins, total_profit, avg_profit, min_profit, max_profit, std_profit, avg_picks = stats
-            win_rate = (wins / total * 100) if total > 0 else 0
+        if stats['total']:
+            total, win_count = stats['total'], stats['wins']
+            total_profit, avg_profit = stats['net_profit'], stats['avg_profit']
+            min_profit, max_profit = stats['min_profit'], stats['max_profit']
+            avg_picks, std_profit = stats['avg_safe_picks'], stats['std_profit']
+            win_rate = (win_count / total * 100) if total > 0 else 0
             
             report += "PERFORMANCE SUMMARY\n"
             report += "-" * 50 + "\n"
             report += f"Total Games: {total}\n"
-            report += f"Wins: {wins} ({win_rate:.1f}%)\n"
-            report += f"Losses: {total - wins}\n"
+            report += f"Wins: {win_count} ({win_rate:.1f}%)\n"
+            report += f"Losses: {total - win_count}\n"
             report += f"Net Profit: {total_profit:+.2f} Sigils\n"
             report += f"Average Profit/Game: {avg_profit:.4f} Sigils\n"
             report += f"Best Win: {max_profit:+.2f} Sigils\n"
@@ -1575,25 +2726,56 @@ RECOMMENDATIONS
             
             # Risk metrics
             sharpe = avg_profit / (std_profit + 0.001) if std_profit else 0
+            risk = self.risk_metrics(rounds, scoped=False)
             report += "RISK METRICS\n"
             report += "-" * 50 + "\n"
             report += f"Sharpe Ratio: {sharpe:.3f}\n"
-            report += f"Risk of Ruin: {(100 - win_rate):.1f}%\n"
-            report += f"Maximum Drawdown: {abs(min_profit):.2f} Sigils\n\n"
+            report += f"Maximum Drawdown: {risk['max_drawdown']:.2f} Sigils ({risk['max_drawdown_pct']:.1f}%)\n"
+            report += f"Maximum Drawdown Duration: {risk['max_duration']} rounds\n"
+            report += f"Ulcer Index: {risk['ulcer_index']:.2f}\n"
+            report += f"VaR {TAIL_LEVEL:.0%}: {risk['var']:.2f} Sigils per round\n"
+            report += f"CVaR {TAIL_LEVEL:.0%}: {risk['cvar']:.2f} Sigils per round\n"
+            report += (f"Risk of Ruin at {risk['bet']:.2f} per bet: {self.percent(risk['ruin_analytic'])} "
+                       f"(analytic), {self.percent(risk['ruin_simulated'])} "
+                       f"(simulated, {risk['horizon']} rounds)\n\n")
+            
+            # Bootstrap intervals; waits for the pool's time budget at most
+            key = (self.current_session, 'All', self.data_version)
+            intervals = self.bootstrap.compute(key, profits, wins)
+            if intervals:
+                ci = intervals['metrics']
+                report += f"CONFIDENCE INTERVALS ({intervals['confidence']:.0%}, "
+                report += f"{intervals['resamples']} resamples)\n"
+                report += "-" * 50 + "\n"
+                for name, label, fmt in (('win_rate', 'Win Rate (%)', '.1f'),
+                                         ('avg_profit', 'Expected Value', '.4f'),
+                                         ('sharpe', 'Sharpe Ratio', '.3f'),
+                                         ('profit_factor', 'Profit Factor', '.2f'),
+                                         ('max_losing_streak', 'Max Losing Streak', '.0f')):
+                    point, low, high = ci[name]
+                    report += f"{label}: {point:{fmt}} ({low:{fmt}} to {high:{fmt}})\n"
+                report += "\n"
             
             # Recommendations
             report += "RECOMMENDATIONS\n"
             report += "-" * 50 + "\n"
             
-            if avg_profit > 0:
+            # Only call a result when the interval excludes the threshold
+            ev_low, ev_high = (ci['avg_profit'][1:] if intervals else (avg_profit, avg_profit))
+            if ev_low > 0:
                 report += "✓ Strategy is profitable (Positive Expected Value)\n"
-            else:
+            elif ev_high < 0:
                 report += "⚠ Strategy is not profitable (Negative Expected Value)\n"
+            else:
+                report += "? Expected value is not distinguishable from zero yet\n"
             
-            if win_rate > 50:
+            rate_low, rate_high = (ci['win_rate'][1:] if intervals else (win_rate, win_rate))
+            if rate_low > 50:
                 report += "✓ Good win rate\n"
-            else:
+            elif rate_high < 50:
                 report += "⚠ Win rate below 50%\n"
+            else:
+                report += "? Win rate is not distinguishable from 50% yet\n"
             
             if std_profit and std_profit > abs(avg_profit) * 2:
                 report += "⚠ High volatility detected\n"
@@ -1602,22 +2784,149 @@ RECOMMENDATIONS
         return report
     
     def backup_database(self):
-        """Create backup of database"""
-        import shutil
-        import os
+        """Snapshot the database in the background with the online backup API"""
+        if self.backup_thread and self.backup_thread.is_alive():
+            self.status_var.set("Backup already in progress...")
+            return
+        
+        def progress(status, remaining, total):
+            self.backup_queue.put(('progress', (total - remaining) * 100 // max(total, 1)))
+        
+        def worker():
+            try:
+                manifest = self.snapshots.create_snapshot(self.db_path, progress=progress)
+                self.backup_queue.put(('done', manifest))
+            except Exception as e:
+                self.backup_queue.put(('error', e))
+        
+        self.status_var.set("Backing up database...")
+        self.backup_thread = threading.Thread(target=worker, daemon=True)
+        self.backup_thread.start()
+        self.root.after(100, self.poll_backup)
+    
+    def poll_backup(self):
+        """Relay backup worker progress to the UI thread"""
+        finished = False
+        while not self.backup_queue.empty():
+            kind, payload = self.backup_queue.get_nowait()
+            if kind == 'progress':
+                self.status_var.set(f"Backing up database... {payload}%")
+            elif kind == 'done':
+                finished = True
+                self.status_var.set(
+                    f"Database backed up: {payload['kind']} snapshot {payload['id']} "
+                    f"({payload['changed_pages']} of {payload['page_count']} pages stored)")
+            else:
+                finished = True
+                messagebox.showerror("Backup Error", f"Backup failed: {str(payload)}")
+                self.status_var.set(f"Error: {str(payload)}")
         
-        backup_dir = "backups"
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
+        if not finished:
+            self.root.after(100, self.poll_backup)
+    
+    def restore_backup(self):
+        """Restore a verified snapshot over the live database"""
+        filename = filedialog.askopenfilename(
+            title="Select Snapshot",
+            initialdir=self.snapshots.backup_dir,
+            filetypes=[("Snapshot manifests", "snap_*.json"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = os.path.join(backup_dir, f"game_backup_{timestamp}.db")
+        self.commit_rapid_buffer()
+        snapshot_id = os.path.basename(filename)[len('snap_'):-len('.json')]
+        if not messagebox.askyesno("Restore Backup",
+                                   f"Replace the current database with snapshot {snapshot_id}?"):
+            return
         
-        shutil.copy2(self.db_path, backup_file)
+        try:
+            self.journal.flush()
+            manifest = self.snapshots.restore(snapshot_id, self.db_path)
+            # Snapshots taken by older versions may predate newer tables
+            self.init_database()
+        except Exception as e:
+            messagebox.showerror("Restore Error", f"Restore failed: {str(e)}")
+            self.status_var.set(f"Error: {str(e)}")
+            return
         
-        messagebox.showinfo("Backup Complete", 
-                          f"Database backed up to:\n{backup_file}")
-        self.status_var.set(f"Database backed up: {backup_file}")
+        # Rounds journaled after the snapshot are either re-applied or set aside
+        if messagebox.askyesno("Restore Backup",
+                               "Re-apply rounds logged after this snapshot from the event journal?"):
+            recovered = recover_journal(self.journal_path, self.db_path)
+        else:
+            recovered = 0
+            self.journal.close()
+            os.replace(self.journal_path,
+                       f"{self.journal_path}.{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            self.journal = EventJournal(self.journal_path)
+            bootstrap_journal(self.journal, self.db_path)
+        
+        self.data_version += 1
+        self.query_cache.invalidate_all()
+        self.reset_session_state()
+        self.refresh.refresh_now()
+        
+        messagebox.showinfo("Restore Complete",
+                          f"Restored and verified snapshot {manifest['id']}"
+                          + (f"\nRe-applied {recovered} journaled rounds" if recovered else ""))
+        self.status_var.set(f"Restored snapshot {manifest['id']}")
+
+    def reset_session_state(self):
+        """Drop per-session state built from the replaced database and rebuild the tilt detector"""
+        self.session_rounds.reset()
+        self.risk.reset()
+        self.change_feed.reset()
+        
+        # Tilt state is a fold over the session's rounds, so replay them in play order
+        self.tilt = TiltDetector(self.current_session)
+        conn = self.connect()
+        rows = conn.execute(f'''
+            SELECT {', '.join(ROUND_FIELDS)}
+            FROM game_results
+            WHERE session_id = ?
+            ORDER BY round_number
+        ''', (self.current_session,)).fetchall()
+        conn.close()
+        for row in rows:
+            self.tilt.update(Round.from_row(row))
+
+    def rebuild_from_journal(self):
+        """Rebuild results and derived tables by replaying the event journal"""
+        if not messagebox.askyesno("Rebuild from Journal",
+                                   "Replace all logged rounds and statistics with "
+                                   "the contents of the event journal?"):
+            return
+        
+        self.commit_rapid_buffer()
+        self.journal.flush()
+        total = replay_journal(self.journal_path, self.db_path)
+        # The journal holds archived rounds too; keep them out of the live table
+        prune_archived(self.db_path, self.archive_dir)
+        
+        self.data_version += 1
+        self.query_cache.invalidate_all()
+        self.reset_session_state()
+        self.refresh.refresh_now()
+        
+        messagebox.showinfo("Rebuild Complete", f"Replayed {total} rounds from the journal")
+        self.status_var.set(f"Rebuilt database from journal ({total} rounds)")
+
+    def archive_old_rounds(self):
+        """Move old rounds out of the live table into monthly archive files"""
+        days = simpledialog.askinteger("Archive Old Rounds",
+                                       "Archive rounds older than how many days?",
+                                       initialvalue=90, minvalue=1, parent=self.root)
+        if days is None:
+            return
+        
+        moved = archive_rounds(self.db_path, self.archive_dir, older_than_days=days,
+                               exclude_sessions=(self.current_session,))
+        self.query_cache.invalidate_all()
+        
+        messagebox.showinfo("Archive Complete",
+                          f"Archived {moved} rounds to {self.archive_dir}/")
+        self.status_var.set(f"Archived {moved} rounds older than {days} days")
 
 # Main application
 def main():
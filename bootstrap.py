@@ -0,0 +1,216 @@
+"""Bootstrap confidence intervals for the headline session metrics.
+
+Resamples are drawn as index matrices and every metric is computed for a
+whole batch of resamples at once. Per-round metrics (win rate, EV, Sharpe,
+profit factor) use the ordinary bootstrap; streak metrics use a circular
+block bootstrap so runs of losses survive resampling. Work is split into
+seeded chunks across a process pool, each chunk stopping once it has used
+the time budget, so a large session degrades to fewer resamples instead of
+a frozen UI. The budget starts when a worker picks the chunk up: spawned
+workers first import the app, which can take longer than the budget itself.
+"""
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+
+METRICS = ('win_rate', 'avg_profit', 'sharpe', 'profit_factor', 'max_losing_streak')
+
+# Upper bound on resample-matrix cells held in memory at once per worker
+BATCH_CELLS = 2000000
+
+# Allowance on top of the time budget for handing chunks back to the app
+RESULT_GRACE = 0.5
+
+
+def sample_metrics(profits, wins):
+    """Metrics for each row of (resamples x rounds) profit and win matrices"""
+    mean = profits.mean(axis=1)
+    std = profits.std(axis=1)
+    gains = np.where(profits > 0, profits, 0).sum(axis=1)
+    losses = -np.where(profits < 0, profits, 0).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'win_rate': wins.mean(axis=1) * 100,
+            'avg_profit': mean,
+            'sharpe': np.where(std > 0, mean / std, 0.0),
+            'profit_factor': np.where(losses > 0, gains / losses, np.inf)
+        }
+
+
+def longest_run(flags):
+    """Longest run of True along each row of a boolean matrix"""
+    counts = np.cumsum(flags, axis=1)
+    # Count at the last False so far; the run length is the distance from it
+    resets = np.maximum.accumulate(np.where(flags, 0, counts), axis=1)
+    return (counts - resets).max(axis=1) if flags.shape[1] else np.zeros(len(flags))
+
+
+def block_indices(rng, rounds, resamples, block_size):
+    """Circular block bootstrap indices (resamples x rounds)"""
+    blocks = math.ceil(rounds / block_size)
+    starts = rng.integers(0, rounds, size=(resamples, blocks))
+    indices = (starts[:, :, None] + np.arange(block_size)) % rounds
+    return indices.reshape(resamples, -1)[:, :rounds]
+
+
+def resample_chunk(profits, wins, resamples, seed, time_budget, block_size=None):
+    """Draw up to resamples bootstrap replicates within time_budget seconds of starting"""
+    deadline = time.monotonic() + time_budget
+    profits = np.asarray(profits, dtype=float)
+    wins = np.asarray(wins, dtype=bool)
+    rounds = len(profits)
+    rng = np.random.default_rng(seed)
+    block_size = block_size or max(1, round(rounds ** (1 / 3)))
+    batch = max(1, min(resamples, BATCH_CELLS // max(rounds, 1)))
+
+    collected = {name: [] for name in METRICS}
+    done = 0
+    # At least one batch, so a chunk never comes back empty
+    while done < resamples and (not done or time.monotonic() < deadline):
+        size = min(batch, resamples - done)
+        indices = rng.integers(0, rounds, size=(size, rounds))
+        for name, values in sample_metrics(profits[indices], wins[indices]).items():
+            collected[name].append(values)
+
+        losing = ~wins[block_indices(rng, rounds, size, block_size)]
+        collected['max_losing_streak'].append(longest_run(losing))
+        done += size
+
+    return {name: np.concatenate(values) if values else np.empty(0)
+            for name, values in collected.items()}
+
+
+def point_estimates(profits, wins):
+    """Metrics of the observed sample"""
+    profits = np.asarray(profits, dtype=float)
+    wins = np.asarray(wins, dtype=bool)
+    estimates = {name: float(values[0])
+                 for name, values in sample_metrics(profits[None, :], wins[None, :]).items()}
+    estimates['max_losing_streak'] = float(longest_run(~wins[None, :])[0])
+    return estimates
+
+
+def summarize(profits, wins, replicates, confidence=0.95):
+    """Point estimate and percentile interval per metric"""
+    alpha = (1 - confidence) / 2 * 100
+    points = point_estimates(profits, wins)
+    intervals = {}
+    for name in METRICS:
+        values = replicates[name]
+        values = values[~np.isnan(values)]
+        if len(values):
+            # Profit factor is infinite in resamples without a loss, so no interpolation
+            low, high = np.percentile(values, [alpha, 100 - alpha], method='nearest')
+        else:
+            low = high = float('nan')
+        intervals[name] = (points[name], float(low), float(high))
+    return {'metrics': intervals, 'resamples': len(replicates['avg_profit']),
+            'confidence': confidence}
+
+
+class BootstrapEngine:
+    """Runs bootstrap jobs on a process pool and caches results per data version
+
+    Cache keys are tuples whose last element is the data version.
+    """
+
+    def __init__(self, resamples=2000, time_budget=2.0, workers=None, confidence=0.95):
+        self.resamples = resamples
+        self.time_budget = time_budget
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.confidence = confidence
+        self.executor = None
+        self.cache = {}
+        self.pending = {}  # key -> (futures, profits, wins)
+
+    def _pool(self):
+        if self.executor is None:
+            # Forking the threaded Tk process can copy a held lock into the child
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self.executor
+
+    def warm(self):
+        """Start the worker processes now, so the first job does not pay for their imports"""
+        pool = self._pool()
+        for _ in range(self.workers):
+            pool.submit(int)
+
+    def submit(self, fn, *args):
+        """Run another CPU-bound job on the bootstrap workers; returns its future"""
+        return self._pool().submit(fn, *args)
+
+    def _submit(self, profits, wins):
+        pool = self._pool()
+        per_worker = math.ceil(self.resamples / self.workers)
+        seeds = np.random.SeedSequence().spawn(self.workers)
+        return [pool.submit(resample_chunk, profits, wins, per_worker, seed, self.time_budget)
+                for seed in seeds]
+
+    def _merge(self, key, futures, profits, wins):
+        chunks = [future.result() for future in futures]
+        replicates = {name: np.concatenate([chunk[name] for chunk in chunks])
+                      for name in METRICS}
+        if not len(replicates['avg_profit']):
+            return None  # nothing to cache; the next request tries again
+        result = summarize(profits, wins, replicates, self.confidence)
+        # Keys end in the data version; older versions of the same scope are stale
+        for stale in [k for k in self.cache if k[:-1] == key[:-1]]:
+            del self.cache[stale]
+        self.cache[key] = result
+        return result
+
+    def compute(self, key, profits, wins):
+        """Return intervals, blocking for at most about the time budget
+
+        Returns None when the workers are not done in time; the job is then
+        left pending for collect() to pick up.
+        """
+        if key in self.cache:
+            return self.cache[key]
+        if len(profits) < 2:
+            return None
+        if key in self.pending:
+            futures, profits, wins = self.pending.pop(key)
+        else:
+            futures = self._submit(profits, wins)
+        _, not_done = wait(futures, timeout=self.time_budget + RESULT_GRACE)
+        if not_done:
+            self.pending[key] = (futures, profits, wins)
+            return None
+        return self._merge(key, futures, profits, wins)
+
+    def request(self, key, profits, wins):
+        """Return cached intervals, or start computing them and return None"""
+        if key in self.cache:
+            return self.cache[key]
+        if len(profits) >= 2 and key not in self.pending:
+            # A job for an older version of this scope would be stale on arrival
+            for stale in [k for k in self.pending if k[:-1] == key[:-1]]:
+                for future in self.pending.pop(stale)[0]:
+                    future.cancel()
+            self.pending[key] = (self._submit(profits, wins), profits, wins)
+        return None
+
+    def collect(self):
+        """Merge finished background jobs; return the keys that completed"""
+        finished = []
+        for key, (futures, profits, wins) in list(self.pending.items()):
+            if all(future.done() for future in futures):
+                del self.pending[key]
+                if self._merge(key, futures, profits, wins) is not None:
+                    finished.append(key)
+        return finished
+
+    def invalidate(self):
+        """Drop cached intervals, e.g. after new rounds"""
+        self.cache.clear()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
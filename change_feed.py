@@ -0,0 +1,259 @@
+"""Live feed of committed rounds over a Unix domain socket.
+
+The logger publishes every round right after its transaction commits, so
+other local tools can react without polling ``game_results``. The protocol
+is newline-delimited JSON:
+
+* The subscriber connects and sends one request line: ``{"after": <id>}`` to
+  resume after a round id, or ``{}`` for new rounds only.
+* The server answers ``{"type": "hello", "last_id": <newest id>}``, replays
+  any rounds with ``id`` greater than the cursor from the database, then
+  streams ``{"type": "round", "id": ..., <round fields>}`` as they commit.
+  Replay and live rounds are handed over without gaps or duplicates, and
+  carry money in Sigils like the journal.
+* ``{"type": "reset", "last_id": <id>}`` follows a restore or journal
+  rebuild: ids may have been reused, so the subscriber should resync its
+  state and continue from ``last_id``.
+
+A subscriber that falls more than ``MAX_PENDING`` rounds behind is
+disconnected rather than allowed to grow memory; it reconnects with its
+last id and catches up from the database. ``follow`` implements that loop.
+Rounds already moved to the archive are not replayed.
+
+Usage:
+    python change_feed.py --after 0
+"""
+import errno
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from urllib.parse import quote
+
+from event_journal import ROUND_FIELDS, row_event
+
+MAX_PENDING = 10000
+REQUEST_TIMEOUT = 5.0
+BACKLOG_CHUNK = 500
+
+
+def default_socket_path(db_path):
+    return f'{os.path.splitext(os.path.abspath(db_path))[0]}.feed.sock'
+
+
+def encode(message):
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def round_message(row_id, event):
+    return encode({'type': 'round', 'id': row_id, **event})
+
+
+class Subscriber:
+    """One connected client and the queue of messages waiting for it"""
+
+    def __init__(self, sock, max_pending):
+        self.sock = sock
+        self.pending = queue.Queue(max_pending)
+        self.dropped = False
+
+    def offer(self, item):
+        try:
+            self.pending.put_nowait(item)
+        except queue.Full:
+            self.drop()
+
+    def drop(self):
+        """Disconnect; the client resumes from its cursor"""
+        self.dropped = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.pending.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class ChangeFeed:
+    """Publishes committed rounds to every subscriber of a Unix socket"""
+
+    def __init__(self, db_path, socket_path=None, max_pending=MAX_PENDING):
+        self.db_path = db_path
+        self.socket_path = socket_path or default_socket_path(db_path)
+        self.max_pending = max_pending
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.server = None
+        self.published = 0
+
+    @property
+    def available(self):
+        return hasattr(socket, 'AF_UNIX')
+
+    def start(self):
+        """Listen in the background; return False where Unix sockets are unavailable"""
+        if not self.available or self.server:
+            return bool(self.server)
+        if os.path.exists(self.socket_path):
+            # Only a socket nobody answers on was left behind by an unclean exit
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(self.socket_path)
+                except ConnectionRefusedError:
+                    os.remove(self.socket_path)
+                else:
+                    raise OSError(errno.EADDRINUSE, "Another logger is serving this feed",
+                                  self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        self.server.listen()
+        threading.Thread(target=self.accept_loop, args=(self.server,), daemon=True).start()
+        return True
+
+    def close(self):
+        if self.server:
+            self.server.close()
+            self.server = None
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        with self.lock:
+            subscribers, self.subscribers = self.subscribers, set()
+        for subscriber in subscribers:
+            subscriber.drop()
+
+    def publish(self, rows):
+        """Send committed (id, round dict) pairs to every subscriber"""
+        items = [('round', row_id, round_message(row_id, event)) for row_id, event in rows]
+        with self.lock:
+            subscribers = list(self.subscribers)
+            self.published += len(items)
+        for subscriber in subscribers:
+            for item in items:
+                subscriber.offer(item)
+
+    def reset(self):
+        """Tell subscribers the table was replaced and ids may repeat"""
+        conn = self.connect()
+        try:
+            last_id = self.last_id(conn)
+        finally:
+            conn.close()
+        item = ('reset', last_id, encode({'type': 'reset', 'last_id': last_id}))
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.offer(item)
+
+    def connect(self):
+        return sqlite3.connect(f'file:{quote(os.path.abspath(self.db_path))}?mode=ro', uri=True)
+
+    @staticmethod
+    def last_id(conn):
+        return conn.execute('SELECT COALESCE(MAX(id), 0) FROM game_results').fetchone()[0]
+
+    def accept_loop(self, server):
+        while True:
+            try:
+                sock, _ = server.accept()
+            except OSError:
+                return  # closed
+            threading.Thread(target=self.serve, args=(sock,), daemon=True).start()
+
+    def serve(self, sock):
+        """Replay from the client's cursor, then stream live rounds"""
+        subscriber = Subscriber(sock, self.max_pending)
+        try:
+            sock.settimeout(REQUEST_TIMEOUT)
+            request = json.loads(sock.makefile('rb').readline() or b'{}')
+            sock.settimeout(None)
+            after = request.get('after')
+
+            # Register before reading the backlog so nothing committed in between is lost
+            with self.lock:
+                self.subscribers.add(subscriber)
+
+            conn = self.connect()
+            try:
+                last_id = self.last_id(conn)
+                sock.sendall(encode({'type': 'hello', 'last_id': last_id}))
+                sent = last_id if after is None else int(after)
+                if after is not None:
+                    cursor = conn.execute(f'''
+                        SELECT id, {', '.join(ROUND_FIELDS)} FROM game_results
+                        WHERE id > ? ORDER BY id
+                    ''', (sent,))
+                    while True:
+                        rows = cursor.fetchmany(BACKLOG_CHUNK)
+                        if not rows:
+                            break
+                        sock.sendall(b''.join(
+                            round_message(row[0], row_event(row[1:])) for row in rows))
+                        sent = rows[-1][0]
+            finally:
+                conn.close()
+
+            while not subscriber.dropped:
+                item = subscriber.pending.get()
+                if item is None:
+                    break
+                kind, row_id, line = item
+                if kind == 'round' and row_id <= sent:
+                    continue  # already replayed from the backlog
+                sent = row_id
+                sock.sendall(line)
+        except (OSError, ValueError, AttributeError):
+            pass
+        finally:
+            with self.lock:
+                self.subscribers.discard(subscriber)
+            sock.close()
+
+    def stats(self):
+        with self.lock:
+            return {'socket': self.socket_path if self.server else None,
+                    'subscribers': len(self.subscribers), 'published': self.published}
+
+
+def follow(socket_path, after=None, reconnect_delay=1.0):
+    """Yield feed messages forever, reconnecting and resuming from the last id seen"""
+    while True:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(socket_path)
+                sock.sendall(encode({} if after is None else {'after': after}))
+                for line in sock.makefile('rb'):
+                    message = json.loads(line)
+                    if message['type'] == 'round' or (message['type'] == 'hello' and after is None):
+                        after = message.get('id', message.get('last_id'))
+                    elif message['type'] == 'reset':
+                        after = message['last_id']
+                    yield message
+        except OSError:
+            pass
+        time.sleep(reconnect_delay)
+
+
+def main():
+    """Command-line subscriber: print each message as a JSON line"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Follow rounds as the logger commits them")
+    parser.add_argument('--db', default='bomb_game_results.db', help="Database path")
+    parser.add_argument('--socket', help="Feed socket (default: next to the database)")
+    parser.add_argument('--after', type=int, help="Replay rounds after this id first")
+    args = parser.parse_args()
+
+    try:
+        for message in follow(args.socket or default_socket_path(args.db), args.after):
+            print(json.dumps(message), flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
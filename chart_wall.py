@@ -0,0 +1,97 @@
+"""Chart wall: every chart type at once, rasterized in parallel.
+
+The app gathers the data for the whole wall once, the session buffer's
+rounds plus one gap-filled series per interval, and ``ChartWall`` hands one
+job per chart to a process pool. Workers build the figure with charts.py,
+rasterize it with Agg and scale it to the tile size, returning raw RGBA
+pixels; the UI thread only wraps finished buffers as Tk images, so the wall
+takes about as long as its slowest chart rather than the sum of all of
+them. matplotlib is not thread-safe, hence processes instead of threads.
+Workers are spawned rather than forked from the threaded Tk process, so
+render_tile stays a top-level function that FIGURES is looked up from.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from charts import (balance_figure, calendar_figure, daily_figure, heatmap_figure, hour_figure,
+                    multiplier_figure, profit_distribution_figure, render_rgba, risk_figure,
+                    win_loss_figure)
+
+# name -> builder(data, options); data is a round array or a time series
+FIGURES = {
+    'balance': lambda rounds, options: balance_figure(rounds, options['current_balance']),
+    'profit_dist': lambda rounds, options: profit_distribution_figure(rounds),
+    'win_loss': lambda rounds, options: win_loss_figure(rounds, options['colors']),
+    'heatmap': lambda rounds, options: heatmap_figure(rounds),
+    'multiplier': lambda rounds, options: multiplier_figure(rounds),
+    'risk': lambda rounds, options: risk_figure(rounds),
+    'daily': lambda series, options: daily_figure(series),
+    'calendar': lambda series, options: calendar_figure(series),
+    'hour_of_day': lambda series, options: hour_figure(series),
+}
+
+# Interval of the series each time-based chart reads; None means the chart interval
+SERIES_FREQUENCIES = {'daily': None, 'calendar': 'day', 'hour_of_day': 'hour'}
+
+WALL_COLUMNS = 3
+
+# Lower bound on the rasterizing resolution so tiles stay legible before scaling
+MIN_DPI = 50
+
+
+def render_tile(name, data, options, width, height):
+    """Build one chart and rasterize it to fit width x height; None when there is nothing to draw"""
+    if not len(data):
+        return None
+    fig = FIGURES[name](data, options)
+    if fig is None:
+        return None
+    dpi = max(MIN_DPI, min(width / fig.get_figwidth(), height / fig.get_figheight()))
+    fig_width, fig_height, pixels = render_rgba(fig, dpi)
+    image = Image.frombuffer('RGBA', (fig_width, fig_height), pixels, 'raw', 'RGBA', 0, 1)
+    image.thumbnail((width, height), Image.LANCZOS)
+    return image.size, image.tobytes()
+
+
+class ChartWall:
+    """Renders chart jobs on a process pool; only the latest wall's tiles are kept"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or max(1, min(len(FIGURES), os.cpu_count() or 1))
+        self.executor = None
+        self.pending = {}  # name -> future
+
+    def submit(self, jobs, options, width, height):
+        """Start rendering (name, data) jobs into width x height tiles"""
+        self.cancel()
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        # Time-based charts are the slowest to draw; start them first
+        for name, data in sorted(jobs, key=lambda job: job[0] not in SERIES_FREQUENCIES):
+            self.pending[name] = self.executor.submit(render_tile, name, data, options,
+                                                      width, height)
+
+    def collect(self):
+        """Return {name: ((width, height), RGBA bytes) or None or the exception} of finished tiles"""
+        finished = {}
+        for name, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[name]
+                error = future.exception()
+                finished[name] = error if error is not None else future.result()
+        return finished
+
+    def cancel(self):
+        """Drop tiles still waiting, e.g. when a newer wall replaces them"""
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,325 @@
+"""Chart figures, independent of any GUI toolkit.
+
+Each builder takes round or time-series columns and returns a matplotlib
+``Figure`` (or None when there is nothing to draw). Figures are created
+with the object-oriented API rather than pyplot, so they are never
+registered with pyplot's global figure manager: the Tk window embeds them,
+and other threads or processes can render them to PNG without touching the
+GUI.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from risk_engine import drawdown_path
+from time_series import STEPS, calendar_grid, hour_of_day
+
+RESULT_COLORS = {'win': '#2ecc71', 'loss': '#e74c3c'}
+
+# Time-series charts switch from bars to filled steps beyond this many intervals
+MAX_CHART_BARS = 400
+
+
+def render_png(fig, dpi=100):
+    """Rasterize a figure with Agg and return the PNG bytes"""
+    FigureCanvasAgg(fig)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    return buffer.getvalue()
+
+
+def render_rgba(fig, dpi=100):
+    """Rasterize a figure with Agg and return (width, height, RGBA bytes), skipping PNG encoding"""
+    fig.set_dpi(dpi)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    return width, height, bytes(canvas.buffer_rgba())
+
+
+def balance_figure(rounds, current_balance):
+    """Balance over time"""
+    if not len(rounds):
+        return None
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+
+    timestamps = rounds['timestamp']
+    balances = rounds['ending_balance']
+
+    ax.plot(timestamps, balances, 'b-', linewidth=2, marker='o', markersize=4)
+    ax.axhline(y=current_balance, color='g', linestyle='--', alpha=0.7,
+               label=f'Current: {current_balance:.2f}')
+
+    ax.set_xlabel('Time', fontsize=12)
+    ax.set_ylabel('Balance (Sigils)', fontsize=12)
+    ax.set_title('Balance Evolution Over Time', fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+
+def profit_distribution_figure(rounds):
+    """Profit histogram and box plot"""
+    profits = rounds['profit']
+    if not len(profits):
+        return None
+    fig = Figure(figsize=(14, 6))
+    ax1, ax2 = fig.subplots(1, 2)
+
+    ax1.hist(profits, bins=20, edgecolor='black', alpha=0.7, color='skyblue')
+    ax1.axvline(x=np.mean(profits), color='red', linestyle='--',
+                label=f'Mean: {np.mean(profits):.2f}')
+    ax1.set_xlabel('Profit/Loss (Sigils)')
+    ax1.set_ylabel('Frequency')
+    ax1.set_title('Profit Distribution Histogram')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    ax2.boxplot(profits, vert=False)
+    ax2.set_xlabel('Profit/Loss (Sigils)')
+    ax2.set_title('Profit Distribution Box Plot')
+    ax2.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+    return fig
+
+
+def win_loss_figure(rounds, colors=RESULT_COLORS):
+    """Win/loss pie and counts"""
+    wins = int(rounds['win'].sum())
+    data = {result: count for result, count in (('win', wins), ('loss', len(rounds) - wins))
+            if count}
+    if not data:
+        return None
+    fig = Figure(figsize=(12, 6))
+    ax1, ax2 = fig.subplots(1, 2)
+
+    labels = list(data.keys())
+    sizes = list(data.values())
+    bar_colors = [colors[label] for label in labels]
+
+    ax1.pie(sizes, labels=labels, autopct='%1.1f%%', colors=bar_colors,
+            startangle=90, shadow=True)
+    ax1.axis('equal')
+    ax1.set_title('Win/Loss Ratio')
+
+    ax2.bar(labels, sizes, color=bar_colors, alpha=0.7)
+    ax2.set_xlabel('Result')
+    ax2.set_ylabel('Count')
+    ax2.set_title('Win/Loss Count')
+    ax2.grid(True, alpha=0.3)
+    for i, v in enumerate(sizes):
+        ax2.text(i, v + 0.5, str(v), ha='center')
+
+    fig.tight_layout()
+    return fig
+
+
+def heatmap_figure(rounds):
+    """Safe picks vs result counts"""
+    if not len(rounds):
+        return None
+    pivot = pd.crosstab(pd.Series(rounds['safe_picks'], name='safe_picks'),
+                        pd.Series(np.where(rounds['win'], 'win', 'loss'), name='result'))
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.heatmap(pivot, annot=True, fmt='g', cmap='YlOrRd', ax=ax)
+    ax.set_xlabel('Result')
+    ax.set_ylabel('Safe Picks')
+    ax.set_title('Safe Picks vs Result Heatmap')
+
+    fig.tight_layout()
+    return fig
+
+
+def multiplier_figure(rounds):
+    """Cash-out multiplier frequency and average profit"""
+    won = rounds[rounds['win']]
+    if not len(won):
+        return None
+    fig = Figure(figsize=(14, 6))
+    ax1, ax2 = fig.subplots(1, 2)
+
+    multipliers, groups, counts = np.unique(won['multiplier'], return_inverse=True,
+                                            return_counts=True)
+    avg_profits = np.bincount(groups, weights=won['profit']) / counts
+
+    ax1.bar(range(len(multipliers)), counts, alpha=0.7, color='blue')
+    ax1.set_xlabel('Multiplier')
+    ax1.set_ylabel('Frequency')
+    ax1.set_title('Multiplier Frequency Distribution')
+    ax1.set_xticks(range(len(multipliers)))
+    ax1.set_xticklabels([f'{m:.2f}x' for m in multipliers], rotation=45)
+    ax1.grid(True, alpha=0.3)
+
+    ax2.scatter(multipliers, avg_profits, s=100, alpha=0.7, color='red')
+    ax2.set_xlabel('Multiplier')
+    ax2.set_ylabel('Average Profit')
+    ax2.set_title('Profit vs Multiplier')
+    ax2.grid(True, alpha=0.3)
+    if len(multipliers) > 1:
+        z = np.polyfit(multipliers, avg_profits, 1)
+        p = np.poly1d(z)
+        ax2.plot(multipliers, p(multipliers), "r--", alpha=0.5)
+
+    fig.tight_layout()
+    return fig
+
+
+def daily_figure(series):
+    """Profit, volume, closing balance and win rate per interval of a TimeSeries"""
+    if not len(series):
+        return None
+    fig = Figure(figsize=(14, 10))
+    ((ax1, ax2), (ax3, ax4)) = fig.subplots(2, 2, sharex=True)
+    label = series.freq.title()
+    # Bar widths are in days on a date axis
+    width = STEPS[series.freq] / np.timedelta64(1, 'D') * 0.8
+
+    # Profit and volume per interval; long series are filled steps, not bars
+    profits = series.profit
+    if len(series) <= MAX_CHART_BARS:
+        bars = ax1.bar(series.period, profits, width=width, alpha=0.7,
+                       color=np.where(profits > 0, 'green', 'red'))
+        ax2.bar(series.period, series.rounds, width=width, alpha=0.7, color='blue')
+    else:
+        bars = []
+        ax1.fill_between(series.period, profits, where=profits > 0, step='post',
+                         color='green', alpha=0.7)
+        ax1.fill_between(series.period, profits, where=profits < 0, step='post',
+                         color='red', alpha=0.7)
+        ax2.fill_between(series.period, series.rounds, step='post', color='blue', alpha=0.7)
+    ax1.set_ylabel('Profit (Sigils)')
+    ax1.set_title(f'{label}ly Profit')
+    ax1.grid(True, alpha=0.3)
+
+    # Value labels only while they stay legible
+    if len(series) <= 31:
+        for bar, profit in zip(bars, profits):
+            if profit:
+                ax1.text(bar.get_x() + bar.get_width()/2., bar.get_height(),
+                         f'{profit:+.1f}', ha='center', va='bottom' if profit > 0 else 'top')
+
+    ax2.set_ylabel('Number of Games')
+    ax2.set_title(f'{label}ly Game Volume')
+    ax2.grid(True, alpha=0.3)
+
+    # Closing balance, carried across idle intervals
+    ax3.step(series.period, series.balance, where='post', color='purple')
+    ax3.set_ylabel('Balance (Sigils)')
+    ax3.set_title('Closing Balance')
+    ax3.grid(True, alpha=0.3)
+
+    # Win rate, with gaps where nothing was played
+    ax4.plot(series.period, series.win_rate, 'o-', color='orange', markersize=3)
+    ax4.axhline(y=50, color='gray', linestyle='--', alpha=0.7)
+    ax4.set_ylabel('Win Rate (%)')
+    ax4.set_title(f'{label}ly Win Rate')
+    ax4.grid(True, alpha=0.3)
+
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    return fig
+
+
+def calendar_figure(series):
+    """Calendar heatmap of a daily TimeSeries' profit"""
+    if not len(series):
+        return None
+    grid, week_starts = calendar_grid(series)
+    fig = Figure(figsize=(14, 4))
+    ax = fig.subplots()
+
+    # Diverging colors centred on break-even; idle days stay blank
+    limit = np.nanmax(np.abs(grid)) or 1
+    image = ax.imshow(grid, aspect='auto', cmap='RdYlGn', vmin=-limit, vmax=limit,
+                      interpolation='nearest')
+    fig.colorbar(image, ax=ax, label='Daily Profit (Sigils)')
+
+    ax.set_yticks(range(7))
+    ax.set_yticklabels(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
+
+    # Label the first week of each month
+    months = week_starts.astype('datetime64[M]')
+    ticks = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+    ax.set_xticks(ticks)
+    ax.set_xticklabels([str(months[i]) for i in ticks], rotation=45)
+    ax.set_title('Daily Profit Calendar')
+
+    fig.tight_layout()
+    return fig
+
+
+def hour_figure(series):
+    """Volume, win rate and average profit by local hour of an hourly TimeSeries"""
+    if not len(series):
+        return None
+    rounds, win_rate, avg_profit = hour_of_day(series)
+    hours = np.arange(24)
+    fig = Figure(figsize=(12, 10))
+    ax1, ax2, ax3 = fig.subplots(3, 1, sharex=True)
+
+    ax1.bar(hours, rounds, alpha=0.7, color='blue')
+    ax1.set_ylabel('Number of Games')
+    ax1.set_title('Games by Hour of Day')
+    ax1.grid(True, alpha=0.3)
+
+    ax2.bar(hours, win_rate, alpha=0.7, color='orange')
+    ax2.axhline(y=50, color='gray', linestyle='--', alpha=0.7)
+    ax2.set_ylabel('Win Rate (%)')
+    ax2.set_title('Win Rate by Hour of Day')
+    ax2.grid(True, alpha=0.3)
+
+    ax3.bar(hours, avg_profit, alpha=0.7,
+            color=np.where(np.nan_to_num(avg_profit) > 0, 'green', 'red'))
+    ax3.axhline(y=0, color='black', linewidth=0.8)
+    ax3.set_xlabel('Hour (local time)')
+    ax3.set_ylabel('Average Profit')
+    ax3.set_title('Average Profit by Hour of Day')
+    ax3.set_xticks(hours)
+    ax3.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+    return fig
+
+
+def risk_figure(rounds):
+    """Cumulative profit and drawdown of the balance path"""
+    profits = rounds['profit']
+    if not len(profits):
+        return None
+    fig = Figure(figsize=(14, 6))
+    ax1, ax2 = fig.subplots(1, 2)
+
+    cumulative = np.cumsum(profits)
+    ax1.plot(range(len(cumulative)), cumulative, 'b-', linewidth=2)
+    ax1.axhline(y=0, color='k', linestyle='-', alpha=0.3)
+    ax1.fill_between(range(len(cumulative)), 0, cumulative,
+                     where=cumulative >= 0, color='green', alpha=0.3)
+    ax1.fill_between(range(len(cumulative)), 0, cumulative,
+                     where=cumulative < 0, color='red', alpha=0.3)
+    ax1.set_xlabel('Game Number')
+    ax1.set_ylabel('Cumulative Profit (Sigils)')
+    ax1.set_title('Cumulative Profit Curve')
+    ax1.grid(True, alpha=0.3)
+
+    start = rounds['ending_balance'][0] - profits[0]
+    _, drawdown = drawdown_path(rounds['ending_balance'], start)
+
+    ax2.fill_between(range(len(drawdown)), drawdown, 0,
+                     where=drawdown < 0, color='red', alpha=0.3)
+    ax2.set_xlabel('Game Number')
+    ax2.set_ylabel('Drawdown (%)')
+    ax2.set_title('Drawdown Analysis')
+    ax2.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+    return fig
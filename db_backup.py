@@ -0,0 +1,273 @@
+"""Consistent, incremental database snapshots.
+
+Snapshots are taken with SQLite's online backup API, so they are consistent
+even while rounds are being logged. Each snapshot is either a full compressed
+copy or an incremental set of pages that changed since the previous snapshot.
+A chain (one full snapshot plus its incrementals) rebuilds a byte-identical
+copy of the database, verified by checksum and ``PRAGMA integrity_check``.
+
+Incremental means incremental storage, not incremental cost: every snapshot
+still copies the whole database with the backup API and hashes every page to
+find the changed ones, so taking one is O(database size).
+
+Restoring writes the verified copy into the live database through the backup
+API as well, rather than replacing the file. Other connections (the HTTP
+API's read-only pool, change-feed readers) keep working and see the restored
+data like any other commit, and SQLite handles the WAL itself.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import struct
+from datetime import datetime
+
+PAGE_RECORD = struct.Struct('>I')
+HASH_SIZE = 16
+
+
+def online_backup(db_path, dest_path, pages=1024, progress=None):
+    """Copy a live database with the backup API, stepping pages at a time"""
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(dest_path)
+    try:
+        # sleep=0: stepping already yields the lock between batches
+        src.backup(dst, pages=pages, progress=progress, sleep=0)
+    finally:
+        dst.close()
+        src.close()
+
+
+def page_digests(path, page_size):
+    """Return (per-page digests, sha256 of the whole file)"""
+    digests = []
+    whole = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                break
+            whole.update(page)
+            digests.append(hashlib.blake2b(page, digest_size=HASH_SIZE).digest())
+    return digests, whole.hexdigest()
+
+
+class SnapshotStore:
+    """Full/incremental snapshot chains kept in a backup directory"""
+
+    def __init__(self, backup_dir='backups', full_every=7, keep_chains=3):
+        self.backup_dir = backup_dir
+        self.full_every = full_every
+        self.keep_chains = keep_chains
+        os.makedirs(backup_dir, exist_ok=True)
+
+    def _path(self, snapshot_id, suffix):
+        return os.path.join(self.backup_dir, f"snap_{snapshot_id}{suffix}")
+
+    def list_snapshots(self):
+        """Return all snapshot manifests, oldest first"""
+        manifests = []
+        for name in os.listdir(self.backup_dir):
+            if name.startswith('snap_') and name.endswith('.json'):
+                with open(os.path.join(self.backup_dir, name), 'r', encoding='utf-8') as f:
+                    manifests.append(json.load(f))
+        return sorted(manifests, key=lambda m: m['id'])
+
+    def _load_digests(self, snapshot_id):
+        with gzip.open(self._path(snapshot_id, '.hashes.gz'), 'rb') as f:
+            data = f.read()
+        return [data[i:i + HASH_SIZE] for i in range(0, len(data), HASH_SIZE)]
+
+    def _new_id(self):
+        snapshot_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        suffix = 0
+        candidate = snapshot_id
+        while os.path.exists(self._path(candidate, '.json')):
+            suffix += 1
+            candidate = f"{snapshot_id}_{suffix}"
+        return candidate
+
+    def create_snapshot(self, db_path, progress=None):
+        """Back up db_path and store it as a full or incremental snapshot"""
+        snapshot_id = self._new_id()
+        temp_path = self._path(snapshot_id, '.tmp')
+
+        try:
+            online_backup(db_path, temp_path, progress=progress)
+
+            conn = sqlite3.connect(temp_path)
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+            conn.close()
+
+            digests, sha256 = page_digests(temp_path, page_size)
+
+            # Incremental against the latest snapshot when the chain allows it
+            snapshots = self.list_snapshots()
+            parent = snapshots[-1] if snapshots else None
+            incremental = (parent is not None and
+                           parent['page_size'] == page_size and
+                           parent['chain_length'] < self.full_every)
+
+            if incremental:
+                parent_digests = self._load_digests(parent['id'])
+                changed = [i for i, digest in enumerate(digests)
+                           if i >= len(parent_digests) or parent_digests[i] != digest]
+
+                with open(temp_path, 'rb') as src, \
+                        gzip.open(self._path(snapshot_id, '.pages.gz'), 'wb', compresslevel=3) as out:
+                    for page_no in changed:
+                        src.seek(page_no * page_size)
+                        out.write(PAGE_RECORD.pack(page_no))
+                        out.write(src.read(page_size))
+
+                manifest = {
+                    'id': snapshot_id,
+                    'kind': 'incremental',
+                    'parent': parent['id'],
+                    'base': parent['base'],
+                    'chain_length': parent['chain_length'] + 1,
+                    'changed_pages': len(changed)
+                }
+            else:
+                with open(temp_path, 'rb') as src, \
+                        gzip.open(self._path(snapshot_id, '.db.gz'), 'wb', compresslevel=3) as out:
+                    shutil.copyfileobj(src, out, 1024 * 1024)
+
+                manifest = {
+                    'id': snapshot_id,
+                    'kind': 'full',
+                    'parent': None,
+                    'base': snapshot_id,
+                    'chain_length': 1,
+                    'changed_pages': len(digests)
+                }
+
+            with gzip.open(self._path(snapshot_id, '.hashes.gz'), 'wb') as out:
+                out.write(b''.join(digests))
+
+            manifest.update({
+                'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'source': os.path.abspath(db_path),
+                'page_size': page_size,
+                'page_count': len(digests),
+                'sha256': sha256
+            })
+
+            # The manifest is written last: a snapshot without one never existed
+            with open(self._path(snapshot_id, '.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.prune()
+        return manifest
+
+    def _chain(self, snapshot_id):
+        """Return manifests from the full base up to snapshot_id"""
+        by_id = {m['id']: m for m in self.list_snapshots()}
+        if snapshot_id not in by_id:
+            raise ValueError(f"Unknown snapshot: {snapshot_id}")
+
+        chain = [by_id[snapshot_id]]
+        while chain[-1]['parent']:
+            parent = chain[-1]['parent']
+            if parent not in by_id:
+                raise ValueError(f"Snapshot chain is broken at {parent}")
+            chain.append(by_id[parent])
+        return list(reversed(chain))
+
+    def restore(self, snapshot_id, target_path):
+        """Rebuild a snapshot, verify it, then write it into target_path in one transaction"""
+        chain = self._chain(snapshot_id)
+        manifest = chain[-1]
+        temp_path = target_path + '.restore'
+
+        try:
+            with gzip.open(self._path(chain[0]['id'], '.db.gz'), 'rb') as src, \
+                    open(temp_path, 'wb') as out:
+                shutil.copyfileobj(src, out, 1024 * 1024)
+
+            record_size = PAGE_RECORD.size + manifest['page_size']
+            with open(temp_path, 'r+b') as out:
+                for step in chain[1:]:
+                    page_size = step['page_size']
+                    with gzip.open(self._path(step['id'], '.pages.gz'), 'rb') as src:
+                        while True:
+                            record = src.read(record_size)
+                            if not record:
+                                break
+                            page_no, = PAGE_RECORD.unpack_from(record)
+                            out.seek(page_no * page_size)
+                            out.write(record[PAGE_RECORD.size:])
+                out.truncate(manifest['page_count'] * manifest['page_size'])
+
+            self.verify_file(temp_path, manifest)
+
+            # Readers holding the database open must see a commit, not a swapped file
+            online_backup(temp_path, target_path, pages=-1)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return manifest
+
+    def verify_file(self, path, manifest):
+        """Raise ValueError unless path matches the snapshot checksum and is intact"""
+        _, sha256 = page_digests(path, manifest['page_size'])
+        if sha256 != manifest['sha256']:
+            raise ValueError(f"Checksum mismatch restoring snapshot {manifest['id']}")
+
+        conn = sqlite3.connect(path)
+        try:
+            status = conn.execute('PRAGMA integrity_check').fetchone()[0]
+        finally:
+            conn.close()
+        if status != 'ok':
+            raise ValueError(f"Integrity check failed for snapshot {manifest['id']}: {status}")
+
+    def prune(self):
+        """Delete whole chains beyond the newest keep_chains"""
+        snapshots = self.list_snapshots()
+        bases = sorted({m['base'] for m in snapshots})
+        expired = set(bases[:-self.keep_chains]) if self.keep_chains else set()
+
+        for manifest in snapshots:
+            if manifest['base'] in expired:
+                for suffix in ('.json', '.db.gz', '.pages.gz', '.hashes.gz'):
+                    path = self._path(manifest['id'], suffix)
+                    if os.path.exists(path):
+                        os.remove(path)
+
+
+def main():
+    """Command-line entry point: list, snapshot or restore"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bomb game database snapshots")
+    parser.add_argument('--db', default='bomb_game_results.db', help="Database path")
+    parser.add_argument('--dir', default='backups', help="Backup directory")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="List snapshots")
+    sub.add_parser('snapshot', help="Take a snapshot now")
+    restore_parser = sub.add_parser('restore', help="Restore and verify a snapshot")
+    restore_parser.add_argument('snapshot_id')
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.dir)
+    if args.command == 'list':
+        for m in store.list_snapshots():
+            print(f"{m['id']}  {m['kind']:<11}  {m['page_count']} pages  "
+                  f"({m['changed_pages']} stored)  {m['created']}")
+    elif args.command == 'snapshot':
+        m = store.create_snapshot(args.db)
+        print(f"Created {m['kind']} snapshot {m['id']}")
+    elif args.command == 'restore':
+        m = store.restore(args.snapshot_id, args.db)
+        print(f"Restored and verified snapshot {m['id']} into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
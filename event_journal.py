@@ -0,0 +1,400 @@
+"""Append-only event journal for logged rounds.
+
+Every round is appended to an NDJSON journal before it touches the database.
+The journal is the source of truth for recovery: ``recover_journal`` re-applies
+rounds that were journaled but never committed, and ``replay_journal`` rebuilds
+``game_results``, ``pattern_analysis`` and ``session_summary`` from scratch.
+
+A journaled round counts as logged unless it is voided. When applying rounds
+to the database fails (and the user is told so), the writer appends a
+``void`` event naming their sequence range; recovery and replay skip voided
+rounds. Only a crash between journaling and committing leaves a round to be
+re-applied, which is the purpose of the journal.
+"""
+import json
+import os
+import sqlite3
+import time
+
+from game_profiles import DEFAULT_PROFILE
+from money import MONEY_FIELDS, sigils, to_sigils, to_units
+from strategy_ab import apply_strategy_round, rebuild_strategy_stats
+
+# Columns carried by a 'round' event, in insert order
+ROUND_FIELDS = ('timestamp', 'session_id', 'round_number', 'bet_amount', 'strategy',
+                'result', 'safe_picks', 'multiplier', 'winnings', 'profit',
+                'ending_balance', 'bomb_positions', 'notes', 'play_duration',
+                'game_profile', 'started_mono_ns', 'logged_mono_ns')
+
+# Values for fields that events journaled by older versions lack
+ROUND_DEFAULTS = {'game_profile': DEFAULT_PROFILE}
+
+
+def round_values(data):
+    """Return a round event's values in ROUND_FIELDS order"""
+    values = (data.get(field) for field in ROUND_FIELDS)
+    return tuple(ROUND_DEFAULTS.get(field) if value is None else value
+                 for field, value in zip(ROUND_FIELDS, values))
+
+
+def round_row(data):
+    """Return a round event's game_results values: ROUND_FIELDS order, money in units"""
+    return tuple(to_units(value) if field in MONEY_FIELDS else value
+                 for field, value in zip(ROUND_FIELDS, round_values(data)))
+
+
+def row_event(row):
+    """Return a game_results row selected in ROUND_FIELDS order as an event dict"""
+    return {field: to_sigils(value) if field in MONEY_FIELDS else value
+            for field, value in zip(ROUND_FIELDS, row)}
+
+
+class EventJournal:
+    """NDJSON journal with batched fsync"""
+
+    def __init__(self, path, fsync_every=32, fsync_interval=1.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.seq = repair_tail(path)
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def _write(self, event_type, data):
+        """Write one event line without flushing"""
+        self.seq += 1
+        event = {'seq': self.seq, 'type': event_type, 'data': data}
+        self.file.write(json.dumps(event, separators=(',', ':')) + '\n')
+        self.pending += 1
+
+    def append(self, event_type, data):
+        """Append an event and return its sequence number"""
+        self._write(event_type, data)
+
+        if (self.pending >= self.fsync_every or
+                time.monotonic() - self.last_sync >= self.fsync_interval):
+            self.flush()
+        else:
+            # Hand the line to the OS so a process crash cannot lose it;
+            # only power loss can drop events between fsyncs
+            self.file.flush()
+        return self.seq
+
+    def append_many(self, event_type, items):
+        """Append a batch of events with a single fsync"""
+        for data in items:
+            self._write(event_type, data)
+        self.flush()
+        return self.seq
+
+    def flush(self, sync=True):
+        """Flush buffered events, optionally forcing them to disk"""
+        if self.file.closed:
+            return
+        self.file.flush()
+        if sync and self.pending:
+            os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        """Flush and close the journal"""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def line_sequence(line):
+    """Read the sequence number from the '{"seq":N,' prefix without parsing JSON"""
+    return int(line[7:line.index(',', 7)])
+
+
+def iter_events(path, after_seq=0):
+    """Yield journal events with a sequence number above after_seq"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            # Skipping applied events is the common case during recovery
+            try:
+                if line_sequence(line) <= after_seq:
+                    continue
+            except ValueError:
+                pass
+            try:
+                event = json.loads(line)
+            except ValueError:
+                # Torn final line from a crash mid-write
+                break
+            if event['seq'] > after_seq:
+                yield event
+
+
+def voided_sequences(path, after_seq=0):
+    """Return the sequence numbers of rounds voided by 'void' events after after_seq"""
+    voided = set()
+    if not os.path.exists(path):
+        return voided
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            # Events are written compactly, so the type follows the sequence number
+            if '"type":"void"' not in line[:48]:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                break
+            if event['seq'] > after_seq:
+                data = event['data']
+                voided.update(range(data['first_seq'], data['last_seq'] + 1))
+    return voided
+
+
+def last_sequence(path):
+    """Return the highest sequence number in the journal"""
+    seq = 0
+    for event in iter_events(path):
+        seq = event['seq']
+    return seq
+
+
+def repair_tail(path):
+    """Truncate a torn final line and return the last intact sequence number"""
+    if not os.path.exists(path):
+        return 0
+
+    seq = 0
+    good_offset = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                seq = line_sequence(line.decode('utf-8'))
+            except ValueError:
+                break
+            good_offset += len(line)
+
+    if good_offset < os.path.getsize(path):
+        with open(path, 'r+b') as f:
+            f.truncate(good_offset)
+    return seq
+
+
+def init_journal_state(conn):
+    """Create the table recording the last journal event applied to the DB"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS journal_state (
+            key TEXT PRIMARY KEY,
+            value INTEGER
+        )
+    ''')
+
+
+def get_applied_sequence(conn):
+    """Return the last journal sequence committed to the database"""
+    init_journal_state(conn)
+    row = conn.execute(
+        "SELECT value FROM journal_state WHERE key = 'applied_seq'").fetchone()
+    return row[0] if row else 0
+
+
+def set_applied_sequence(conn, seq):
+    """Record seq as applied; call inside the transaction that applied it"""
+    conn.execute('''
+        INSERT INTO journal_state (key, value) VALUES ('applied_seq', ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    ''', (seq,))
+
+
+def insert_round(conn, data):
+    """Insert one journaled round into game_results; return its id"""
+    return conn.execute(f'''
+        INSERT INTO game_results ({', '.join(ROUND_FIELDS)})
+        VALUES ({', '.join('?' * len(ROUND_FIELDS))})
+    ''', round_row(data)).lastrowid
+
+
+def apply_pattern(conn, safe_picks, result, profit, game_profile=DEFAULT_PROFILE):
+    """Fold one round into pattern_analysis (total_profit in units, avg_profit in Sigils)"""
+    units = to_units(profit)
+    cursor = conn.execute(f'''
+        UPDATE pattern_analysis
+        SET occurrence_count = occurrence_count + 1,
+            win_count = win_count + ?,
+            total_profit = total_profit + ?,
+            avg_profit = {sigils('total_profit + ?')} / (occurrence_count + 1),
+            last_updated = CURRENT_TIMESTAMP
+        WHERE safe_pick_count = ? AND game_profile = ?
+    ''', (1 if result == 'win' else 0, units, units, safe_picks, game_profile))
+
+    if cursor.rowcount == 0:
+        conn.execute('''
+            INSERT INTO pattern_analysis
+            (safe_pick_count, game_profile, occurrence_count, win_count, avg_profit,
+             total_profit, last_updated)
+            VALUES (?, ?, 1, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', (safe_picks, game_profile, 1 if result == 'win' else 0, to_sigils(units), units))
+
+
+def rebuild_session_summary(conn, session_ids=None):
+    """Recompute session_summary rows from game_results"""
+    where = ''
+    params = ()
+    if session_ids is not None:
+        session_ids = list(session_ids)
+        if not session_ids:
+            return
+        where = f"WHERE session_id IN ({', '.join('?' * len(session_ids))})"
+        params = tuple(session_ids)
+        conn.execute(f'DELETE FROM session_summary {where}', params)
+    else:
+        conn.execute('DELETE FROM session_summary')
+
+    conn.execute(f'''
+        INSERT INTO session_summary
+        (session_id, start_time, end_time, initial_balance, final_balance,
+         total_rounds, total_wins, total_losses, net_profit, win_rate,
+         max_balance, min_balance, avg_profit, best_round_profit, worst_round_profit)
+        SELECT
+            session_id,
+            MIN(timestamp),
+            MAX(timestamp),
+            (SELECT {sigils('g2.ending_balance - g2.profit')} FROM game_results g2
+             WHERE g2.session_id = g.session_id ORDER BY g2.round_number LIMIT 1),
+            (SELECT {sigils('g3.ending_balance')} FROM game_results g3
+             WHERE g3.session_id = g.session_id ORDER BY g3.round_number DESC LIMIT 1),
+            COUNT(*),
+            SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN result = 'loss' THEN 1 ELSE 0 END),
+            {sigils('SUM(profit)')},
+            SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END) * 100.0 / COUNT(*),
+            {sigils('MAX(ending_balance)')},
+            {sigils('MIN(ending_balance)')},
+            {sigils('AVG(profit)')},
+            {sigils('MAX(profit)')},
+            {sigils('MIN(profit)')}
+        FROM game_results g
+        {where}
+        GROUP BY session_id
+    ''', params)
+
+
+def bootstrap_journal(journal, db_path):
+    """Seed an empty journal with rounds logged before journaling existed"""
+    if journal.seq:
+        return 0
+
+    conn = sqlite3.connect(db_path)
+    try:
+        init_journal_state(conn)
+        cursor = conn.execute(f'''
+            SELECT {', '.join(ROUND_FIELDS)} FROM game_results ORDER BY id
+        ''')
+        journal.append_many('round', (row_event(row) for row in cursor))
+        if not journal.seq:
+            return 0
+
+        with conn:
+            set_applied_sequence(conn, journal.seq)
+        return journal.seq
+    finally:
+        conn.close()
+
+
+def recover_journal(journal_path, db_path):
+    """Apply journaled rounds that never reached the database; return the count"""
+    conn = sqlite3.connect(db_path)
+    try:
+        applied = get_applied_sequence(conn)
+        voided = voided_sequences(journal_path, after_seq=applied)
+        recovered = 0
+        sessions = set()
+
+        with conn:
+            for event in iter_events(journal_path, after_seq=applied):
+                if event['type'] == 'round' and event['seq'] not in voided:
+                    data = event['data']
+                    insert_round(conn, data)
+                    game_profile = data.get('game_profile') or DEFAULT_PROFILE
+                    apply_pattern(conn, data['safe_picks'], data['result'], data['profit'],
+                                  game_profile)
+                    apply_strategy_round(conn, data['session_id'], game_profile,
+                                         data['strategy'], data['result'], data['profit'])
+                    sessions.add(data['session_id'])
+                    recovered += 1
+                applied = event['seq']
+
+            set_applied_sequence(conn, applied)
+            rebuild_session_summary(conn, sessions)
+
+        return recovered
+    finally:
+        conn.close()
+
+
+def replay_journal(journal_path, db_path, batch_size=5000):
+    """Rebuild all round-derived tables from the journal; return the round count"""
+    conn = sqlite3.connect(db_path)
+    try:
+        # The rebuild is a single transaction, so durability of each batch
+        # is irrelevant until the final commit
+        conn.execute('PRAGMA synchronous = OFF')
+
+        voided = voided_sequences(journal_path)
+        patterns = {}
+        batch = []
+        total = 0
+        last_seq = 0
+
+        with conn:
+            conn.execute('DELETE FROM game_results')
+            conn.execute('DELETE FROM pattern_analysis')
+
+            for event in iter_events(journal_path):
+                last_seq = event['seq']
+                if event['type'] != 'round' or last_seq in voided:
+                    continue
+
+                data = event['data']
+                batch.append(round_row(data))
+
+                key = (data.get('game_profile') or DEFAULT_PROFILE, data['safe_picks'])
+                stats = patterns.setdefault(key, [0, 0, 0])
+                stats[0] += 1
+                stats[1] += 1 if data['result'] == 'win' else 0
+                stats[2] += to_units(data['profit'])
+
+                if len(batch) >= batch_size:
+                    total += _flush_rounds(conn, batch)
+
+            total += _flush_rounds(conn, batch)
+
+            conn.executemany('''
+                INSERT INTO pattern_analysis
+                (safe_pick_count, game_profile, occurrence_count, win_count, avg_profit,
+                 total_profit, last_updated)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', [(picks, game_profile, count, wins, to_sigils(profit) / count, profit)
+                  for (game_profile, picks), (count, wins, profit) in sorted(patterns.items())])
+
+            rebuild_session_summary(conn)
+            rebuild_strategy_stats(conn)
+            set_applied_sequence(conn, last_seq)
+
+        return total
+    finally:
+        conn.close()
+
+
+def _flush_rounds(conn, batch):
+    """Insert and clear a batch of round rows"""
+    count = len(batch)
+    if count:
+        conn.executemany(f'''
+            INSERT INTO game_results ({', '.join(ROUND_FIELDS)})
+            VALUES ({', '.join('?' * len(ROUND_FIELDS))})
+        ''', batch)
+        batch.clear()
+    return count
@@ -0,0 +1,145 @@
+"""Game configuration profiles.
+
+A profile describes one game variant: board size, bomb count and payout
+curve. Each profile precomputes its lookup arrays once (per-pick safe odds,
+survival probability, multiplier and expected return per stop point), so
+analytics index into them instead of rebuilding tables on every call.
+Profiles live in the ``game_profiles`` table and every round is tagged with
+the profile it was played under.
+"""
+import json
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_PROFILE = 'classic_25_5'
+
+# Payout curve of the original 25-tile/5-bomb game; entry i pays i + 1 safe picks
+CLASSIC_MULTIPLIERS = (1.18, 1.49, 1.9, 2.46, 3.23, 4.31, 5.7, 7.89, 11.19, 16.01,
+                       24.01, 37.36, 60.37, 92, 168, 337, 664, 2000, 2000, 2000)
+
+
+class GameProfile:
+    """One game variant with precomputed multiplier and probability arrays
+
+    Arrays are indexed by stop point: entry i describes cashing out after
+    i + 1 safe picks.
+    """
+
+    __slots__ = ('name', 'tiles', 'bombs', 'description', 'multipliers',
+                 'pick_safe', 'survival', 'expected_return')
+
+    def __init__(self, name, tiles, bombs, multipliers, description=''):
+        if not 0 < bombs < tiles:
+            raise ValueError(f"Profile {name}: bombs must be between 1 and {tiles - 1}")
+        if not 0 < len(multipliers) <= tiles - bombs:
+            raise ValueError(f"Profile {name}: expected 1-{tiles - bombs} multipliers, "
+                             f"got {len(multipliers)}")
+
+        self.name = name
+        self.tiles = tiles
+        self.bombs = bombs
+        self.description = description
+        self.multipliers = np.asarray(multipliers, dtype=float)
+
+        # Pick i (0-based) is safe with probability safe_left / tiles_left
+        picks = np.arange(len(self.multipliers))
+        self.pick_safe = (tiles - bombs - picks) / (tiles - picks)
+        self.survival = np.cumprod(self.pick_safe)
+        self.expected_return = self.survival * self.multipliers
+
+        # Shared by every caller, so nobody may write into them
+        for array in (self.multipliers, self.pick_safe, self.survival, self.expected_return):
+            array.setflags(write=False)
+
+    @property
+    def max_picks(self):
+        return len(self.multipliers)
+
+    def multiplier(self, safe_picks):
+        """Payout multiplier for cashing out after safe_picks picks"""
+        if not 1 <= safe_picks <= self.max_picks:
+            raise ValueError(f"{self.name} pays out for 1-{self.max_picks} safe picks, "
+                             f"not {safe_picks}")
+        return float(self.multipliers[safe_picks - 1])
+
+    def survival_probability(self, safe_picks):
+        """Probability that the first safe_picks picks are all safe"""
+        if safe_picks <= 0:
+            return 1.0
+        if safe_picks > self.max_picks:
+            raise ValueError(f"{self.name} has at most {self.max_picks} safe picks")
+        return float(self.survival[safe_picks - 1])
+
+    def label(self):
+        return f"{self.name} ({self.tiles} tiles, {self.bombs} bombs)"
+
+
+def fair_multipliers(tiles, bombs, house_edge=0.01, max_picks=None):
+    """Payout curve returning (1 - house_edge) of the stake at every stop point"""
+    picks = np.arange(max_picks or tiles - bombs)
+    survival = np.cumprod((tiles - bombs - picks) / (tiles - picks))
+    return tuple(float(m) for m in np.round((1 - house_edge) / survival, 2))
+
+
+BUILTIN_PROFILES = (
+    GameProfile(DEFAULT_PROFILE, 25, 5, CLASSIC_MULTIPLIERS,
+                'Original 5x5 board with 5 bombs'),
+)
+
+
+def init_profiles(conn):
+    """Create the profile table, seed built-ins and tag rounds with a profile column"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS game_profiles (
+            name TEXT PRIMARY KEY,
+            tiles INTEGER,
+            bombs INTEGER,
+            multipliers TEXT,
+            description TEXT,
+            created DATETIME
+        )
+    ''')
+    for profile in BUILTIN_PROFILES:
+        conn.execute('''
+            INSERT OR IGNORE INTO game_profiles
+            (name, tiles, bombs, multipliers, description, created)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', profile_row(profile))
+
+    # Rounds and patterns logged before profiles existed belong to the classic game
+    for table in ('game_results', 'pattern_analysis'):
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+        if 'game_profile' not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN game_profile TEXT "
+                         f"DEFAULT '{DEFAULT_PROFILE}'")
+
+
+def profile_row(profile):
+    return (profile.name, profile.tiles, profile.bombs,
+            json.dumps(profile.multipliers.tolist()), profile.description,
+            datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+
+def save_profile(conn, profile):
+    """Insert or replace a profile definition"""
+    conn.execute('''
+        INSERT INTO game_profiles (name, tiles, bombs, multipliers, description, created)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            tiles = excluded.tiles,
+            bombs = excluded.bombs,
+            multipliers = excluded.multipliers,
+            description = excluded.description
+    ''', profile_row(profile))
+
+
+def load_profiles(conn):
+    """Return {name: GameProfile} for every stored profile"""
+    profiles = {}
+    for name, tiles, bombs, multipliers, description in conn.execute('''
+        SELECT name, tiles, bombs, multipliers, description
+        FROM game_profiles ORDER BY name
+    '''):
+        profiles[name] = GameProfile(name, tiles, bombs, json.loads(multipliers), description or '')
+    return profiles
@@ -0,0 +1,150 @@
+"""Keyset pagination over game_results for the history browser.
+
+Pages are fetched with row-value comparisons on (sort column, session_id,
+round_number), so any page costs the same whether it is the first or the
+millionth. Filters and sort order are pushed down to SQL, and every sortable
+column leads an index with the tie-breakers so a page is an index seek rather
+than a scan and sort.
+
+A comparison against NULL is never true, so rows with a NULL sort value are
+paged separately, ordered by the tie-breakers alone. SQLite sorts NULLs
+first: ascending pages walk the NULL rows before the values, descending ones
+after.
+
+The whole archive is spread over several connections (see
+round_archive.scope_batches); each page then takes the best rows of every
+connection's page and merges them.
+"""
+import heapq
+from itertools import islice
+
+
+SORTABLE_COLUMNS = ('session_id', 'round_number', 'timestamp', 'bet_amount', 'strategy',
+                    'result', 'safe_picks', 'multiplier', 'profit', 'ending_balance')
+
+PAGE_COLUMNS = ('session_id', 'round_number', 'timestamp', 'bet_amount', 'strategy',
+                'result', 'safe_picks', 'multiplier', 'profit', 'ending_balance')
+
+# Sort keys already led by idx_results_session_round and idx_results_timestamp
+INDEXED_COLUMNS = ('session_id', 'timestamp')
+
+
+def key_columns(sort_column):
+    """The sort column followed by the tie-breakers that make every key unique"""
+    return (sort_column,) + tuple(
+        column for column in ('session_id', 'round_number') if column != sort_column)
+
+
+def init_sort_indexes(conn):
+    """Index each remaining sortable column together with its tie-breakers"""
+    for column in SORTABLE_COLUMNS:
+        if column not in INDEXED_COLUMNS:
+            conn.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_results_sort_{column}
+                ON game_results ({', '.join(key_columns(column))})
+            ''')
+
+
+class HistoryPager:
+    """Builds and runs keyset-paginated queries for one filter/sort combination
+
+    The pager keeps its connection open for its lifetime, so a scoped view
+    over archived partitions is only built once; call close() when done.
+    connect may also return a list of connections holding disjoint rows.
+    """
+
+    def __init__(self, connect, table='game_results', page_size=200, session_id=None,
+                 strategy=None, result=None, safe_picks=None,
+                 sort_column='round_number', descending=False):
+        if sort_column not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort_column}")
+        conns = connect()
+        self.conns = conns if isinstance(conns, list) else [conns]
+        self.table = table
+        self.page_size = page_size
+        self.descending = descending
+
+        self.key_columns = key_columns(sort_column)
+
+        filters = []
+        self.params = []
+        for column, value in (('session_id', session_id), ('strategy', strategy),
+                              ('result', result), ('safe_picks', safe_picks)):
+            if value is not None:
+                filters.append(f"{column} = ?")
+                self.params.append(value)
+        self.filters = filters
+        self._count = None
+
+    def key_of(self, row):
+        """Extract the keyset key from a page row"""
+        return tuple(row[PAGE_COLUMNS.index(column)] for column in self.key_columns)
+
+    def _side(self, nulls, bound, descending, limit):
+        """Rows on one side of the sort column's NULL split, past an optional bound"""
+        sort_column = self.key_columns[0]
+        filters = list(self.filters)
+        params = list(self.params)
+        filters.append(f"{sort_column} IS {'' if nulls else 'NOT '}NULL")
+        if bound is not None:
+            # Among NULL sort values only the tie-breakers order rows
+            columns = self.key_columns[1:] if nulls else self.key_columns
+            values = bound[1:] if nulls else bound
+            filters.append(f"({', '.join(columns)}) {'<' if descending else '>'} "
+                           f"({', '.join('?' * len(columns))})")
+            params.extend(values)
+
+        direction = 'DESC' if descending else 'ASC'
+        order = ', '.join(f"{column} {direction}" for column in self.key_columns)
+        sql = f'''
+            SELECT {', '.join(PAGE_COLUMNS)}
+            FROM {self.table}
+            WHERE {' AND '.join(filters)}
+            ORDER BY {order}
+            LIMIT ?
+        '''
+        pages = [conn.execute(sql, params + [limit]).fetchall() for conn in self.conns]
+        if len(pages) == 1:
+            return pages[0]
+        # Within one side the key columns hold no NULLs that would need comparing
+        return list(islice(heapq.merge(*pages, key=self.key_of, reverse=descending), limit))
+
+    def _query(self, bound=None, reverse=False):
+        # Fetching backwards flips the order; rows are reversed afterwards
+        descending = self.descending != reverse
+        sides = (False, True) if descending else (True, False)
+        if bound is not None:
+            sides = sides[sides.index(bound[0] is None):]
+
+        rows = []
+        for nulls in sides:
+            if len(rows) >= self.page_size:
+                break
+            rows += self._side(nulls, bound, descending, self.page_size - len(rows))
+            bound = None
+        return rows[::-1] if reverse else rows
+
+    def first_page(self):
+        return self._query()
+
+    def last_page(self):
+        return self._query(reverse=True)
+
+    def page_after(self, key):
+        return self._query(bound=key)
+
+    def page_before(self, key):
+        return self._query(bound=key, reverse=True)
+
+    def count(self):
+        """Total rows matching the filters (computed once per pager)"""
+        if self._count is None:
+            where = f"WHERE {' AND '.join(self.filters)}" if self.filters else ''
+            self._count = sum(conn.execute(f'SELECT COUNT(*) FROM {self.table} {where}',
+                                           self.params).fetchone()[0]
+                              for conn in self.conns)
+        return self._count
+
+    def close(self):
+        for conn in self.conns:
+            conn.close()
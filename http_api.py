@@ -0,0 +1,445 @@
+"""Read-only local HTTP API over the results database.
+
+An optional, separately started server (standard library only) that exposes
+the analytics as JSON and the charts as PNG, so they can be viewed from a
+browser or other tools while the logger keeps running:
+
+    GET /api/sessions                         per-session aggregates, newest first
+    GET /api/sessions/<id>                    report sections of one session
+    GET /api/sessions/<id>/strategies         strategy table and pairwise tests
+    GET /api/sessions/<id>/timeseries         gap-filled series (?freq=day)
+    GET /api/sessions/<id>/charts/<name>.png  any chart of the Charts tab
+    GET /api/patterns                         safe-pick pattern table
+    GET /api/timeseries                       series across every session
+    GET /api/charts/<name>.png                time charts across every session
+
+Most endpoints take ``?profile=<name>`` to restrict to one game profile.
+
+Requests share a small pool of ``mode=ro`` connections. The logger keeps
+the database in WAL mode, so these readers never block its writes (nor
+its writes them). Responses are cached and tagged with an ETag derived
+from SQLite's ``PRAGMA data_version``, which moves whenever another
+connection commits. Repeat requests are answered from memory, or with
+304 Not Modified, until the next round is logged.
+
+Usage:
+    python http_api.py --db bomb_game_results.db --port 8765
+"""
+import json
+import math
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+import numpy as np
+
+from batch_reports import report_sections, session_stats
+from charts import (balance_figure, calendar_figure, daily_figure, heatmap_figure, hour_figure,
+                    multiplier_figure, profit_distribution_figure, render_png, risk_figure,
+                    win_loss_figure)
+from money import sigils, to_sigils
+from session_buffer import SessionBuffer
+from strategy_ab import (PERMUTATION_MAX_ROUNDS, by_profile, compare_strategies,
+                         ev_significance, load_sequential, load_strategy_stats,
+                         permutation_tests)
+from time_series import FREQUENCIES, resample_query
+
+DEFAULT_PORT = 8765
+POOL_SIZE = 8
+CACHE_ENTRIES = 256
+
+# Charts drawn from a session's rounds, and from a TimeSeries (with its interval)
+ROUND_CHARTS = {
+    'balance': lambda rounds: balance_figure(rounds, rounds['ending_balance'][-1]),
+    'profit_dist': profit_distribution_figure,
+    'win_loss': win_loss_figure,
+    'heatmap': heatmap_figure,
+    'multiplier': multiplier_figure,
+    'risk': risk_figure,
+}
+SERIES_CHARTS = {
+    'daily': (daily_figure, None),
+    'calendar': (calendar_figure, 'day'),
+    'hour_of_day': (hour_figure, 'hour'),
+}
+
+# matplotlib is not thread-safe; figures are built and rasterized one at a time
+RENDER_LOCK = threading.Lock()
+
+
+class NotFound(Exception):
+    pass
+
+
+def connect_readonly(db_path):
+    """Open a connection that cannot write to the database"""
+    conn = sqlite3.connect(f'file:{quote(os.path.abspath(db_path))}?mode=ro', uri=True,
+                           check_same_thread=False)
+    # batch_reports reads the scoped_results view; here it is the live table
+    conn.execute('CREATE TEMP VIEW scoped_results AS SELECT * FROM main.game_results')
+    return conn
+
+
+class ConnectionPool:
+    """Fixed set of read-only connections handed out to request threads"""
+
+    def __init__(self, db_path, size=POOL_SIZE):
+        self.connections = queue.LifoQueue()
+        for _ in range(size):
+            self.connections.put(connect_readonly(db_path))
+
+    @contextmanager
+    def connection(self):
+        conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
+
+
+class WriteVersion:
+    """Token that changes whenever another connection commits to the database"""
+
+    def __init__(self, db_path):
+        self.conn = connect_readonly(db_path)
+        self.lock = threading.Lock()
+        self.boot = f'{os.getpid():x}{int(time.time()):x}'
+        self.data_version = None
+        self.generation = 0
+
+    def current(self):
+        with self.lock:
+            data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version != self.data_version:
+                self.data_version = data_version
+                self.generation += 1
+            return f'{self.boot}-{self.generation}'
+
+
+def clean(value):
+    """JSON-safe copy: NumPy values to Python, NaN and infinities to null"""
+    if isinstance(value, dict):
+        return {str(k): clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [clean(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return clean(value.tolist())
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def profile_filter(query):
+    profile = query.get('profile')
+    if profile in (None, 'All'):
+        return '', ()
+    return 'AND game_profile = ?', (profile,)
+
+
+def series_json(series):
+    return {'freq': series.freq, 'period': series.period.astype(str), 'rounds': series.rounds,
+            'wins': series.wins, 'profit': series.profit, 'wagered': series.wagered,
+            'balance': series.balance, 'win_rate': series.win_rate}
+
+
+def frequency(query, default='day'):
+    freq = query.get('freq', default)
+    if freq not in FREQUENCIES:
+        raise ValueError(f"freq must be one of {', '.join(FREQUENCIES)}")
+    return freq
+
+
+def list_sessions(conn, query):
+    limit = int(query.get('limit', 100))
+    offset = int(query.get('offset', 0))
+    return session_stats(conn)[offset:offset + limit]
+
+
+def session_report(conn, query, session_id):
+    found = session_stats(conn, session_id)
+    if not found:
+        raise NotFound(session_id)
+    stats = found[0]
+    sections, recommendations = report_sections(stats)
+    return {'stats': stats,
+            'sections': {title.lower().replace(' ', '_'): dict(rows) for title, rows in sections},
+            'recommendations': [{'mark': mark, 'text': text} for mark, text in recommendations]}
+
+
+def session_strategies(conn, query, session_id):
+    """The Strategies pane's table and significance tests as data"""
+    profile_sql, profile_params = profile_filter(query)
+    rows = conn.execute(f'''
+        SELECT
+            game_profile,
+            strategy,
+            COUNT(*) as games,
+            SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END) as wins,
+            {sigils('AVG(profit)')} as avg_profit,
+            {sigils('SUM(profit)')} as total_profit,
+            AVG(safe_picks) as avg_picks
+        FROM game_results
+        WHERE session_id = ? {profile_sql}
+        GROUP BY game_profile, strategy
+        ORDER BY avg_profit DESC
+    ''', (session_id,) + profile_params).fetchall()
+    if not rows:
+        raise NotFound(session_id)
+
+    stats = load_strategy_stats(conn, session_id, profile_params[0] if profile_params else None)
+    samples = None
+    if sum(s.games for s in stats.values()) <= PERMUTATION_MAX_ROUNDS:
+        samples = defaultdict(lambda: defaultdict(list))
+        for game_profile, strategy, profit in conn.execute(f'''
+            SELECT game_profile, strategy, profit FROM game_results
+            WHERE session_id = ? {profile_sql}
+        ''', (session_id,) + profile_params):
+            samples[game_profile][strategy].append(to_sigils(profit))
+
+    strategies = [{'game_profile': game_profile, 'strategy': strategy, 'games': games,
+                   'win_rate': wins / games * 100, 'avg_profit': avg_profit,
+                   'total_profit': total_profit, 'avg_safe_picks': avg_picks,
+                   'ev_p': (ev_significance(stats[(game_profile, strategy)])
+                            if (game_profile, strategy) in stats else None)}
+                  for game_profile, strategy, games, wins, avg_profit, total_profit, avg_picks in rows]
+    # Strategies are only compared within a game profile
+    sequential = load_sequential(conn, session_id, profile_params[0] if profile_params else None)
+    comparisons = [dict(comparison, game_profile=game_profile)
+                   for game_profile, profile_stats in sorted(by_profile(stats).items())
+                   for comparison in compare_strategies(
+                       profile_stats, permutation_tests(samples[game_profile]) if samples else None,
+                       sequential.get(game_profile))]
+    return {'strategies': strategies, 'comparisons': comparisons}
+
+
+def patterns(conn, query):
+    """The Patterns pane's per-safe-pick table"""
+    profile_sql, profile_params = profile_filter(query)
+    rows = conn.execute(f'''
+        SELECT
+            safe_pick_count,
+            SUM(occurrence_count) as games,
+            SUM(win_count) as wins,
+            (SUM(win_count) * 100.0 / SUM(occurrence_count)) as win_rate,
+            {sigils('SUM(total_profit)')} / SUM(occurrence_count) as avg_profit,
+            {sigils('SUM(total_profit)')} as total_profit
+        FROM pattern_analysis
+        WHERE occurrence_count > 0 {profile_sql}
+        GROUP BY safe_pick_count
+        ORDER BY avg_profit DESC
+    ''', profile_params).fetchall()
+    return [dict(zip(('safe_picks', 'games', 'wins', 'win_rate', 'avg_profit', 'total_profit'), row))
+            for row in rows]
+
+
+def timeseries(conn, query, session_id=None, freq=None):
+    where, params = profile_filter(query)
+    if session_id is not None:
+        where, params = f'AND session_id = ? {where}', (session_id,) + params
+    return resample_query(conn, freq or frequency(query), where=where, params=params)
+
+
+def session_chart(conn, query, session_id, name):
+    if name in SERIES_CHARTS:
+        return series_chart(conn, query, name, session_id)
+    if name not in ROUND_CHARTS:
+        raise NotFound(name)
+    buffer = SessionBuffer()
+    buffer.load(conn, session_id)
+    profile = query.get('profile')
+    rounds = buffer.scope(None if profile in (None, 'All') else profile)
+    if not len(rounds):
+        raise NotFound(session_id)
+    with RENDER_LOCK:
+        return render_png(ROUND_CHARTS[name](rounds))
+
+
+def series_chart(conn, query, name, session_id=None):
+    if name not in SERIES_CHARTS:
+        raise NotFound(name)
+    builder, freq = SERIES_CHARTS[name]
+    series = timeseries(conn, query, session_id, freq)
+    if not len(series):
+        raise NotFound(session_id or name)
+    with RENDER_LOCK:
+        return render_png(builder(series))
+
+
+ROUTES = [
+    (re.compile(r'/api/sessions'), list_sessions),
+    (re.compile(r'/api/sessions/([^/]+)'), session_report),
+    (re.compile(r'/api/sessions/([^/]+)/strategies'), session_strategies),
+    (re.compile(r'/api/sessions/([^/]+)/timeseries'),
+     lambda conn, query, session_id: series_json(timeseries(conn, query, session_id))),
+    (re.compile(r'/api/sessions/([^/]+)/charts/(\w+)\.png'), session_chart),
+    (re.compile(r'/api/patterns'), patterns),
+    (re.compile(r'/api/timeseries'), lambda conn, query: series_json(timeseries(conn, query))),
+    (re.compile(r'/api/charts/(\w+)\.png'), series_chart),
+]
+
+
+class ResponseCache:
+    """LRU of (status, content type, body) responses, valid while the write version holds
+
+    Concurrent misses on one key wait for a single computation instead of
+    all re-running it, so a commit does not set off a burst of identical
+    queries and chart renders.
+    """
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def fetch(self, key, version, compute):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                return entry[1]
+            flight = self.in_flight.get((key, version))
+            owner = flight is None
+            if owner:
+                flight = self.in_flight[(key, version)] = [threading.Event(), None]
+
+        if not owner:
+            flight[0].wait()
+            # The owner failed outright; compute independently
+            return flight[1] if flight[1] is not None else compute()
+
+        try:
+            flight[1] = response = compute()
+            if response[0] == 200:
+                with self.lock:
+                    self.entries[key] = (version, response)
+                    self.entries.move_to_end(key)
+                    while len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+            return response
+        finally:
+            with self.lock:
+                del self.in_flight[(key, version)]
+            flight[0].set()
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Dispatches GET requests to ROUTES; state lives on the server"""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/') or '/'
+        key = f'{path}?{url.query}'
+        version = self.server.write_version.current()
+        etag = f'"{version}"'
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        status, content_type, body = self.server.cache.fetch(
+            key, version, lambda: self.dispatch(path, query))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if status == 200:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def dispatch(self, path, query):
+        """Run the matching route; return (status, content type, body)"""
+        for pattern, handler in ROUTES:
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            try:
+                with self.server.pool.connection() as conn:
+                    result = handler(conn, query, *map(unquote, match.groups()))
+            except NotFound as e:
+                return self.error(404, f"Not found: {e}")
+            except ValueError as e:
+                return self.error(400, str(e))
+            except sqlite3.Error as e:
+                return self.error(503, f"Database error: {e}")
+            if isinstance(result, bytes):
+                return 200, 'image/png', result
+            return (200, 'application/json',
+                    json.dumps(clean(result), ensure_ascii=False).encode('utf-8'))
+
+        if path == '/':
+            endpoints = [pattern.pattern for pattern, _ in ROUTES]
+            return 200, 'application/json', json.dumps({'endpoints': endpoints}).encode('utf-8')
+        return self.error(404, f"No endpoint {path}")
+
+    def error(self, status, message):
+        return status, 'application/json', json.dumps({'error': message}).encode('utf-8')
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class ApiServer(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one pool, version tracker and cache"""
+
+    daemon_threads = True
+
+    def __init__(self, db_path, host='127.0.0.1', port=DEFAULT_PORT, pool_size=POOL_SIZE,
+                 quiet=False):
+        self.pool = ConnectionPool(db_path, pool_size)
+        self.write_version = WriteVersion(db_path)
+        self.cache = ResponseCache()
+        self.quiet = quiet
+        super().__init__((host, port), ApiHandler)
+
+    def journal_mode(self):
+        with self.pool.connection() as conn:
+            return conn.execute('PRAGMA journal_mode').fetchone()[0]
+
+
+def main():
+    """Command-line entry point: serve until interrupted"""
+    import argparse
+
+    import seaborn as sns
+
+    parser = argparse.ArgumentParser(description="Read-only bomb game analytics HTTP API")
+    parser.add_argument('--db', default='bomb_game_results.db', help="Database path")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument('--pool', type=int, default=POOL_SIZE, help="Read-only connections")
+    parser.add_argument('--quiet', action='store_true', help="Do not log requests")
+    args = parser.parse_args()
+
+    # Same chart look as the Tk window
+    sns.set_style("whitegrid")
+
+    server = ApiServer(args.db, args.host, args.port, args.pool, args.quiet)
+    if server.journal_mode() != 'wal':
+        print("Warning: database is not in WAL mode; start the logger once to convert it, "
+              "or readers may briefly block writes")
+    print(f"Serving {args.db} read-only on http://{args.host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Lightweight latency instrumentation for the logger's hot paths.
+
+``timed`` (decorator) and ``span`` (context manager) record wall-clock
+latencies into log-bucketed histograms held by a process-wide registry.
+``TimedConnection`` times every SQL statement and fetch, and
+``ProfileCapture`` wraps cProfile for ad-hoc .pstats dumps.
+"""
+import cProfile
+import functools
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Buckets grow geometrically from 1 microsecond, 20 per decade (~12% wide)
+BUCKET_BASE_MS = 0.001
+BUCKETS_PER_DECADE = 20
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with count, sum and extremes"""
+
+    __slots__ = ('buckets', 'count', 'total_ms', 'min_ms', 'max_ms')
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        index = int(math.log10(max(ms, BUCKET_BASE_MS) / BUCKET_BASE_MS) * BUCKETS_PER_DECADE)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Estimate the q-th percentile (0-100) from bucket upper bounds"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                upper = BUCKET_BASE_MS * 10 ** ((index + 1) / BUCKETS_PER_DECADE)
+                return min(max(upper, self.min_ms), self.max_ms)
+        return self.max_ms
+
+
+class MetricsRegistry:
+    """Named latency histograms shared across the app"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.enabled = True
+
+    def record(self, name, ms):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(ms)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def snapshot(self):
+        """Return summary rows sorted by total time spent, largest first"""
+        with self.lock:
+            rows = [{
+                'name': name,
+                'count': h.count,
+                'total_ms': h.total_ms,
+                'mean_ms': h.total_ms / h.count,
+                'p50_ms': h.percentile(50),
+                'p95_ms': h.percentile(95),
+                'p99_ms': h.percentile(99),
+                'max_ms': h.max_ms
+            } for name, h in self.histograms.items() if h.count]
+        return sorted(rows, key=lambda r: r['total_ms'], reverse=True)
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def span(name, registry=None):
+    """Record the duration of a with-block under name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        (registry or metrics).record(name, (time.perf_counter() - start) * 1000)
+
+
+def timed(name):
+    """Decorator recording each call's duration under name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.record(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+def query_label(sql):
+    """Short, stable histogram name for a SQL statement"""
+    return 'db: ' + ' '.join(sql.split())[:70]
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that records execute and fetch latencies per statement"""
+
+    label = 'db: ?'
+
+    def execute(self, sql, parameters=()):
+        self.label = query_label(sql)
+        with span(self.label):
+            return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self.label = query_label(sql)
+        with span(self.label):
+            return super().executemany(sql, seq_of_parameters)
+
+    def fetchone(self):
+        with span(self.label + ' [fetch]'):
+            return super().fetchone()
+
+    def fetchmany(self, size=None):
+        with span(self.label + ' [fetch]'):
+            return super().fetchmany(size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        with span(self.label + ' [fetch]'):
+            return super().fetchall()
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute) are timed"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class ProfileCapture:
+    """Toggleable cProfile capture that dumps .pstats files"""
+
+    def __init__(self, output_dir='profiles'):
+        self.output_dir = output_dir
+        self.profiler = None
+
+    @property
+    def active(self):
+        return self.profiler is not None
+
+    def start(self):
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop(self):
+        """Stop capturing and return the path of the dumped .pstats file"""
+        if self.profiler is None:
+            return None
+        self.profiler.disable()
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir,
+                            f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pstats")
+        self.profiler.dump_stats(path)
+        self.profiler = None
+        return path
+
+
+def database_stats(db_path):
+    """File and page statistics for the Diagnostics tab"""
+    conn = sqlite3.connect(db_path)
+    try:
+        stats = {
+            'file_size': os.path.getsize(db_path),
+            'page_size': conn.execute('PRAGMA page_size').fetchone()[0],
+            'page_count': conn.execute('PRAGMA page_count').fetchone()[0],
+            'freelist_count': conn.execute('PRAGMA freelist_count').fetchone()[0],
+            'journal_mode': conn.execute('PRAGMA journal_mode').fetchone()[0],
+            'user_version': conn.execute('PRAGMA user_version').fetchone()[0],
+            'tables': {}
+        }
+        for (table,) in conn.execute('''
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+            ORDER BY name
+        ''').fetchall():
+            stats['tables'][table] = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        wal_path = db_path + '-wal'
+        stats['wal_size'] = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+        return stats
+    finally:
+        conn.close()
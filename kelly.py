@@ -0,0 +1,128 @@
+"""Kelly bet sizing per stop point.
+
+Cashing out after k safe picks is a bet that returns multiplier_k - 1 per unit
+staked with the probability of surviving k picks and loses the stake
+otherwise. The growth-optimal (Kelly) fraction of bankroll is solved for every
+stop point at once with a vectorized Newton iteration, under two survival
+models: the profile's theoretical odds and a Kaplan-Meier estimate from the
+rounds recorded in ``pattern_analysis``.
+"""
+import numpy as np
+
+# Multiples of the Kelly fraction reported on the growth-rate curve
+KELLY_FRACTIONS = (0.25, 0.5, 1.0, 2.0)
+
+
+def empirical_survival(pattern_rows, max_picks):
+    """Kaplan-Meier survival per stop point from (safe_picks, games, wins) rows
+
+    A win at k picks survived picks 1..k; a loss at k picks survived 1..k and
+    hit a bomb on pick k + 1. Returns (survival, at_risk), where at_risk[k - 1]
+    counts rounds that attempted pick k; survival is NaN where nobody did.
+    """
+    wins = np.zeros(max_picks + 1)
+    losses = np.zeros(max_picks + 1)
+    for safe_picks, games, win_count in pattern_rows:
+        if 0 <= safe_picks <= max_picks:
+            wins[safe_picks] += win_count
+            losses[safe_picks] += games - win_count
+
+    # Rounds reaching at least k picks, from the right
+    wins_from = np.cumsum(wins[::-1])[::-1]
+    losses_from = np.cumsum(losses[::-1])[::-1]
+
+    at_risk = wins_from[1:] + losses_from[:-1]
+    failed = losses[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hazard = np.where(at_risk > 0, failed / at_risk, np.nan)
+    return np.cumprod(1 - hazard), at_risk
+
+
+def binary_outcomes(survival, multipliers):
+    """Per-stop-point (returns, probabilities) matrices for win/lose bets"""
+    survival = np.asarray(survival, dtype=float)
+    returns = np.column_stack([np.asarray(multipliers, dtype=float) - 1,
+                               -np.ones_like(survival)])
+    probs = np.column_stack([survival, 1 - survival])
+    return returns, probs
+
+
+def growth_rate(fractions, returns, probs):
+    """Expected log growth per bet for each row at each fraction (rows x fractions)"""
+    fractions = np.asarray(fractions, dtype=float)
+    if fractions.ndim == 1:
+        fractions = np.broadcast_to(fractions, (returns.shape[0], fractions.size))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        wealth = 1 + fractions[:, :, None] * returns[:, None, :]
+        return np.where(wealth > 0, probs[:, None, :] * np.log(wealth), -np.inf).sum(axis=2)
+
+
+def kelly_fraction(returns, probs, iterations=50, tolerance=1e-12):
+    """Growth-optimal stake fraction per row by vectorized Newton iteration
+
+    Rows without a positive edge, or without data (NaN probabilities), get 0.
+    """
+    valid = ~np.isnan(probs).any(axis=1)
+    returns = np.where(valid[:, None], returns, 0.0)
+    probs = np.where(valid[:, None], probs, 0.0)
+
+    edge = (probs * returns).sum(axis=1)
+    worst = returns.min(axis=1)
+    # Staking 1 / |worst loss| or more risks ruin; stay strictly inside
+    limit = np.where(worst < 0, -1 / np.where(worst < 0, worst, -1), 1.0) * (1 - 1e-9)
+
+    active = valid & (edge > 0)
+    f = np.zeros(len(returns))
+    if not active.any():
+        return f
+
+    f[active] = 0.5 * limit[active]
+    for _ in range(iterations):
+        denom = 1 + f[:, None] * returns
+        gradient = (probs * returns / denom).sum(axis=1)
+        curvature = -(probs * returns ** 2 / denom ** 2).sum(axis=1)
+        step = np.where(active & (curvature < 0), gradient / np.where(curvature < 0, curvature, -1), 0)
+        updated = np.clip(f - step, 0, limit)
+        # Newton can overshoot toward the ruin boundary; halve back instead
+        updated = np.where(updated >= limit, (f + limit) / 2, updated)
+        done = np.abs(updated - f).max() < tolerance
+        f = updated
+        if done:
+            break
+    return np.where(active, f, 0.0)
+
+
+def kelly_table(survival, multipliers, fractions=KELLY_FRACTIONS):
+    """Kelly fraction, edge and fractional-Kelly growth rates per stop point"""
+    returns, probs = binary_outcomes(survival, multipliers)
+    kelly = kelly_fraction(returns, probs)
+    growth = growth_rate(kelly[:, None] * np.asarray(fractions), returns, probs)
+    edge = np.asarray(survival, dtype=float) * np.asarray(multipliers, dtype=float) - 1
+    return {'kelly': kelly, 'edge': edge, 'growth': np.nan_to_num(growth)}
+
+
+class KellyOptimizer:
+    """Kelly tables per profile, cached until the data version changes"""
+
+    def __init__(self, fractions=KELLY_FRACTIONS):
+        self.fractions = fractions
+        self.cache = {}
+
+    def analyze(self, profile, pattern_rows, version):
+        """Return theoretical and empirical Kelly tables for a profile"""
+        cached = self.cache.get(profile.name)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        survival, at_risk = empirical_survival(pattern_rows, profile.max_picks)
+        result = {
+            'picks': np.arange(1, profile.max_picks + 1),
+            'multipliers': profile.multipliers,
+            'theory_survival': profile.survival,
+            'empirical_survival': survival,
+            'at_risk': at_risk,
+            'theory': kelly_table(profile.survival, profile.multipliers, self.fractions),
+            'empirical': kelly_table(survival, profile.multipliers, self.fractions)
+        }
+        self.cache[profile.name] = (version, result)
+        return result
@@ -0,0 +1,54 @@
+"""Fixed-point money amounts.
+
+``game_results`` stores ``bet_amount``, ``winnings``, ``profit`` and
+``ending_balance`` as INTEGER micro-Sigils, so SUMs over any number of rounds
+are exact and the running balance cannot drift away from them. The running
+sums folded per round are units too: ``strategy_stats.sum_profit`` (and
+``sum_sq_profit`` in squared units) and ``pattern_analysis.total_profit``.
+The form, ``Round`` records, the journal, exports and the other derived
+columns stay in Sigils: amounts become units with ``to_units`` where rounds
+are written, and Sigils again with ``to_sigils`` (or the ``sigils`` SQL
+wrapper, after aggregating) where they are read.
+
+Micro rather than milli units: bets are whole cents and multipliers have two
+decimals, so winnings need four decimals to stay exact.
+"""
+SCALE = 1000000
+
+# game_results columns held in units
+MONEY_FIELDS = ('bet_amount', 'winnings', 'profit', 'ending_balance')
+
+
+def to_units(amount):
+    """Sigils to integer units; None stays None"""
+    return None if amount is None else int(round(float(amount) * SCALE))
+
+
+def to_sigils(units):
+    """Integer units to Sigils; None stays None"""
+    return None if units is None else units / SCALE
+
+
+def sigils(expr, power=1):
+    """SQL turning a units expression into Sigils, e.g. sigils('SUM(profit)')
+
+    Use power=2 for sums of squares. Aggregate before converting so the
+    integer arithmetic stays exact.
+    """
+    return f'({expr}) / {SCALE ** power}.0'
+
+
+def units_sql(column, power=1):
+    """SQL converting a REAL Sigils column to units, for migrating old data
+
+    Use power=2 for sums of squares.
+    """
+    return f'CAST(round({column} * {SCALE ** power}) AS INTEGER)'
+
+
+def settle(bet, multiplier, won, balance):
+    """Return (winnings, profit, new balance) in Sigils, computed in whole units"""
+    bet_units = to_units(bet)
+    winnings = int(round(bet_units * multiplier)) if won else 0
+    profit = winnings - bet_units
+    return to_sigils(winnings), to_sigils(profit), to_sigils(to_units(balance) + profit)
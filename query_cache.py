@@ -0,0 +1,77 @@
+"""Result cache for the analytics panes' repeated queries.
+
+Entries are keyed by (normalized SQL, params) and tagged with the session
+they read. Logging a round bumps that session's write version, which
+invalidates exactly the entries reading it; untagged (cross-session)
+queries follow a version bumped by every write. Bulk rewrites such as a
+restore or a journal rebuild invalidate everything. An LRU bound keeps the
+cache small.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def normalize_sql(sql):
+    """Collapse whitespace so differently indented copies of a query share a key"""
+    return ' '.join(sql.split())
+
+
+class QueryCache:
+    """LRU cache of fetchall() results invalidated by per-session write versions"""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (version, rows)
+        self.session_versions = {}
+        self.write_version = 0
+        self.epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, session_id=None):
+        if session_id is None:
+            return self.epoch, self.write_version
+        return self.epoch, self.session_versions.get(session_id, 0)
+
+    def bump(self, session_id):
+        """Record a write to one session"""
+        self.session_versions[session_id] = self.session_versions.get(session_id, 0) + 1
+        self.write_version += 1
+
+    def invalidate_all(self):
+        """Forget everything, e.g. after the database was replaced"""
+        self.epoch += 1
+        self.entries.clear()
+
+    def fetchall(self, conn, sql, params=(), session_id=None):
+        """Rows of a query, from cache unless session_id (or anything, if None) changed"""
+        return self.get((normalize_sql(sql), tuple(params)),
+                        lambda: tuple(conn.execute(sql, params).fetchall()), session_id)
+
+    def get(self, key, compute, session_id=None):
+        """Cached value of compute() under key, e.g. rows combined from several queries"""
+        version = self.version(session_id)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = compute()
+        self.entries[key] = (version, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return value
+
+    def fetchone(self, conn, sql, params=(), session_id=None):
+        rows = self.fetchall(conn, sql, params, session_id)
+        return rows[0] if rows else None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'entries': len(self.entries), 'max_entries': self.max_entries,
+                'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
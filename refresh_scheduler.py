@@ -0,0 +1,67 @@
+"""Debounced, visibility-aware view refreshes.
+
+Logging a round used to recompute every pane immediately. Views are now
+registered with the notebook tabs they live on; writes only mark them dirty,
+and a debounced flush recomputes the dirty views that are actually on screen.
+Hidden views stay dirty until a ``<<NotebookTabChanged>>`` reveals them.
+"""
+
+
+class RefreshScheduler:
+    """Coalesce refresh requests and run them only for visible views"""
+
+    def __init__(self, root, delay_ms=150, max_delay_ms=1000):
+        self.root = root
+        self.delay_ms = delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.views = {}  # name -> (callback, ((notebook, frame), ...))
+        self.bound = set()  # notebooks whose tab changes already trigger a flush
+        self.dirty = set()
+        self._after_id = None
+        self._waited_ms = 0
+
+    def register(self, name, callback, *path):
+        """Register a view shown when each (notebook, frame) in path is selected"""
+        self.views[name] = (callback, path)
+        for notebook, _ in path:
+            if notebook not in self.bound:
+                self.bound.add(notebook)
+                notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed, add='+')
+
+    def is_visible(self, name):
+        _, path = self.views[name]
+        return all(notebook.select() == str(frame) for notebook, frame in path)
+
+    def mark_dirty(self, *names):
+        """Mark views (all when none given) stale and schedule a debounced flush"""
+        self.dirty.update(names or self.views)
+
+        # Each new request pushes the flush back, but never past max_delay_ms
+        if self._after_id is not None:
+            if self._waited_ms + self.delay_ms > self.max_delay_ms:
+                return
+            self.root.after_cancel(self._after_id)
+            self._waited_ms += self.delay_ms
+        self._after_id = self.root.after(self.delay_ms, self.flush)
+
+    def flush(self):
+        """Recompute the dirty views that are currently visible"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._waited_ms = 0
+
+        for name in [n for n in self.views if n in self.dirty]:
+            if self.is_visible(name):
+                # Cleared first so a failing view does not retry on every flush
+                self.dirty.discard(name)
+                self.views[name][0]()
+
+    def refresh_now(self, *names):
+        """Mark views dirty and recompute the visible ones immediately"""
+        self.dirty.update(names or self.views)
+        self.flush()
+
+    def _on_tab_changed(self, event):
+        if self.dirty:
+            self.root.after_idle(self.flush)
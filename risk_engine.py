@@ -0,0 +1,216 @@
+"""Drawdown and risk-of-ruin metrics from a session's balance path.
+
+The balance path is the starting balance of the first round followed by the
+ending balance of every round. ``DrawdownTracker`` keeps the running peak, the deepest drawdown (in
+Sigils and in percent of the peak), the longest stretch spent below a peak,
+the sum of squared percentage drawdowns behind the ulcer index, and the
+moments of profit per unit staked. It is extended with NumPy over whichever
+rounds are new since the last call, so views pay for each round once, not per
+refresh.
+
+Risk of ruin is the probability of losing the whole bankroll when betting
+the current bet size flat from the current balance:
+
+* ``analytic_ruin`` uses the diffusion approximation exp(-2 mu B / sigma^2)
+  with the observed mean and variance of profit per unit staked (certain
+  ruin without a positive edge);
+* ``simulated_ruin`` bootstraps the observed per-unit returns over a finite
+  horizon, so it also reflects skew and fat tails.
+
+Tail risk per round is given as VaR and CVaR (expected shortfall): the
+smallest and the average loss among the worst ``1 - TAIL_LEVEL`` of rounds,
+taken as the lowest of ``TAIL_TILES`` equal tiles like SQL's NTILE.
+"""
+import math
+
+import numpy as np
+
+TAIL_LEVEL = 0.95
+TAIL_TILES = round(1 / (1 - TAIL_LEVEL))
+RUIN_HORIZON = 1000
+RUIN_PATHS = 1000
+RUIN_BLOCK = 250
+
+
+def drawdown_path(balances, start, peak=None):
+    """Running peak and percent drawdown of the balances after each round
+
+    The peak includes the starting balance, or an earlier `peak` when the
+    path continues one already seen.
+    """
+    balances = np.asarray(balances, dtype=float)
+    peak = np.maximum.accumulate(np.maximum(balances, start if peak is None else peak))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        percent = np.where(peak > 0, (balances - peak) / peak * 100, 0.0)
+    return peak, percent
+
+
+def tail_loss(profits, tiles=TAIL_TILES):
+    """(VaR, CVaR) of per-round profit as positive losses, over the worst ceil(n / tiles) rounds"""
+    profits = np.asarray(profits, dtype=float)
+    if not len(profits):
+        return np.nan, np.nan
+    count = -(-len(profits) // tiles)
+    worst = np.partition(profits, count - 1)[:count]
+    return -float(worst.max()), -float(worst.mean())
+
+
+def unit_returns(rounds):
+    """Profit per unit staked of each round with a stake"""
+    bets = rounds['bet_amount']
+    staked = bets > 0
+    return rounds['profit'][staked] / bets[staked]
+
+
+def analytic_ruin(mean, variance, bankroll, bet):
+    """Probability of ever losing the bankroll betting flat (diffusion approximation)"""
+    if bankroll <= 0:
+        return 1.0
+    if bet <= 0 or mean is None or np.isnan(mean):
+        return np.nan
+    if mean <= 0:
+        return 1.0
+    if variance <= 0:
+        return 0.0
+    return float(np.exp(-2 * mean * bankroll / (bet * variance)))
+
+
+def simulated_ruin(returns, bankroll, bet, horizon=RUIN_HORIZON, paths=RUIN_PATHS, seed=0):
+    """Share of bootstrapped flat-bet paths that lose the bankroll within the horizon"""
+    returns = np.asarray(returns, dtype=float)
+    if bankroll <= 0:
+        return 1.0
+    if bet <= 0 or not len(returns):
+        return np.nan
+    rng = np.random.default_rng(seed)
+    ruined = 0
+    for first in range(0, paths, RUIN_BLOCK):
+        block = min(RUIN_BLOCK, paths - first)
+        steps = returns[rng.integers(0, len(returns), size=(block, horizon))] * bet
+        ruined += np.count_nonzero((bankroll + np.cumsum(steps, axis=1)).min(axis=1) <= 0)
+    return ruined / paths
+
+
+class DrawdownTracker:
+    """Running drawdown state of one balance path, extended with new rounds only"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, key=None, start=0.0):
+        self.key = key
+        self.start = start
+        self.count = 0
+        self.balance = start
+        self.peak = start
+        self.peak_index = 0
+        self.max_drawdown = 0.0
+        self.max_drawdown_pct = 0.0
+        self.max_duration = 0
+        self.sum_sq_pct = 0.0
+        self.staked = 0
+        self.sum_return = 0.0
+        self.sum_sq_return = 0.0
+
+    def sync(self, key, rounds):
+        """Catch up with a growing array of rounds; restart on a new key or a shorter array"""
+        if key != self.key or len(rounds) < self.count:
+            start = float(rounds['ending_balance'][0] - rounds['profit'][0]) if len(rounds) else 0.0
+            self.reset(key, start)
+        if len(rounds) > self.count:
+            self.extend(rounds[self.count:])
+        return self
+
+    def extend(self, rounds):
+        """Fold the next rounds of the path in, vectorized over the chunk"""
+        balance = np.asarray(rounds['ending_balance'], dtype=float)
+        peak, percent = drawdown_path(balance, self.balance, self.peak)
+
+        # Path index 0 is the starting balance; round i ends at index count + i + 1
+        index = np.arange(self.count + 1, self.count + len(balance) + 1)
+        last_peak = np.maximum.accumulate(np.where(balance >= peak, index, self.peak_index))
+
+        self.max_drawdown = max(self.max_drawdown, float((peak - balance).max()))
+        self.max_drawdown_pct = max(self.max_drawdown_pct, float(-percent.min()))
+        self.max_duration = max(self.max_duration, int((index - last_peak).max()))
+        self.sum_sq_pct += float((percent ** 2).sum())
+
+        returns = unit_returns(rounds)
+        self.staked += len(returns)
+        self.sum_return += float(returns.sum())
+        self.sum_sq_return += float((returns ** 2).sum())
+
+        self.count += len(balance)
+        self.balance = float(balance[-1])
+        self.peak = float(peak[-1])
+        self.peak_index = int(last_peak[-1])
+
+    @property
+    def current_drawdown(self):
+        return self.peak - self.balance
+
+    @property
+    def current_duration(self):
+        return self.count - self.peak_index
+
+    @property
+    def ulcer_index(self):
+        return math.sqrt(self.sum_sq_pct / self.count) if self.count else 0.0
+
+    @property
+    def return_moments(self):
+        """Mean and sample variance of profit per unit staked"""
+        if not self.staked:
+            return np.nan, np.nan
+        mean = self.sum_return / self.staked
+        if self.staked < 2:
+            return mean, np.nan
+        variance = (self.sum_sq_return - self.staked * mean * mean) / (self.staked - 1)
+        return mean, max(0.0, variance)
+
+
+class RiskEngine:
+    """Drawdown trackers and ruin simulations per (session, scope), reused across refreshes"""
+
+    def __init__(self, horizon=RUIN_HORIZON, paths=RUIN_PATHS):
+        self.horizon = horizon
+        self.paths = paths
+        self.trackers = {}
+        self.simulations = {}
+
+    def reset(self):
+        """Forget all state, e.g. after the results table was replaced"""
+        self.trackers.clear()
+        self.simulations.clear()
+
+    def metrics(self, key, rounds, bankroll, bet, simulate=True):
+        """Risk metrics of a round array in play order, for betting `bet` from `bankroll`"""
+        tracker = self.trackers.setdefault(key, DrawdownTracker()).sync(key, rounds)
+        mean, variance = tracker.return_moments
+        var, cvar = tail_loss(rounds['profit'])
+        net_profit = tracker.balance - tracker.start
+
+        metrics = {
+            'max_drawdown': tracker.max_drawdown,
+            'max_drawdown_pct': tracker.max_drawdown_pct,
+            'max_duration': tracker.max_duration,
+            'current_drawdown': tracker.current_drawdown,
+            'current_duration': tracker.current_duration,
+            'ulcer_index': tracker.ulcer_index,
+            'recovery_factor': (net_profit / tracker.max_drawdown
+                                if tracker.max_drawdown > 0 else np.inf),
+            'var': var,
+            'cvar': cvar,
+            'bankroll': bankroll,
+            'bet': bet,
+            'ruin_analytic': analytic_ruin(mean, variance, bankroll, bet),
+            'ruin_simulated': np.nan,
+            'horizon': self.horizon,
+        }
+        if simulate:
+            sim_key = (key, tracker.count, bankroll, bet)
+            if self.simulations.get(key, (None,))[0] != sim_key:
+                self.simulations[key] = (sim_key, simulated_ruin(
+                    unit_returns(rounds), bankroll, bet, self.horizon, self.paths))
+            metrics['ruin_simulated'] = self.simulations[key][1]
+        return metrics
@@ -0,0 +1,446 @@
+"""Time-partitioned archival of old rounds.
+
+Rounds older than a threshold are moved out of the live ``game_results`` table
+into one SQLite file per month (``archive/rounds_YYYY_MM.db``). The live
+database keeps an ``archive_index`` of which sessions live in which month, so
+``open_scope`` can attach only the partitions a query actually needs and expose
+hot and cold rows together as the ``scoped_results`` view. Session and time
+range predicates are pushed into every SELECT of the view.
+
+SQLite attaches at most ``MAX_ATTACHED`` databases per connection. Scopes that
+span more partitions, such as every round ever played, are opened with
+``scope_batches``: one connection per group of partitions, grouped so that
+each session's rows are all in one batch and every row is in exactly one.
+Callers aggregate or merge per batch instead of copying the archive.
+
+Partitions written before money became integer units (see money.py) keep
+REAL Sigils columns: reads convert them on the fly and the next archive run
+into such a partition rebuilds it with integer columns.
+
+A round is identified by (session_id, round_number), which is unique in each
+partition. Ids are not: restoring a snapshot rolls back the AUTOINCREMENT
+counter, so a new live round can carry the id of an archived one. Archiving
+keeps a round's id where the partition has it free and only deletes live
+rows the partition holds under their key.
+"""
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from money import MONEY_FIELDS, units_sql
+
+# SQLite's default compile-time limit on attached databases
+MAX_ATTACHED = 10
+
+
+def init_archive_index(conn):
+    """Create the index of archived sessions per month"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archive_index (
+            month TEXT,
+            session_id TEXT,
+            round_count INTEGER,
+            first_timestamp DATETIME,
+            last_timestamp DATETIME,
+            PRIMARY KEY (month, session_id)
+        )
+    ''')
+
+
+def partition_path(archive_dir, month):
+    """Return the archive file for a 'YYYY_MM' month"""
+    return os.path.join(archive_dir, f"rounds_{month}.db")
+
+
+def list_partitions(archive_dir):
+    """Return archived months, oldest first"""
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(name[len('rounds_'):-len('.db')] for name in os.listdir(archive_dir)
+                  if name.startswith('rounds_') and name.endswith('.db'))
+
+
+def table_columns(conn, schema='main'):
+    """Return the game_results column names of an attached schema"""
+    return [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info(game_results)')]
+
+
+def real_money_columns(conn, schema):
+    """Money columns a partition still stores as REAL Sigils"""
+    return {row[1] for row in conn.execute(f'PRAGMA {schema}.table_info(game_results)')
+            if row[1] in MONEY_FIELDS and row[2].upper() == 'REAL'}
+
+
+def sync_partition_schema(conn, schema):
+    """Create or widen a partition's game_results to match the live table"""
+    table_sql = conn.execute(
+        "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = 'game_results'"
+    ).fetchone()[0]
+    conn.execute(re.sub(r'^CREATE TABLE\s+"?game_results"?',
+                        f'CREATE TABLE IF NOT EXISTS {schema}.game_results', table_sql))
+    init_round_key(conn, schema)
+
+    # Partitions written before a schema migration lack the newer columns
+    existing = set(table_columns(conn, schema))
+    types = {row[1]: row[2] for row in conn.execute('PRAGMA main.table_info(game_results)')}
+    defaults = column_defaults(conn)
+    for column in table_columns(conn):
+        if column not in existing:
+            default = f' DEFAULT {defaults[column]}' if column in defaults else ''
+            conn.execute(f'ALTER TABLE {schema}.game_results ADD COLUMN {column} {types[column]}{default}')
+
+    if real_money_columns(conn, schema):
+        convert_partition_money(conn, schema)
+
+
+def convert_partition_money(conn, schema):
+    """Rebuild a partition's game_results with money in integer units"""
+    table_sql = conn.execute(
+        "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = 'game_results'"
+    ).fetchone()[0]
+    columns = table_columns(conn)
+    column_list = ', '.join(columns)
+    with conn:
+        conn.execute('BEGIN')
+        conn.execute(f'DROP TABLE IF EXISTS {schema}.game_results_units')
+        conn.execute(re.sub(r'^CREATE TABLE\s+"?game_results"?',
+                            f'CREATE TABLE {schema}.game_results_units', table_sql))
+        conn.execute(f'''
+            INSERT INTO {schema}.game_results_units ({column_list})
+            SELECT {partition_select(conn, schema, columns)} FROM {schema}.game_results
+        ''')
+        conn.execute(f'DROP TABLE {schema}.game_results')
+        conn.execute(f'ALTER TABLE {schema}.game_results_units RENAME TO game_results')
+    init_round_key(conn, schema)
+
+
+def init_round_key(conn, schema):
+    """Make (session_id, round_number) unique in a partition"""
+    if conn.execute(f'''
+        SELECT 1 FROM {schema}.sqlite_master
+        WHERE type = 'index' AND name = 'idx_partition_round_key'
+    ''').fetchone():
+        return
+    with conn:
+        # Older archive runs keyed on id and could store a replayed round twice
+        conn.execute(f'''
+            DELETE FROM {schema}.game_results
+            WHERE rowid NOT IN (SELECT MIN(rowid) FROM {schema}.game_results
+                                GROUP BY session_id, round_number)
+        ''')
+        conn.execute(f'DROP INDEX IF EXISTS {schema}.idx_results_session_round')
+        conn.execute(f'''
+            CREATE UNIQUE INDEX {schema}.idx_partition_round_key
+            ON game_results (session_id, round_number)
+        ''')
+
+
+def column_defaults(conn):
+    """Return {column: default SQL} for live game_results columns that have one"""
+    return {row[1]: row[4] for row in conn.execute('PRAGMA main.table_info(game_results)')
+            if row[4] is not None}
+
+
+def partition_select(conn, schema, columns):
+    """SELECT list reading a partition in the live column order"""
+    existing = set(table_columns(conn, schema))
+    real_money = real_money_columns(conn, schema)
+    defaults = column_defaults(conn)
+
+    def select(column):
+        if column not in existing:
+            return f'{defaults.get(column, "NULL")} AS {column}'
+        if column in real_money:
+            return f'{units_sql(column)} AS {column}'
+        return column
+
+    return ', '.join(select(column) for column in columns)
+
+
+def archive_rounds(db_path, archive_dir='archive', older_than_days=90, exclude_sessions=()):
+    """Move rounds older than the threshold into monthly partitions; return the count"""
+    os.makedirs(archive_dir, exist_ok=True)
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+    excluded = tuple(exclude_sessions)
+    exclude_sql = (f"AND session_id NOT IN ({', '.join('?' * len(excluded))})"
+                   if excluded else '')
+
+    conn = sqlite3.connect(db_path)
+    try:
+        init_archive_index(conn)
+        columns = table_columns(conn)
+        column_list = ', '.join(columns)
+        # Same columns with the id left for the partition to assign
+        fresh_id_list = ', '.join('NULL' if column == 'id' else column for column in columns)
+
+        months = [row[0] for row in conn.execute(f'''
+            SELECT DISTINCT strftime('%Y_%m', timestamp)
+            FROM game_results
+            WHERE timestamp < ? {exclude_sql}
+            ORDER BY 1
+        ''', (cutoff,) + excluded)]
+
+        moved = 0
+        for month in months:
+            conn.execute('ATTACH DATABASE ? AS cold', (partition_path(archive_dir, month),))
+            try:
+                # Same schema as the live table, so ids and columns carry over
+                sync_partition_schema(conn, 'cold')
+
+                month_filter = f'''
+                    WHERE timestamp < ? AND strftime('%Y_%m', timestamp) = ? {exclude_sql}
+                '''
+                params = (cutoff, month) + excluded
+
+                with conn:
+                    # Rounds already archived (e.g. replayed from the journal) are skipped by key
+                    conn.execute(f'''
+                        INSERT INTO cold.game_results ({column_list})
+                        SELECT {column_list} FROM main.game_results {month_filter}
+                          AND id NOT IN (SELECT id FROM cold.game_results)
+                        ON CONFLICT(session_id, round_number) DO NOTHING
+                    ''', params)
+                    # A reused id is taken in the partition; the round gets a new one there
+                    conn.execute(f'''
+                        INSERT INTO cold.game_results ({column_list})
+                        SELECT {fresh_id_list} FROM main.game_results {month_filter}
+                          AND id IN (SELECT id FROM cold.game_results)
+                        ON CONFLICT(session_id, round_number) DO NOTHING
+                    ''', params)
+                    conn.execute(f'''
+                        INSERT INTO archive_index
+                        (month, session_id, round_count, first_timestamp, last_timestamp)
+                        SELECT ?, session_id, COUNT(*), MIN(timestamp), MAX(timestamp)
+                        FROM cold.game_results
+                        WHERE session_id IN (SELECT DISTINCT session_id
+                                             FROM main.game_results {month_filter})
+                        GROUP BY session_id
+                        ON CONFLICT(month, session_id) DO UPDATE SET
+                            round_count = excluded.round_count,
+                            first_timestamp = excluded.first_timestamp,
+                            last_timestamp = excluded.last_timestamp
+                    ''', (month,) + params)
+                    moved += conn.execute(f'''
+                        DELETE FROM main.game_results {month_filter}
+                          AND EXISTS (SELECT 1 FROM cold.game_results c
+                                      WHERE c.session_id = main.game_results.session_id
+                                        AND c.round_number = main.game_results.round_number)
+                    ''', params).rowcount
+            finally:
+                conn.execute('DETACH DATABASE cold')
+
+        return moved
+    finally:
+        conn.close()
+
+
+def prune_archived(db_path, archive_dir='archive'):
+    """Drop live rows already held in a partition; return the count"""
+    conn = sqlite3.connect(db_path)
+    try:
+        removed = 0
+        for month in list_partitions(archive_dir):
+            conn.execute('ATTACH DATABASE ? AS cold', (partition_path(archive_dir, month),))
+            try:
+                with conn:
+                    removed += conn.execute('''
+                        DELETE FROM main.game_results
+                        WHERE EXISTS (SELECT 1 FROM cold.game_results c
+                                      WHERE c.session_id = main.game_results.session_id
+                                        AND c.round_number = main.game_results.round_number)
+                    ''').rowcount
+            finally:
+                conn.execute('DETACH DATABASE cold')
+        return removed
+    finally:
+        conn.close()
+
+
+def scope_partitions(conn, archive_dir, session_ids=None, start=None, end=None):
+    """Return the archived months a scope can touch"""
+    months = list_partitions(archive_dir)
+
+    if session_ids is not None:
+        session_ids = list(session_ids)
+        if not session_ids:
+            return []
+        init_archive_index(conn)
+        indexed = {row[0] for row in conn.execute(f'''
+            SELECT DISTINCT month FROM archive_index
+            WHERE session_id IN ({', '.join('?' * len(session_ids))})
+        ''', session_ids)}
+        months = [m for m in months if m in indexed]
+
+    # Timestamps sort lexically, so month keys compare against their prefix
+    if start is not None:
+        months = [m for m in months if m >= start[:7].replace('-', '_')]
+    if end is not None:
+        months = [m for m in months if m <= end[:7].replace('-', '_')]
+    return months
+
+
+def session_groups(conn, archive_dir, session_ids=None, start=None, end=None):
+    """Group a scope's partitions into attachable batches that keep each session in one batch
+
+    Returns [(months, session_ids)] in month order. A session spanning more
+    than MAX_ATTACHED months makes its batch oversized.
+    """
+    months = scope_partitions(conn, archive_dir, session_ids, start, end)
+    scoped_months = set(months)
+    wanted = None if session_ids is None else set(session_ids)
+    init_archive_index(conn)
+    session_months = {}
+    for month, session_id in conn.execute('SELECT month, session_id FROM archive_index'):
+        if month in scoped_months and (wanted is None or session_id in wanted):
+            session_months.setdefault(session_id, set()).add(month)
+
+    # Months that share a session have to be attached together
+    parent = {month: month for month in months}
+
+    def find(month):
+        while parent[month] != month:
+            parent[month] = parent[parent[month]]
+            month = parent[month]
+        return month
+
+    for session_month_set in session_months.values():
+        first, *rest = sorted(session_month_set)
+        for month in rest:
+            parent[find(month)] = find(first)
+
+    components = {}
+    for month in months:
+        components.setdefault(find(month), ([], set()))[0].append(month)
+    for session_id, session_month_set in session_months.items():
+        components[find(min(session_month_set))][1].add(session_id)
+
+    groups = []
+    for component_months, component_sessions in sorted(components.values(),
+                                                       key=lambda component: component[0]):
+        if groups and len(groups[-1][0]) + len(component_months) <= MAX_ATTACHED:
+            groups[-1][0].extend(component_months)
+            groups[-1][1].update(component_sessions)
+        else:
+            groups.append((list(component_months), set(component_sessions)))
+    return groups
+
+
+def session_table(conn, name, session_ids):
+    """Fill a temp table of session ids for views to filter on"""
+    conn.execute(f'CREATE TEMP TABLE {name} (session_id TEXT PRIMARY KEY)')
+    conn.executemany(f'INSERT OR IGNORE INTO temp.{name} VALUES (?)',
+                     ((session_id,) for session_id in session_ids))
+
+
+def build_scope(conn, archive_dir, months, session_ids=None, start=None, end=None,
+                live_sessions=None, live_exclude=False):
+    """Create the scoped_results view over the live table and the given partitions
+
+    Rows are limited to session_ids and start <= timestamp <= end; live rows
+    further to (or, with live_exclude, away from) live_sessions. Views cannot
+    take parameters, so the predicates read temp tables.
+    """
+    columns = table_columns(conn)
+    column_list = ', '.join(columns)
+
+    filters = []
+    if session_ids is not None:
+        session_table(conn, 'scope_sessions', session_ids)
+        filters.append('session_id IN (SELECT session_id FROM temp.scope_sessions)')
+    if start is not None or end is not None:
+        conn.execute('CREATE TEMP TABLE scope_bounds (first_timestamp TEXT, last_timestamp TEXT)')
+        conn.execute('INSERT INTO temp.scope_bounds VALUES (?, ?)', (start, end))
+        if start is not None:
+            filters.append('timestamp >= (SELECT first_timestamp FROM temp.scope_bounds)')
+        if end is not None:
+            filters.append('timestamp <= (SELECT last_timestamp FROM temp.scope_bounds)')
+    live_filters = list(filters)
+    if live_sessions is not None:
+        session_table(conn, 'live_sessions', live_sessions)
+        live_filters.append(f"session_id {'NOT IN' if live_exclude else 'IN'} "
+                            f"(SELECT session_id FROM temp.live_sessions)")
+    conn.commit()
+
+    where = f"WHERE {' AND '.join(filters)}" if filters else ''
+    live_where = f"WHERE {' AND '.join(live_filters)}" if live_filters else ''
+    selects = [f'SELECT {column_list} FROM main.game_results {live_where}']
+
+    if len(months) <= MAX_ATTACHED:
+        for i, month in enumerate(months):
+            conn.execute(f'ATTACH DATABASE ? AS cold_{i}', (partition_path(archive_dir, month),))
+            selects.append(f'SELECT {partition_select(conn, f"cold_{i}", columns)} '
+                           f'FROM cold_{i}.game_results {where}')
+    else:
+        # Only a session spanning more months than can be attached gets here;
+        # its archived rows are copied in batches, the live ones are not
+        conn.execute(f'''
+            CREATE TEMP TABLE scoped_cold AS
+            SELECT {column_list} FROM main.game_results WHERE 0
+        ''')
+        for offset in range(0, len(months), MAX_ATTACHED):
+            batch = months[offset:offset + MAX_ATTACHED]
+            for i, month in enumerate(batch):
+                conn.execute(f'ATTACH DATABASE ? AS cold_{i}', (partition_path(archive_dir, month),))
+            for i in range(len(batch)):
+                conn.execute(f'''
+                    INSERT INTO temp.scoped_cold
+                    SELECT {partition_select(conn, f"cold_{i}", columns)}
+                    FROM cold_{i}.game_results {where}
+                ''')
+            conn.commit()
+            for i in range(len(batch)):
+                conn.execute(f'DETACH DATABASE cold_{i}')
+        conn.execute('CREATE INDEX temp.idx_scoped_session_round ON scoped_cold (session_id, round_number)')
+        selects.append(f'SELECT {column_list} FROM temp.scoped_cold')
+
+    conn.execute(f"CREATE TEMP VIEW scoped_results AS {' UNION ALL '.join(selects)}")
+
+
+def open_scope(db_path, archive_dir='archive', session_ids=None, start=None, end=None):
+    """Open a connection whose scoped_results view unions hot and needed cold rows
+
+    Meant for scopes that fit in MAX_ATTACHED partitions, such as a session;
+    use scope_batches for the whole archive.
+    """
+    conn = sqlite3.connect(db_path)
+    if session_ids is not None:
+        session_ids = list(session_ids)
+    months = scope_partitions(conn, archive_dir, session_ids, start, end)
+    build_scope(conn, archive_dir, months, session_ids, start, end)
+    return conn
+
+
+def scope_batches(db_path, archive_dir='archive', session_ids=None, start=None, end=None):
+    """Open connections whose scoped_results views together hold a scope's rows once each
+
+    Each session's rows are all in one connection. Batches of partitions come
+    in month order; live rows of sessions with nothing archived come last.
+    The caller closes every connection.
+    """
+    if session_ids is not None:
+        session_ids = list(session_ids)
+    conn = sqlite3.connect(db_path)
+    try:
+        groups = session_groups(conn, archive_dir, session_ids, start, end)
+    except Exception:
+        conn.close()
+        raise
+
+    batches = []
+    try:
+        archived = set()
+        for months, group_sessions in groups:
+            batch = sqlite3.connect(db_path)
+            batches.append(batch)
+            build_scope(batch, archive_dir, months, session_ids, start, end,
+                        live_sessions=group_sessions)
+            archived |= group_sessions
+        build_scope(conn, archive_dir, [], session_ids, start, end,
+                    live_sessions=archived, live_exclude=True)
+        batches.append(conn)
+    except Exception:
+        for batch in batches + [conn]:
+            batch.close()
+        raise
+    return batches
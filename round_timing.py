@@ -0,0 +1,167 @@
+"""High-resolution round timing and pace analytics.
+
+``RoundTimer`` measures each round on the monotonic clock, from the first
+form interaction (or an explicit Start Round click) to the moment the round
+is logged. Rounds carry the measured ``play_duration`` in milliseconds plus
+the raw ``started_mono_ns`` / ``logged_mono_ns`` readings, so gaps between
+rounds of a session are exact even though ``timestamp`` only has second
+resolution.
+
+The analytics walk rounds with window functions partitioned by session and
+ordered by round number, which the ``(session_id, round_number)`` index
+serves without a sort.
+"""
+import math
+import time
+
+from money import sigils
+from strategy_ab import t_two_sided_p
+
+TIMING_COLUMNS = (('started_mono_ns', 'INTEGER'), ('logged_mono_ns', 'INTEGER'))
+
+# Gaps longer than this are breaks, not play, and are left out of pace figures
+ACTIVE_GAP_SECONDS = 600
+
+PACE_BUCKETS = 4
+
+
+def init_timing(conn):
+    """Add the monotonic timestamp columns to databases that predate them"""
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(game_results)')]
+    for column, column_type in TIMING_COLUMNS:
+        if column not in columns:
+            conn.execute(f'ALTER TABLE game_results ADD COLUMN {column} {column_type}')
+
+
+class RoundTimer:
+    """Monotonic stopwatch for the round being entered
+
+    Without an explicit start, a round is timed from the previous log, so
+    hotkey entry still gets durations; such fallbacks longer than a break
+    are discarded.
+    """
+
+    def __init__(self, clock=time.monotonic_ns, idle_limit=ACTIVE_GAP_SECONDS):
+        self.clock = clock
+        self.idle_limit_ns = idle_limit * 1000000000
+        self.started = None
+        self.last_logged = None
+
+    @property
+    def running(self):
+        return self.started is not None
+
+    def start(self, restart=False):
+        """Start timing unless already running (or restart from now)"""
+        if restart or self.started is None:
+            self.started = self.clock()
+
+    def elapsed(self):
+        """Seconds since the explicit start, or 0 when idle"""
+        return (self.clock() - self.started) / 1e9 if self.started is not None else 0.0
+
+    def stop(self):
+        """Finish the round; return (started_ns, logged_ns, duration_ms)"""
+        logged = self.clock()
+        started = self.started
+        if started is None and self.last_logged is not None:
+            if logged - self.last_logged <= self.idle_limit_ns:
+                started = self.last_logged
+        self.started = None
+        self.last_logged = logged
+        if started is None:
+            return None, logged, None
+        return started, logged, (logged - started) // 1000000
+
+
+def _paced_rounds(where):
+    """CTE of rounds with their pace (seconds) and gap since the previous round"""
+    return f'''
+        WITH ordered AS (
+            SELECT session_id, round_number, timestamp, result,
+                   {sigils('profit')} AS profit, play_duration,
+                   CASE WHEN logged_mono_ns > LAG(logged_mono_ns) OVER w
+                        THEN (logged_mono_ns - LAG(logged_mono_ns) OVER w) / 1e9
+                        ELSE (julianday(timestamp) - julianday(LAG(timestamp) OVER w)) * 86400
+                   END AS gap
+            FROM game_results
+            WHERE 1 = 1 {where}
+            WINDOW w AS (PARTITION BY session_id ORDER BY round_number)
+        ),
+        paced AS (
+            SELECT *,
+                   CASE WHEN gap <= {ACTIVE_GAP_SECONDS} THEN gap END AS active_gap,
+                   COALESCE(play_duration / 1000.0,
+                            CASE WHEN gap <= {ACTIVE_GAP_SECONDS} THEN gap END) AS pace
+            FROM ordered
+        )
+    '''
+
+
+def session_pace(conn, where='', params=(), limit=None):
+    """Per-session (session, rounds, active hours, rounds/hour, avg pace, breaks), newest first"""
+    rows = conn.execute(f'''
+        {_paced_rounds(where)}
+        SELECT session_id, COUNT(*), SUM(active_gap) / 3600.0, AVG(pace),
+               SUM(CASE WHEN gap > {ACTIVE_GAP_SECONDS} THEN 1 ELSE 0 END), MAX(timestamp)
+        FROM paced
+        GROUP BY session_id
+        ORDER BY MAX(timestamp) DESC
+        {'LIMIT ?' if limit else ''}
+    ''', tuple(params) + ((limit,) if limit else ())).fetchall()
+    return [(session_id, rounds, hours or 0.0,
+             rounds / hours if hours else None, avg_pace, breaks)
+            for session_id, rounds, hours, avg_pace, breaks, _ in rows]
+
+
+def pace_profit(conn, where='', params=(), buckets=PACE_BUCKETS):
+    """Pearson correlation of pace with profit, and profit per pace bucket
+
+    Returns (rounds, r, p, [(bucket, min pace, max pace, rounds, win rate, avg profit)]),
+    where p is the two-sided p-value of r against no correlation.
+    """
+    paced = _paced_rounds(where)
+    n, sx, sy, sxx, syy, sxy = conn.execute(f'''
+        {paced}
+        SELECT COUNT(*), SUM(pace), SUM(profit), SUM(pace * pace),
+               SUM(profit * profit), SUM(pace * profit)
+        FROM paced
+        WHERE pace IS NOT NULL
+    ''', params).fetchone()
+
+    r = p = None
+    if n and n > 2:
+        denominator = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        if denominator > 0:
+            r = (n * sxy - sx * sy) / math.sqrt(denominator)
+            p = 0.0 if abs(r) >= 1 else t_two_sided_p(r * math.sqrt((n - 2) / (1 - r * r)), n - 2)
+
+    rows = conn.execute(f'''
+        {paced},
+        bucketed AS (
+            SELECT pace, result, profit, NTILE({int(buckets)}) OVER (ORDER BY pace) AS bucket
+            FROM paced
+            WHERE pace IS NOT NULL
+        )
+        SELECT bucket, MIN(pace), MAX(pace), COUNT(*),
+               AVG(CASE WHEN result = 'win' THEN 100.0 ELSE 0 END), AVG(profit)
+        FROM bucketed
+        GROUP BY bucket
+        ORDER BY bucket
+    ''', params).fetchall()
+    return n or 0, r, p, rows
+
+
+def hour_profile(conn, where='', params=()):
+    """Per local hour of day: (hour, rounds, rounds/hour, win rate, avg profit, avg pace)"""
+    rows = conn.execute(f'''
+        {_paced_rounds(where)}
+        SELECT CAST(strftime('%H', timestamp, 'localtime') AS INTEGER) AS hour,
+               COUNT(*), SUM(active_gap) / 3600.0,
+               AVG(CASE WHEN result = 'win' THEN 100.0 ELSE 0 END), AVG(profit), AVG(pace)
+        FROM paced
+        GROUP BY hour
+        ORDER BY hour
+    ''', params).fetchall()
+    return [(hour, rounds, rounds / hours if hours else None, win_rate, avg_profit, avg_pace)
+            for hour, rounds, hours, win_rate, avg_profit, avg_pace in rows]
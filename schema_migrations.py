@@ -0,0 +1,301 @@
+"""Versioned schema migrations for the results database.
+
+The schema version is stored in ``PRAGMA user_version``. ``MIGRATIONS`` lists
+(version, description, function) in order; ``migrate`` applies every step
+above the stored version and bumps ``user_version`` only after a step has
+finished, so a database is never marked newer than its tables.
+
+Steps must be idempotent: DDL (``ALTER TABLE``) commits on its own in
+SQLite, so a step interrupted half way is simply run again on the next start.
+Steps that touch every round go through ``run_chunked``, which commits one
+batch of rows at a time and records its cursor in ``schema_progress`` within
+the same transaction. Readers (and a cancelled upgrade) see progress rather
+than one long write lock, and a restarted upgrade resumes where it stopped.
+
+To change the schema, append a step; never edit or reorder released ones,
+and keep their SQL frozen rather than calling code that later versions
+change. Brand-new databases get their tables from ``init_database`` and run
+the steps too, which are then no-ops.
+
+Usage:
+    python schema_migrations.py --db bomb_game_results.db
+"""
+import re
+import sqlite3
+
+from game_profiles import init_profiles
+from money import MONEY_FIELDS, units_sql
+from round_timing import init_timing
+from strategy_ab import init_strategy_stats
+
+# Rows per transaction for migrations over game_results
+CHUNK_ROWS = 50000
+
+
+class SchemaError(Exception):
+    """The database was written by a newer version of the logger"""
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def init_schema_progress(conn):
+    """Create the table holding the cursor of an unfinished chunked migration"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_progress (
+            version INTEGER PRIMARY KEY,
+            last_id INTEGER
+        )
+    ''')
+
+
+def run_chunked(conn, version, table, apply, progress=None, begin=None, chunk_rows=CHUNK_ROWS):
+    """Call apply(conn, first_id, last_id) over a table's rowids, one transaction per chunk
+
+    begin(conn) runs once, in the transaction that creates the cursor, e.g.
+    to clear a table that the chunks then fill. progress(done, total) is
+    called after every committed chunk.
+    """
+    init_schema_progress(conn)
+    row = conn.execute('SELECT last_id FROM schema_progress WHERE version = ?',
+                       (version,)).fetchone()
+    if row is None:
+        with conn:
+            if begin:
+                begin(conn)
+            conn.execute('INSERT INTO schema_progress (version, last_id) VALUES (?, 0)',
+                         (version,))
+        last_id = 0
+    else:
+        last_id = row[0]
+
+    end = conn.execute(f'SELECT MAX(rowid) FROM {table}').fetchone()[0] or 0
+    done, total = conn.execute(f'''
+        SELECT SUM(rowid <= ?), COUNT(*) FROM {table}
+    ''', (last_id,)).fetchone()
+    done = done or 0
+
+    while last_id < end:
+        # Chunk boundaries follow actual rows, so gaps left by archiving cost nothing
+        upper = conn.execute(f'''
+            SELECT rowid FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT 1 OFFSET ?
+        ''', (last_id, chunk_rows - 1)).fetchone()
+        upper = upper[0] if upper else end
+        with conn:
+            apply(conn, last_id + 1, upper)
+            conn.execute('UPDATE schema_progress SET last_id = ? WHERE version = ?',
+                         (upper, version))
+        done += conn.execute(f'SELECT COUNT(*) FROM {table} WHERE rowid BETWEEN ? AND ?',
+                             (last_id + 1, upper)).fetchone()[0]
+        last_id = upper
+        if progress:
+            progress(done, total)
+
+
+def add_profiles(conn, progress):
+    init_profiles(conn)
+
+
+def fold_strategy_stats(conn, first_id, last_id):
+    """Add the rounds with ids in [first_id, last_id] to strategy_stats (REAL money)"""
+    conn.execute('''
+        INSERT INTO strategy_stats
+        (session_id, game_profile, strategy, games, wins, sum_profit, sum_sq_profit)
+        SELECT session_id, game_profile, strategy, COUNT(*),
+               SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END),
+               SUM(profit), SUM(profit * profit)
+        FROM game_results
+        WHERE id BETWEEN ? AND ?
+        GROUP BY session_id, game_profile, strategy
+        ON CONFLICT(session_id, game_profile, strategy) DO UPDATE SET
+            games = games + excluded.games,
+            wins = wins + excluded.wins,
+            sum_profit = sum_profit + excluded.sum_profit,
+            sum_sq_profit = sum_sq_profit + excluded.sum_sq_profit
+    ''', (first_id, last_id))
+
+
+def backfill_strategy_stats(conn, progress):
+    init_strategy_stats(conn)
+    run_chunked(conn, 2, 'game_results', fold_strategy_stats, progress,
+                begin=lambda conn: conn.execute('DELETE FROM strategy_stats'))
+
+
+def add_timing_columns(conn, progress):
+    init_timing(conn)
+
+
+def integer_money(conn, progress):
+    """Rebuild game_results with money columns as INTEGER units (see money.py)"""
+    columns = {row[1]: row[2] for row in conn.execute('PRAGMA table_info(game_results)')}
+    if columns['profit'].upper() == 'INTEGER':
+        return  # created with integer money, or already rebuilt
+
+    table_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'game_results'"
+    ).fetchone()[0]
+    new_sql = re.sub(r'^CREATE TABLE\s+"?game_results"?', 'CREATE TABLE game_results_units',
+                     table_sql)
+    new_sql = re.sub(rf'\b({"|".join(MONEY_FIELDS)})\s+REAL\b', r'\1 INTEGER', new_sql)
+    column_list = ', '.join(columns)
+    select_list = ', '.join(units_sql(column) if column in MONEY_FIELDS else column
+                            for column in columns)
+
+    def create(conn):
+        conn.execute('DROP TABLE IF EXISTS game_results_units')
+        conn.execute(new_sql)
+
+    def copy(conn, first_id, last_id):
+        conn.execute(f'''
+            INSERT INTO game_results_units ({column_list})
+            SELECT {select_list} FROM game_results WHERE id BETWEEN ? AND ?
+        ''', (first_id, last_id))
+
+    run_chunked(conn, 4, 'game_results', copy, progress, begin=create)
+
+    # Swap the tables in one transaction; ids and the AUTOINCREMENT high-water mark carry over
+    progress(0, 0)
+    indexes = [row[0] for row in conn.execute('''
+        SELECT sql FROM sqlite_master
+        WHERE type = 'index' AND tbl_name = 'game_results' AND sql IS NOT NULL
+    ''')]
+    with conn:
+        conn.execute('BEGIN')
+        sequence = conn.execute('''
+            SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence
+            WHERE name IN ('game_results', 'game_results_units')
+        ''').fetchone()[0]
+        conn.execute('DROP TABLE game_results')
+        conn.execute('ALTER TABLE game_results_units RENAME TO game_results')
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'game_results'")
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('game_results', ?)",
+                     (sequence,))
+        for index_sql in indexes:
+            conn.execute(index_sql)
+
+
+def integer_columns(conn, table, conversions):
+    """Rebuild a table with the {column: SQL} conversions applied and those columns INTEGER
+
+    Runs in the caller's transaction, so it is meant for small derived tables.
+    """
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    if not columns:
+        return
+    table_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    new_sql = re.sub(rf'^CREATE TABLE\s+"?{table}"?', f'CREATE TABLE {table}_units', table_sql)
+    new_sql = re.sub(rf'\b({"|".join(conversions)})\s+REAL\b', r'\1 INTEGER', new_sql)
+    indexes = [row[0] for row in conn.execute('''
+        SELECT sql FROM sqlite_master
+        WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL
+    ''', (table,))]
+
+    conn.execute(f'DROP TABLE IF EXISTS {table}_units')
+    conn.execute(new_sql)
+    conn.execute(f'''
+        INSERT INTO {table}_units ({', '.join(columns)})
+        SELECT {', '.join(conversions.get(column, column) for column in columns)} FROM {table}
+    ''')
+    conn.execute(f'DROP TABLE {table}')
+    conn.execute(f'ALTER TABLE {table}_units RENAME TO {table}')
+    for index_sql in indexes:
+        conn.execute(index_sql)
+
+
+def integer_sums(conn, progress):
+    """Convert the running money sums of the derived tables to INTEGER units
+
+    Every row written before this step holds Sigils, whatever the declared
+    column type. The conversion must not run twice, so it records itself in
+    schema_progress in the same transaction; migrate clears that together
+    with the version bump.
+    """
+    init_schema_progress(conn)
+    if conn.execute('SELECT 1 FROM schema_progress WHERE version = 5').fetchone():
+        return  # converted, then interrupted before the version bump
+    with conn:
+        conn.execute('BEGIN')
+        integer_columns(conn, 'strategy_stats', {
+            'sum_profit': units_sql('sum_profit'),
+            'sum_sq_profit': units_sql('sum_sq_profit', 2)
+        })
+        integer_columns(conn, 'pattern_analysis', {'total_profit': units_sql('total_profit')})
+        conn.execute('INSERT INTO schema_progress (version, last_id) VALUES (5, 0)')
+
+
+MIGRATIONS = [
+    (1, "Game profiles", add_profiles),
+    (2, "Per-strategy statistics", backfill_strategy_stats),
+    (3, "Monotonic round timing", add_timing_columns),
+    (4, "Integer money amounts", integer_money),
+    (5, "Integer strategy and pattern sums", integer_sums),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def pending_migrations(conn):
+    """Return the (version, description, function) steps not yet applied"""
+    version = schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise SchemaError(f"Database schema version {version} is newer than this "
+                          f"version of the logger supports ({SCHEMA_VERSION})")
+    return [step for step in MIGRATIONS if step[0] > version]
+
+
+def migrate(conn, progress=None):
+    """Apply pending migrations in order; return the descriptions applied
+
+    progress(description, done, total) reports rows processed by chunked steps.
+    """
+    applied = []
+    for version, description, apply in pending_migrations(conn):
+        def report(done, total, description=description):
+            if progress:
+                progress(description, done, total)
+
+        report(0, 0)
+        apply(conn, report)
+        init_schema_progress(conn)
+        with conn:
+            conn.execute('DELETE FROM schema_progress WHERE version = ?', (version,))
+            conn.execute(f'PRAGMA user_version = {version}')
+        applied.append(description)
+    return applied
+
+
+def main():
+    """Command-line upgrade, e.g. before opening a large database in the app"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Upgrade a results database to the current schema")
+    parser.add_argument('--db', default='bomb_game_results.db', help="Database path")
+    parser.add_argument('--status', action='store_true', help="Only list pending migrations")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        pending = pending_migrations(conn)
+        print(f"Schema version {schema_version(conn)} of {SCHEMA_VERSION}")
+        for version, description, _ in pending:
+            print(f"  pending: {version} {description}")
+        if args.status or not pending:
+            return
+
+        def progress(description, done, total):
+            if total:
+                print(f"\r{description}: {done}/{total} rows", end='', flush=True)
+            else:
+                print(f"{description}...", flush=True)
+
+        migrate(conn, progress)
+        print(f"\nUpgraded to schema version {SCHEMA_VERSION}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
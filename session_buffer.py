@@ -0,0 +1,157 @@
+"""Typed round records and the in-memory buffer of the current session.
+
+``Round`` is the one shape a logged round has in the app: the form, rapid
+entry, the journal and the database insert all use it instead of loose dicts
+and positional tuples. ``SessionBuffer`` keeps the current session's rounds
+in a NumPy structured array that grows in chunks, so analytics and charts
+slice the same memory instead of re-querying and re-copying per view.
+"""
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from event_journal import ROUND_FIELDS, round_values, row_event
+from game_profiles import DEFAULT_PROFILE
+
+
+@dataclass(slots=True)
+class Round:
+    """One logged round, fields in ROUND_FIELDS order"""
+
+    timestamp: str
+    session_id: str
+    round_number: int
+    bet_amount: float
+    strategy: str
+    result: str
+    safe_picks: int
+    multiplier: float
+    winnings: float
+    profit: float
+    ending_balance: float
+    bomb_positions: str = ''
+    notes: str = ''
+    play_duration: int = None
+    game_profile: str = DEFAULT_PROFILE
+    started_mono_ns: int = None
+    logged_mono_ns: int = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a round from a journal event or other mapping"""
+        return cls(*round_values(data))
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a round from a game_results row selected in ROUND_FIELDS order"""
+        return cls.from_dict(row_event(row))
+
+    def as_dict(self):
+        return asdict(self)
+
+    @property
+    def won(self):
+        return self.result == 'win'
+
+
+assert tuple(Round.__dataclass_fields__) == ROUND_FIELDS
+
+# Widest names the round columns hold; NumPy silently cuts longer strings
+STRATEGY_CHARS = 16
+PROFILE_CHARS = 32
+
+# Columns the analytics and charts read; play_duration is NaN when untimed
+ROUND_DTYPE = np.dtype([
+    ('round_number', 'i8'),
+    ('timestamp', 'datetime64[s]'),
+    ('bet_amount', 'f8'),
+    ('win', '?'),
+    ('safe_picks', 'i4'),
+    ('multiplier', 'f8'),
+    ('winnings', 'f8'),
+    ('profit', 'f8'),
+    ('ending_balance', 'f8'),
+    ('play_duration', 'f8'),
+    ('strategy', f'U{STRATEGY_CHARS}'),
+    ('game_profile', f'U{PROFILE_CHARS}'),
+])
+
+
+def check_name_length(kind, name, width):
+    """Reject a name the fixed-width round columns would truncate"""
+    if len(name) > width:
+        raise ValueError(f"{kind} names are limited to {width} characters, "
+                         f"got {len(name)}: {name!r}")
+
+
+def round_record(r):
+    """A Round as a ROUND_DTYPE tuple"""
+    return (r.round_number, r.timestamp, r.bet_amount, r.won, r.safe_picks, r.multiplier,
+            r.winnings, r.profit, r.ending_balance,
+            np.nan if r.play_duration is None else r.play_duration,
+            r.strategy or '', r.game_profile)
+
+
+class SessionBuffer:
+    """One session's rounds as a chunk-grown structured array
+
+    ``rounds`` is a read-only view of the filled prefix; column access such
+    as ``rounds['profit']`` is a view too, so nothing is copied per reader.
+    Growing swaps in a larger array, which leaves earlier views as
+    consistent snapshots.
+    """
+
+    def __init__(self, session_id=None, chunk_size=1024):
+        self.chunk_size = chunk_size
+        self.reset(session_id)
+
+    def reset(self, session_id=None):
+        self.session_id = session_id
+        self.data = np.empty(self.chunk_size, dtype=ROUND_DTYPE)
+        self.size = 0
+        self.version = 0
+
+    def __len__(self):
+        return self.size
+
+    def reserve(self, extra):
+        """Make room for extra more rounds, growing by whole chunks"""
+        needed = self.size + extra
+        if needed > len(self.data):
+            chunks = -(-needed // self.chunk_size)
+            grown = np.empty(chunks * self.chunk_size, dtype=ROUND_DTYPE)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+
+    def extend(self, rounds):
+        """Append rounds of this session, in play order"""
+        records = [round_record(r) for r in rounds if r.session_id == self.session_id]
+        if not records:
+            return
+        self.reserve(len(records))
+        self.data[self.size:self.size + len(records)] = records
+        self.size += len(records)
+        self.version += 1
+
+    def load(self, conn, session_id):
+        """Replace the buffer with a session's rounds from the database"""
+        self.reset(session_id)
+        self.extend(Round.from_row(row) for row in conn.execute(f'''
+            SELECT {', '.join(ROUND_FIELDS)}
+            FROM game_results
+            WHERE session_id = ?
+            ORDER BY round_number
+        ''', (session_id,)))
+
+    @property
+    def rounds(self):
+        view = self.data[:self.size]
+        view.flags.writeable = False
+        return view
+
+    def scope(self, game_profile=None):
+        """Rounds of one profile, or all of them (the latter without copying)"""
+        rounds = self.rounds
+        if game_profile is None:
+            return rounds
+        return rounds[rounds['game_profile'] == game_profile]
@@ -0,0 +1,371 @@
+"""Significance tests between strategies.
+
+Per-strategy sufficient statistics (count, wins, sum and sum of squares of
+profit) are kept in ``strategy_stats`` and updated in the same transaction as
+each round, so comparisons never rescan ``game_results``. Game profiles are
+different games, so statistics are keyed by (game_profile, strategy) and
+strategies are only compared within a profile. From them we run:
+
+* Welch's t-test on mean profit,
+* a mixture sequential probability ratio test, whose p-value stays valid no
+  matter how often the Strategy tab is looked at between rounds; that holds
+  for the minimum over every look, so each round folds the current value of
+  its strategy's pairs into a running minimum in ``strategy_sequential``,
+* Bayesian posteriors for "A has the higher mean profit / win rate",
+
+plus an exact-style permutation test on raw profits when the sample is small
+enough for the normal approximations to be doubtful. It is seeded, so the
+same data always gives the same p-value, and is the one slow test: the app
+runs ``profile_permutation_tests`` on its worker processes.
+"""
+import math
+from itertools import combinations
+
+import numpy as np
+
+from money import sigils, to_units
+
+ALPHA = 0.05
+
+# Above this many rounds per pair the t approximation is tight; skip permutations
+PERMUTATION_MAX_ROUNDS = 5000
+PERMUTATIONS = 2000
+PERMUTATION_SEED = 0
+
+# Mixing scale of the sequential test, as a fraction of the pooled profit std
+SPRT_EFFECT = 0.1
+
+
+def init_strategy_stats(conn):
+    """Create the per-session, per-strategy sufficient statistics table
+
+    Rounds logged before the table existed are folded in by schema_migrations.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS strategy_stats (
+            session_id TEXT,
+            game_profile TEXT,
+            strategy TEXT,
+            games INTEGER,
+            wins INTEGER,
+            sum_profit INTEGER,
+            sum_sq_profit INTEGER,
+            PRIMARY KEY (session_id, game_profile, strategy)
+        )
+    ''')
+
+
+def init_sequential_tests(conn):
+    """Create the running minimum of each strategy pair's sequential p-value"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS strategy_sequential (
+            session_id TEXT,
+            game_profile TEXT,
+            strategy_a TEXT,
+            strategy_b TEXT,
+            min_p REAL,
+            PRIMARY KEY (session_id, game_profile, strategy_a, strategy_b)
+        )
+    ''')
+
+
+def update_sequential(conn, session_id, game_profile, strategy):
+    """Fold the current sequential p-values of a strategy's pairs into their running minimum"""
+    stats = load_strategy_stats(conn, session_id, game_profile)
+    current = stats.get((game_profile, strategy))
+    if current is None:
+        return
+    conn.executemany('''
+        INSERT INTO strategy_sequential (session_id, game_profile, strategy_a, strategy_b, min_p)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(session_id, game_profile, strategy_a, strategy_b) DO UPDATE SET
+            min_p = MIN(min_p, excluded.min_p)
+    ''', [(session_id, game_profile, *sorted((strategy, other)), sequential_p(current, s))
+          for (_, other), s in stats.items() if other != strategy])
+
+
+def load_sequential(conn, session_id, game_profile=None):
+    """Return {game_profile: {(strategy_a, strategy_b): running minimum p}}"""
+    profile_sql, params = '', ()
+    if game_profile is not None:
+        profile_sql, params = 'AND game_profile = ?', (game_profile,)
+    sequential = {}
+    for profile, strategy_a, strategy_b, min_p in conn.execute(f'''
+        SELECT game_profile, strategy_a, strategy_b, min_p FROM strategy_sequential
+        WHERE session_id = ? {profile_sql}
+    ''', (session_id,) + params):
+        sequential.setdefault(profile, {})[(strategy_a, strategy_b)] = min_p
+    return sequential
+
+
+def apply_strategy_round(conn, session_id, game_profile, strategy, result, profit):
+    """Fold one round into strategy_stats (committed by the caller)"""
+    # Sums are kept in units (squared units for sum_sq_profit) so they never drift
+    units = to_units(profit)
+    conn.execute('''
+        INSERT INTO strategy_stats
+        (session_id, game_profile, strategy, games, wins, sum_profit, sum_sq_profit)
+        VALUES (?, ?, ?, 1, ?, ?, ?)
+        ON CONFLICT(session_id, game_profile, strategy) DO UPDATE SET
+            games = games + 1,
+            wins = wins + excluded.wins,
+            sum_profit = sum_profit + excluded.sum_profit,
+            sum_sq_profit = sum_sq_profit + excluded.sum_sq_profit
+    ''', (session_id, game_profile, strategy, 1 if result == 'win' else 0,
+          units, units * units))
+    update_sequential(conn, session_id, game_profile, strategy)
+
+
+def rebuild_strategy_stats(conn, session_ids=None):
+    """Recompute strategy_stats rows from game_results"""
+    where = ''
+    params = ()
+    if session_ids is not None:
+        session_ids = list(session_ids)
+        if not session_ids:
+            return
+        where = f"WHERE session_id IN ({', '.join('?' * len(session_ids))})"
+        params = tuple(session_ids)
+    conn.execute(f'DELETE FROM strategy_stats {where}', params)
+    # Minima over looks at data that may be gone; they restart from the current values
+    conn.execute(f'DELETE FROM strategy_sequential {where}', params)
+    conn.execute(f'''
+        INSERT INTO strategy_stats
+        (session_id, game_profile, strategy, games, wins, sum_profit, sum_sq_profit)
+        SELECT session_id, game_profile, strategy, COUNT(*),
+               SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END),
+               SUM(profit), SUM(profit * profit)
+        FROM game_results
+        {where}
+        GROUP BY session_id, game_profile, strategy
+    ''', params)
+
+
+def load_strategy_stats(conn, session_id=None, game_profile=None):
+    """Return {(game_profile, strategy): StrategyStats} summed over the matching rows"""
+    filters = []
+    params = []
+    for column, value in (('session_id', session_id), ('game_profile', game_profile)):
+        if value is not None:
+            filters.append(f"{column} = ?")
+            params.append(value)
+    where = f"WHERE {' AND '.join(filters)}" if filters else ''
+    rows = conn.execute(f'''
+        SELECT game_profile, strategy, SUM(games), SUM(wins),
+               {sigils('SUM(sum_profit)')}, {sigils('SUM(sum_sq_profit)', 2)}
+        FROM strategy_stats
+        {where}
+        GROUP BY game_profile, strategy
+    ''', params).fetchall()
+    return {(row[0], row[1]): StrategyStats(*row[2:]) for row in rows if row[2]}
+
+
+def by_profile(stats):
+    """Split {(game_profile, strategy): stats} into {game_profile: {strategy: stats}}"""
+    grouped = {}
+    for (game_profile, strategy), s in stats.items():
+        grouped.setdefault(game_profile, {})[strategy] = s
+    return grouped
+
+
+class StrategyStats:
+    """Sufficient statistics of one strategy's profits"""
+
+    __slots__ = ('games', 'wins', 'sum_profit', 'sum_sq_profit')
+
+    def __init__(self, games, wins, sum_profit, sum_sq_profit):
+        self.games = games
+        self.wins = wins
+        self.sum_profit = sum_profit
+        self.sum_sq_profit = sum_sq_profit
+
+    @property
+    def mean(self):
+        return self.sum_profit / self.games
+
+    @property
+    def variance(self):
+        """Unbiased sample variance"""
+        if self.games < 2:
+            return 0.0
+        return max(0.0, (self.sum_sq_profit - self.sum_profit ** 2 / self.games) / (self.games - 1))
+
+    @property
+    def win_rate(self):
+        return self.wins / self.games
+
+
+def _betacf(a, b, x, iterations=200, eps=3e-14):
+    """Continued fraction for the incomplete beta function (Lentz's method)"""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1, a - 1
+    c, d = 1.0, 1 - qab * x / qap
+    d = 1 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, iterations + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1 + aa * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < eps:
+            break
+    return h
+
+
+def incomplete_beta(a, b, x):
+    """Regularized incomplete beta function I_x(a, b)"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _betacf(a, b, x) / a
+    return 1 - front * _betacf(b, a, 1 - x) / b
+
+
+def t_two_sided_p(t, df):
+    """Two-sided p-value of Student's t"""
+    if math.isnan(t) or df <= 0:
+        return float('nan')
+    return incomplete_beta(df / 2, 0.5, df / (df + t * t))
+
+
+def normal_cdf(z):
+    return 0.5 * math.erfc(-z / math.sqrt(2))
+
+
+def welch_test(a, b):
+    """Welch's t-test on mean profit; returns (difference, t, df, p)"""
+    diff = a.mean - b.mean
+    va, vb = a.variance / a.games, b.variance / b.games
+    se2 = va + vb
+    if se2 <= 0 or a.games < 2 or b.games < 2:
+        return diff, float('nan'), 0.0, float('nan')
+    t = diff / math.sqrt(se2)
+    df = se2 ** 2 / ((va ** 2 / (a.games - 1) if va else 0) + (vb ** 2 / (b.games - 1) if vb else 0))
+    return diff, t, df, t_two_sided_p(t, df)
+
+
+def sequential_p(a, b, effect=SPRT_EFFECT):
+    """Always-valid p-value of a normal-mixture SPRT on the difference in means"""
+    se2 = a.variance / a.games + b.variance / b.games
+    if se2 <= 0:
+        return 1.0
+    pooled = math.sqrt((a.variance + b.variance) / 2)
+    tau2 = (effect * pooled) ** 2
+    diff = a.mean - b.mean
+    log_lr = 0.5 * math.log(se2 / (se2 + tau2)) + tau2 * diff ** 2 / (2 * se2 * (se2 + tau2))
+    return min(1.0, math.exp(-log_lr))
+
+
+def prob_better_mean(a, b):
+    """Posterior P(mean profit of A > B) under flat priors (normal approximation)"""
+    se2 = a.variance / a.games + b.variance / b.games
+    if se2 <= 0:
+        return 0.5 if a.mean == b.mean else float(a.mean > b.mean)
+    return normal_cdf((a.mean - b.mean) / math.sqrt(se2))
+
+
+def prob_better_win_rate(a, b):
+    """Posterior P(win rate of A > B) with Beta(1, 1) priors (normal approximation)"""
+    def beta_moments(s):
+        alpha, beta = s.wins + 1, s.games - s.wins + 1
+        total = alpha + beta
+        return alpha / total, alpha * beta / (total ** 2 * (total + 1))
+    mean_a, var_a = beta_moments(a)
+    mean_b, var_b = beta_moments(b)
+    return normal_cdf((mean_a - mean_b) / math.sqrt(var_a + var_b))
+
+
+def permutation_p(profits_a, profits_b, permutations=PERMUTATIONS, seed=PERMUTATION_SEED):
+    """Two-sided permutation p-value for the difference in mean profit"""
+    profits_a = np.asarray(profits_a, dtype=float)
+    profits_b = np.asarray(profits_b, dtype=float)
+    pooled = np.concatenate([profits_a, profits_b])
+    n_a = len(profits_a)
+    observed = abs(profits_a.mean() - profits_b.mean())
+    rng = np.random.default_rng(seed)
+
+    extreme = 0
+    batch = max(1, min(permutations, 2000000 // len(pooled)))
+    done = 0
+    while done < permutations:
+        size = min(batch, permutations - done)
+        shuffled = rng.permuted(np.broadcast_to(pooled, (size, len(pooled))), axis=1)
+        diffs = shuffled[:, :n_a].mean(axis=1) - shuffled[:, n_a:].mean(axis=1)
+        extreme += int((np.abs(diffs) >= observed - 1e-12).sum())
+        done += size
+    return (extreme + 1) / (permutations + 1)
+
+
+def permutation_tests(samples):
+    """Permutation p-values of {strategy: profits}, keyed by sorted pair of strategies"""
+    return {(name_a, name_b): permutation_p(samples[name_a], samples[name_b])
+            for name_a, name_b in combinations(sorted(samples), 2)
+            if len(samples[name_a]) + len(samples[name_b]) <= PERMUTATION_MAX_ROUNDS}
+
+
+def profile_permutation_tests(samples):
+    """permutation_tests of {game_profile: {strategy: profits}}, per profile"""
+    return {game_profile: permutation_tests(profile_samples)
+            for game_profile, profile_samples in samples.items()}
+
+
+def compare_strategies(stats, permutation=None, sequential=None, alpha=ALPHA):
+    """Pairwise comparisons between strategies, best mean first in each pair
+
+    permutation optionally holds permutation_tests p-values for the pairs and
+    sequential the running minima of load_sequential.
+    """
+    comparisons = []
+    for name_a, name_b in combinations(sorted(stats), 2):
+        a, b = stats[name_a], stats[name_b]
+        if b.mean > a.mean:
+            name_a, name_b, a, b = name_b, name_a, b, a
+
+        diff, t, df, p = welch_test(a, b)
+        pair = tuple(sorted((name_a, name_b)))
+        seq_p = min(sequential_p(a, b), (sequential or {}).get(pair, 1.0))
+        perm_p = (permutation or {}).get(pair)
+
+        if seq_p < alpha:
+            verdict = 'REAL'
+        elif (perm_p if perm_p is not None else p) < alpha:
+            verdict = 'LIKELY (not yet robust to repeated checking)'
+        else:
+            verdict = 'NOT SIGNIFICANT'
+
+        comparisons.append({
+            'better': name_a,
+            'worse': name_b,
+            'difference': diff,
+            't': t,
+            'df': df,
+            'welch_p': p,
+            'sequential_p': seq_p,
+            'permutation_p': perm_p,
+            'prob_better_mean': prob_better_mean(a, b),
+            'prob_better_win_rate': prob_better_win_rate(a, b),
+            'verdict': verdict
+        })
+    return comparisons
+
+
+def ev_significance(s):
+    """Two-sided p-value that a strategy's mean profit differs from zero"""
+    if s.games < 2 or s.variance <= 0:
+        return float('nan')
+    t = s.mean / math.sqrt(s.variance / s.games)
+    return t_two_sided_p(t, s.games - 1)
@@ -0,0 +1,148 @@
+"""Online detection of tilt and other risky behavior within a session.
+
+``TiltDetector`` consumes rounds one at a time, in play order, and keeps only
+O(1) running state: the current loss streak, bet escalations inside it,
+fast/slow moving averages of the stop point and of round pace, and session
+elapsed time. Each update re-evaluates three signals and moves a small
+state machine (calm -> caution -> tilt); entering a signal raises an alert.
+
+* escalation: raising the bet after losses, martingale style
+* drift: the stop point creeping up, usually while chasing losses
+* fatigue: long sessions, late-night play, or rounds played ever faster
+"""
+from datetime import datetime, timezone
+
+STATES = ('calm', 'caution', 'tilt')
+
+# A raise of at least this factor right after a loss counts as escalation
+ESCALATION_FACTOR = 1.5
+ESCALATIONS_FOR_ALERT = 2
+ESCALATIONS_FOR_TILT = 3
+
+# Moving-average weights for the fast and slow trackers
+FAST_ALPHA = 0.3
+SLOW_ALPHA = 0.05
+WARMUP_ROUNDS = 10
+DRIFT_PICKS = 2.0
+
+FATIGUE_HOURS = 2.0
+LATE_NIGHT_HOURS = range(0, 5)
+RUSH_RATIO = 0.5
+
+
+class Alert:
+    """One behavioral alert raised at a round"""
+
+    __slots__ = ('kind', 'message', 'round_number', 'timestamp')
+
+    def __init__(self, kind, message, round_number, timestamp):
+        self.kind = kind
+        self.message = message
+        self.round_number = round_number
+        self.timestamp = timestamp
+
+
+def _ewma(previous, value, alpha):
+    return value if previous is None else previous + alpha * (value - previous)
+
+
+class TiltDetector:
+    """Per-session streaming state machine over logged rounds"""
+
+    def __init__(self, session_id=None, max_alerts=50):
+        self.max_alerts = max_alerts
+        self.reset(session_id)
+
+    def reset(self, session_id=None):
+        self.session_id = session_id
+        self.state = 'calm'
+        self.rounds = 0
+        self.loss_streak = 0
+        self.escalations = 0
+        self.last_bet = None
+        self.last_result = None
+        self.stop_fast = None
+        self.stop_slow = None
+        self.pace_fast = None
+        self.pace_slow = None
+        self.started = None
+        self.active = set()
+        self.alerts = []
+
+    def update(self, round_data):
+        """Fold in one Round; return the alerts it raised"""
+        if round_data.session_id != self.session_id:
+            self.reset(round_data.session_id)
+
+        played = datetime.strptime(round_data.timestamp, '%Y-%m-%d %H:%M:%S').replace(
+            tzinfo=timezone.utc)
+        self.started = self.started or played
+        self.rounds += 1
+        bet = round_data.bet_amount
+        result = round_data.result
+
+        # Escalation: count raises made while a loss streak is running
+        if self.last_result == 'loss' and self.last_bet and bet >= self.last_bet * ESCALATION_FACTOR:
+            self.escalations += 1
+        if result == 'loss':
+            self.loss_streak += 1
+        else:
+            self.loss_streak = 0
+            self.escalations = 0
+
+        # A loss at k picks means the player was aiming for at least k + 1
+        stop_point = round_data.safe_picks + (1 if result == 'loss' else 0)
+        self.stop_fast = _ewma(self.stop_fast, stop_point, FAST_ALPHA)
+        self.stop_slow = _ewma(self.stop_slow, stop_point, SLOW_ALPHA)
+
+        duration = round_data.play_duration
+        if duration:
+            self.pace_fast = _ewma(self.pace_fast, duration, FAST_ALPHA)
+            self.pace_slow = _ewma(self.pace_slow, duration, SLOW_ALPHA)
+
+        self.last_bet = bet
+        self.last_result = result
+
+        signals = self.evaluate(played)
+        raised = []
+        for kind, message in signals.items():
+            if kind not in self.active:
+                raised.append(Alert(kind, message, round_data.round_number, played))
+        self.active = set(signals)
+        self.state = self.next_state(signals)
+
+        self.alerts.extend(raised)
+        del self.alerts[:-self.max_alerts]
+        return raised
+
+    def evaluate(self, played):
+        """Return {signal: message} for every signal currently firing"""
+        signals = {}
+
+        if self.escalations >= ESCALATIONS_FOR_ALERT:
+            signals['escalation'] = (f"Bet raised {self.escalations} times during a "
+                                     f"{self.loss_streak}-loss streak (martingale pattern)")
+
+        if self.rounds >= WARMUP_ROUNDS and self.stop_fast - self.stop_slow >= DRIFT_PICKS:
+            signals['drift'] = (f"Stop point drifting up: recent {self.stop_fast:.1f} picks "
+                                f"vs session {self.stop_slow:.1f}")
+
+        hours = (played - self.started).total_seconds() / 3600
+        local_hour = played.astimezone().hour
+        if hours >= FATIGUE_HOURS:
+            signals['fatigue'] = f"Session running {hours:.1f} hours; consider a break"
+        elif local_hour in LATE_NIGHT_HOURS:
+            signals['fatigue'] = f"Late-night play ({local_hour:02d}:00)"
+        elif (self.rounds >= WARMUP_ROUNDS and self.pace_slow
+              and self.pace_fast < self.pace_slow * RUSH_RATIO):
+            signals['fatigue'] = (f"Rounds speeding up: {self.pace_fast / 1000:.1f}s "
+                                  f"vs {self.pace_slow / 1000:.1f}s usual")
+        return signals
+
+    def next_state(self, signals):
+        if (len(signals) >= 2 or self.escalations >= ESCALATIONS_FOR_TILT
+                or ('drift' in signals and self.loss_streak >= 3)):
+            return 'tilt'
+        if signals:
+            return 'caution'
+        return 'calm'
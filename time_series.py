@@ -0,0 +1,221 @@
+"""Gap-filled time-series resampling of rounds at minute/hour/day/week granularity.
+
+Rounds are bucketed by local time (timestamps are stored in UTC), like the
+timing analytics. Two paths feed the same dense series:
+
+* ``resample_rounds`` bins a ROUND_DTYPE array, such as the session buffer,
+  with NumPy: one ``np.unique`` plus a few ``np.bincount`` calls.
+* ``bucket_query`` aggregates a wider scope (every session, or the archive
+  through ``scoped_results``) in SQL, so years of rounds come back as one row
+  per non-empty bucket; ``from_buckets`` densifies those rows. An archive
+  split over several connections (see round_archive.scope_batches) is
+  aggregated per batch and combined with ``merge_buckets``.
+
+Every bucket between the first and last round is present; empty buckets have
+zero rounds, NaN win rate and the balance carried forward.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from money import sigils
+
+FREQUENCIES = ('minute', 'hour', 'day', 'week')
+
+UNITS = {'minute': 'm', 'hour': 'h', 'day': 'D', 'week': 'D'}
+STEPS = {'minute': np.timedelta64(1, 'm'), 'hour': np.timedelta64(1, 'h'),
+         'day': np.timedelta64(1, 'D'), 'week': np.timedelta64(7, 'D')}
+
+# SQLite bucket expressions in local time; weeks start on Monday
+BUCKET_SQL = {
+    'minute': "strftime('%Y-%m-%d %H:%M:00', timestamp, 'localtime')",
+    'hour': "strftime('%Y-%m-%d %H:00:00', timestamp, 'localtime')",
+    'day': "date(timestamp, 'localtime')",
+    'week': "date(timestamp, 'localtime', 'weekday 0', '-6 days')",
+}
+
+# Refuse dense series longer than this (e.g. minutes over several years)
+MAX_BUCKETS = 500000
+
+
+@dataclass(slots=True)
+class TimeSeries:
+    """Dense per-bucket totals; period holds each bucket's local start time"""
+
+    freq: str
+    period: np.ndarray
+    rounds: np.ndarray
+    wins: np.ndarray
+    profit: np.ndarray
+    wagered: np.ndarray
+    balance: np.ndarray
+
+    def __len__(self):
+        return len(self.period)
+
+    @property
+    def win_rate(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.rounds > 0, self.wins / self.rounds * 100, np.nan)
+
+    @property
+    def cumulative_profit(self):
+        return np.cumsum(self.profit)
+
+
+def local_times(timestamps):
+    """UTC datetime64[s] values as naive local times, DST-aware per hour"""
+    hours, inverse = np.unique(timestamps.astype('datetime64[h]'), return_inverse=True)
+    offsets = np.array([time.localtime(int(h.astype('datetime64[s]').astype('i8'))).tm_gmtoff
+                        for h in hours], dtype='timedelta64[s]')
+    return timestamps.astype('datetime64[s]') + offsets[inverse]
+
+
+def bucket_starts(local, freq):
+    """Floor local datetime64 values to their bucket start"""
+    if freq == 'week':
+        days = local.astype('datetime64[D]')
+        # 1970-01-01 was a Thursday; shift so buckets start on Monday
+        return days - (days.astype('i8') + 3) % 7
+    return local.astype(f'datetime64[{UNITS[freq]}]')
+
+
+def densify(freq, period, rounds, wins, profit, wagered, balance):
+    """Expand sorted sparse buckets into a gap-filled TimeSeries"""
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency: {freq}")
+    unit = UNITS[freq]
+    period = np.asarray(period, dtype=f'datetime64[{unit}]')
+    if not len(period):
+        empty = np.zeros(0)
+        return TimeSeries(freq, period, empty.astype('i8'), empty, empty, empty, empty)
+
+    step = STEPS[freq]
+    slots = ((period - period[0]) // step).astype('i8')
+    size = int(slots[-1]) + 1
+    if size > MAX_BUCKETS:
+        raise ValueError(f"{size} {freq} buckets is too many; choose a coarser interval")
+
+    def spread(values, fill=0):
+        dense = np.full(size, fill, dtype=np.asarray(values).dtype)
+        dense[slots] = values
+        return dense
+
+    # Carry the last observed balance across empty buckets
+    observed = np.zeros(size, dtype='i8')
+    observed[slots] = slots
+    last_seen = np.searchsorted(slots, np.maximum.accumulate(observed))
+    carried = np.asarray(balance, dtype='f8')[last_seen]
+
+    return TimeSeries(freq, period[0] + np.arange(size) * step,
+                      spread(np.asarray(rounds, dtype='i8')), spread(np.asarray(wins, dtype='f8')),
+                      spread(np.asarray(profit, dtype='f8')), spread(np.asarray(wagered, dtype='f8')),
+                      carried)
+
+
+def resample_rounds(rounds, freq):
+    """Resample a ROUND_DTYPE array (e.g. the session buffer) in NumPy"""
+    timestamps = rounds['timestamp']
+    order = np.argsort(timestamps, kind='stable')
+    if not np.array_equal(order, np.arange(len(order))):
+        rounds = rounds[order]
+        timestamps = rounds['timestamp']
+
+    buckets = bucket_starts(local_times(timestamps), freq)
+    period, first, groups = np.unique(buckets, return_index=True, return_inverse=True)
+    last = np.append(first[1:], len(buckets)) - 1
+    return densify(freq, period,
+                   np.bincount(groups, minlength=len(period)),
+                   np.bincount(groups, weights=rounds['win'], minlength=len(period)),
+                   np.bincount(groups, weights=rounds['profit'], minlength=len(period)),
+                   np.bincount(groups, weights=rounds['bet_amount'], minlength=len(period)),
+                   rounds['ending_balance'][last])
+
+
+def bucket_query(freq, table='game_results', where=''):
+    """SQL of (bucket, rounds, wins, profit, wagered, last balance, last timestamp) per non-empty bucket"""
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency: {freq}")
+    return f'''
+        WITH bucketed AS (
+            SELECT {BUCKET_SQL[freq]} AS bucket, timestamp, result, profit, bet_amount,
+                   ending_balance,
+                   ROW_NUMBER() OVER (PARTITION BY {BUCKET_SQL[freq]}
+                                      ORDER BY timestamp DESC, round_number DESC) AS from_end
+            FROM {table}
+            WHERE 1 = 1 {where}
+        )
+        SELECT bucket, COUNT(*), SUM(CASE WHEN result = 'win' THEN 1 ELSE 0 END),
+               {sigils('SUM(profit)')}, {sigils('SUM(bet_amount)')},
+               {sigils('SUM(CASE WHEN from_end = 1 THEN ending_balance END)')},
+               MAX(timestamp)
+        FROM bucketed
+        GROUP BY bucket
+        ORDER BY bucket
+    '''
+
+
+def merge_buckets(parts):
+    """Combine bucket_query rows of disjoint sets of rounds into one sorted set of rows"""
+    merged = {}
+    for rows in parts:
+        for bucket, rounds, wins, profit, wagered, balance, last in rows:
+            if bucket not in merged:
+                merged[bucket] = [bucket, rounds, wins, profit, wagered, balance, last]
+                continue
+            row = merged[bucket]
+            row[1] += rounds
+            row[2] += wins
+            row[3] += profit
+            row[4] += wagered
+            # The bucket's balance is the one after its latest round
+            if last > row[6]:
+                row[5], row[6] = balance, last
+    return [tuple(merged[bucket]) for bucket in sorted(merged)]
+
+
+def from_buckets(rows, freq):
+    """Densify the rows of bucket_query"""
+    if not rows:
+        return densify(freq, [], [], [], [], [], [])
+    period, rounds, wins, profit, wagered, balance, _ = zip(*rows)
+    return densify(freq, np.array(period, dtype='datetime64[s]'),
+                   rounds, wins, profit, wagered, balance)
+
+
+def resample_query(conn, freq, table='game_results', where='', params=()):
+    """Resample every round of a table (or scoped_results view) matching where"""
+    return from_buckets(conn.execute(bucket_query(freq, table, where), params).fetchall(), freq)
+
+
+def hour_of_day(series):
+    """Per local hour 0-23 of an hourly series: (rounds, win rate, avg profit)"""
+    if series.freq != 'hour':
+        raise ValueError("hour_of_day needs an hourly series")
+    hours = series.period.astype('i8') % 24
+    rounds = np.bincount(hours, weights=series.rounds, minlength=24)
+    wins = np.bincount(hours, weights=series.wins, minlength=24)
+    profit = np.bincount(hours, weights=series.profit, minlength=24)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        win_rate = np.where(rounds > 0, wins / rounds * 100, np.nan)
+        avg_profit = np.where(rounds > 0, profit / rounds, np.nan)
+    return rounds, win_rate, avg_profit
+
+
+def calendar_grid(series):
+    """Daily profit as a (7 weekdays x weeks) grid, NaN on days without play
+
+    Returns (grid, week_starts); row 0 is Monday.
+    """
+    if series.freq != 'day':
+        raise ValueError("calendar_grid needs a daily series")
+    days = series.period
+    if not len(days):
+        return np.full((7, 0), np.nan), days
+    week_starts = bucket_starts(days, 'week')
+    columns = ((week_starts - week_starts[0]) // STEPS['week']).astype('i8')
+    weekdays = (days - week_starts).astype('i8')
+    grid = np.full((7, int(columns[-1]) + 1), np.nan)
+    grid[weekdays, columns] = np.where(series.rounds > 0, series.profit, np.nan)
+    return grid, np.unique(week_starts)
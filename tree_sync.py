@@ -0,0 +1,64 @@
+"""Keyed, differential updates for ttk.Treeview.
+
+Refreshing a Treeview by deleting every child and inserting every row again
+churns Tk widgets even when nothing changed. ``TreeSync`` keys each row, keeps
+the last values it wrote, and only inserts, updates, moves or deletes the
+rows that actually differ.
+"""
+
+
+class TreeSync:
+    """Mirror a list of keyed rows into a Treeview with minimal Tk calls"""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = {}  # iid -> (values, tags) last written
+        self.order = []  # iids in display order
+
+    def update(self, rows):
+        """Sync the tree to rows, an iterable of (key, values, tags); return the change count"""
+        tree = self.tree
+        changes = 0
+        wanted = []
+        new_rows = {}
+
+        for key, values, tags in rows:
+            iid = str(key)
+            values = tuple(values)
+            tags = tuple(tags)
+            wanted.append(iid)
+            new_rows[iid] = (values, tags)
+
+        # Remove rows that disappeared
+        for iid in self.order:
+            if iid not in new_rows:
+                tree.delete(iid)
+                changes += 1
+        current = [iid for iid in self.order if iid in new_rows]
+
+        # Insert new rows and rewrite changed ones in place
+        position = {iid: i for i, iid in enumerate(current)}
+        for index, iid in enumerate(wanted):
+            values, tags = new_rows[iid]
+            previous = self.rows.get(iid)
+            if iid not in position:
+                tree.insert('', index, iid=iid, values=values, tags=tags)
+                changes += 1
+            elif previous != (values, tags):
+                tree.item(iid, values=values, tags=tags)
+                changes += 1
+
+        # Move rows whose relative order changed
+        if [iid for iid in wanted if iid in position] != current:
+            for index, iid in enumerate(wanted):
+                if tree.index(iid) != index:
+                    tree.move(iid, '', index)
+                    changes += 1
+
+        self.rows = new_rows
+        self.order = wanted
+        return changes
+
+    def clear(self):
+        """Remove every row this sync owns"""
+        return self.update(())